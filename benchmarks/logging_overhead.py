@@ -0,0 +1,104 @@
+"""
+Measure simulation throughput, in time steps per second, with hot path logging off and on.
+
+Run from the root folder with ```python -m benchmarks.logging_overhead```, and with
+```python -O -m benchmarks.logging_overhead``` to measure the build with debug events compiled
+out. Results are printed and written as JSON so regressions can be tracked between commits.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import tempfile
+import time
+
+from mining_simulator import trace
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+
+DEFAULT_OUTPUT = "benchmarks/results/logging_overhead.json"
+
+
+def steps_per_second(num_trucks: int, num_stations: int, num_steps: int) -> float:
+    """Returns the time steps per second of a seeded stepped simulation."""
+
+    coordinator = MiningCoordinator(
+        num_trucks, num_stations, random.Random(0), default_config()
+    )
+    trace.configure()
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        coordinator.time_step()
+    return num_steps / (time.perf_counter() - start)
+
+
+def measure(num_trucks: int, num_stations: int, num_steps: int) -> dict[str, float]:
+    """
+    Returns the throughput with debug events disabled and with every event written to a log
+    file through the background queue listener.
+    """
+
+    root = logging.getLogger()
+    level = root.level
+    results = {}
+    try:
+        root.setLevel(logging.INFO)
+        results["disabled"] = steps_per_second(num_trucks, num_stations, num_steps)
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_handler = logging.FileHandler(os.path.join(directory, "bench.log"))
+            listener = trace.start_listener([file_handler], root)
+            root.setLevel(logging.DEBUG)
+            try:
+                results["enabled"] = steps_per_second(
+                    num_trucks, num_stations, num_steps
+                )
+            finally:
+                listener.stop()
+                for handler in root.handlers[:]:
+                    if isinstance(handler, trace.DeferredQueueHandler):
+                        root.removeHandler(handler)
+                file_handler.close()
+    finally:
+        root.setLevel(level)
+        trace.configure()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trucks", type=int, default=1000, help="number of trucks")
+    parser.add_argument("--stations", type=int, default=10, help="number of stations")
+    parser.add_argument("--steps", type=int, default=864, help="time steps to run")
+    parser.add_argument(
+        "--output", default=DEFAULT_OUTPUT, help="JSON file to write results to"
+    )
+    args = parser.parse_args()
+
+    throughput = measure(args.trucks, args.stations, args.steps)
+    for name, rate in throughput.items():
+        print(f"{name:>10}: {rate:10.1f} steps/s")
+
+    with open(args.output, "w") as file:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "optimized": not __debug__,
+                "trucks": args.trucks,
+                "stations": args.stations,
+                "steps": args.steps,
+                "steps_per_second": {
+                    name: round(rate, 1) for name, rate in throughput.items()
+                },
+            },
+            file,
+            indent=2,
+        )
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
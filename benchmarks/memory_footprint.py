@@ -0,0 +1,103 @@
+"""
+Measure the memory footprint of one truck, mine and unloading station.
+
+Run from the root folder with ```python -m benchmarks.memory_footprint```. Results are
+printed and written as JSON so regressions can be tracked between commits.
+"""
+
+import argparse
+import json
+import platform
+import random
+import tracemalloc
+from typing import Callable
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.mining_site import MiningSite
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.sampling import mining_time_sampler
+from mining_simulator.unloading_station import UnloadStation
+
+DEFAULT_OUTPUT = "benchmarks/results/memory_footprint.json"
+
+
+def bytes_per_instance(factory: Callable[[int], object], count: int) -> float:
+    """
+    Returns the average number of bytes allocated per instance when building count
+    instances at once, including anything each instance owns such as its queue.
+
+    Args:
+        factory: builds count instances and returns them.
+        count: number of instances to build.
+    """
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        instances = factory(count)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del instances
+    return (after - before) / count
+
+
+def measure(count: int) -> dict[str, float]:
+    """Returns the footprint in bytes of each kind of entity."""
+
+    config = default_config()
+    rng = random.Random(0)
+    sampler = mining_time_sampler(config, rng)
+    return {
+        "mining_truck": bytes_per_instance(
+            lambda n: [MiningTruck(config, index) for index in range(n)], count
+        ),
+        "mining_site": bytes_per_instance(
+            lambda n: [MiningSite(sampler, config, index) for index in range(n)], count
+        ),
+        "unload_station": bytes_per_instance(
+            lambda n: [UnloadStation(config, index) for index in range(n)], count
+        ),
+        # a truck together with its mine and a share of the coordinator's bookkeeping
+        "coordinator_per_truck": bytes_per_instance(
+            lambda n: MiningCoordinator(n, max(1, n // 100), rng, config), count
+        ),
+        "vectorized_fleet_per_truck": bytes_per_instance(
+            lambda n: VectorizedFleet(n, max(1, n // 100), rng, config), count
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--count", type=int, default=100_000, help="instances built per entity"
+    )
+    parser.add_argument(
+        "--output", default=DEFAULT_OUTPUT, help="JSON file to write results to"
+    )
+    args = parser.parse_args()
+
+    footprint = measure(args.count)
+    for name, size in footprint.items():
+        print(f"{name:>28}: {size:8.1f} bytes")
+
+    with open(args.output, "w") as file:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "count": args.count,
+                "bytes_per_instance": {
+                    name: round(size, 1) for name, size in footprint.items()
+                },
+            },
+            file,
+            indent=2,
+        )
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
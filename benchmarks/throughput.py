@@ -0,0 +1,243 @@
+"""
+Measure simulation throughput and how it scales with fleet size and station count.
+
+Run from the root folder with ```python -m benchmarks.throughput```. Every engine is run for a
+grid of truck and station counts, reporting construction time, time steps and simulated hours
+per second and peak traced memory. Results are written as JSON and compared against a stored
+baseline; the command exits with an error if any case got slower than the tolerance allows.
+Record a new baseline with ```--update-baseline``` on the machine the comparison runs on.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Optional
+
+import numpy as np
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.event_engine import EventDrivenEngine
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.hybrid_engine import HybridEngine
+
+DEFAULT_OUTPUT = "benchmarks/results/throughput.json"
+DEFAULT_BASELINE = "benchmarks/results/throughput_baseline.json"
+ENGINES = ("stepped", "event", "hybrid", "vectorized")
+# time steps the event and hybrid engines advance between checks of the time budget
+EVENT_CHUNK_STEPS = 12
+# time steps run while tracing memory, enough for every truck to be dispatched once
+MEMORY_STEPS = 8
+
+
+def build(engine: str, num_trucks: int, num_stations: int) -> Any:
+    """Returns a seeded coordinator, or fleet for the vectorized engine."""
+
+    config = default_config()
+    if engine == "vectorized":
+        return VectorizedFleet(num_trucks, num_stations, random.Random(0), config)
+    return MiningCoordinator(num_trucks, num_stations, random.Random(0), config)
+
+
+def run_steps(
+    engine: str, coordinator: Any, num_steps: int, budget_seconds: float
+) -> tuple[int, float]:
+    """
+    Advance a simulation until num_steps time steps have run or the time budget is spent.
+
+    Returns:
+        The number of time steps run and the seconds they took.
+    """
+
+    start = time.perf_counter()
+    deadline = start + budget_seconds
+    steps = 0
+    if engine in ("event", "hybrid"):
+        engine_class = EventDrivenEngine if engine == "event" else HybridEngine
+        event_engine = engine_class(coordinator, default_config().sim_step_minutes)
+        while steps < num_steps and time.perf_counter() < deadline:
+            steps = min(num_steps, steps + EVENT_CHUNK_STEPS)
+            event_engine.run_until(steps)
+    else:
+        while steps < num_steps and time.perf_counter() < deadline:
+            coordinator.time_step()
+            steps += 1
+    return steps, time.perf_counter() - start
+
+
+def peak_memory_mb(engine: str, num_trucks: int, num_stations: int) -> float:
+    """Returns the peak traced memory of building a simulation and running a few steps."""
+
+    tracemalloc.start()
+    try:
+        coordinator = build(engine, num_trucks, num_stations)
+        run_steps(engine, coordinator, MEMORY_STEPS, float("inf"))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024**2
+
+
+def measure_case(
+    engine: str,
+    num_trucks: int,
+    num_stations: int,
+    num_steps: int,
+    budget_seconds: float,
+) -> dict[str, float]:
+    """Returns the benchmark results of one engine, fleet size and station count."""
+
+    start = time.perf_counter()
+    coordinator = build(engine, num_trucks, num_stations)
+    construction = time.perf_counter() - start
+
+    steps, elapsed = run_steps(engine, coordinator, num_steps, budget_seconds)
+    step_minutes = default_config().sim_step_minutes
+    return {
+        "construction_seconds": construction,
+        "steps": steps,
+        "ticks_per_second": steps / elapsed,
+        "simulated_hours_per_second": steps * step_minutes / 60 / elapsed,
+        "peak_memory_mb": peak_memory_mb(engine, num_trucks, num_stations),
+    }
+
+
+def case_key(engine: str, num_trucks: int, num_stations: int) -> str:
+    return f"{engine}/{num_trucks}/{num_stations}"
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Compare the throughput of every case that is also in the baseline.
+
+    Args:
+        results: benchmark results keyed by case.
+        baseline: baseline results keyed by case.
+        tolerance: largest acceptable relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        A description of every regressed case.
+    """
+
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected = baseline[key]["ticks_per_second"]
+        if result["ticks_per_second"] < expected * (1 - tolerance):
+            regressions.append(
+                f"{key}: {result['ticks_per_second']:.1f} ticks/s, "
+                f"baseline {expected:.1f} ticks/s"
+            )
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[dict[str, dict[str, float]]]:
+    try:
+        with open(path) as file:
+            return json.load(file)["cases"]
+    except FileNotFoundError:
+        return None
+
+
+def write_results(path: str, results: dict[str, dict[str, float]]) -> None:
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+                "cpus": os.cpu_count(),
+                "cases": {
+                    key: {name: round(value, 4) for name, value in result.items()}
+                    for key, result in results.items()
+                },
+            },
+            file,
+            indent=2,
+        )
+        file.write("\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument(
+        "--trucks", nargs="+", type=int, default=[10, 100, 1000, 10_000, 100_000]
+    )
+    parser.add_argument("--stations", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument(
+        "--steps", type=int, default=288, help="time steps to run per case"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=2.0,
+        help="seconds after which a case stops early, throughput is measured over the steps run",
+    )
+    parser.add_argument(
+        "--output", default=DEFAULT_OUTPUT, help="JSON file to write results to"
+    )
+    parser.add_argument(
+        "--baseline", default=DEFAULT_BASELINE, help="JSON file to compare against"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="largest acceptable slowdown relative to the baseline",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="write the results as the new baseline instead of comparing",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':>26} {'build s':>9} {'ticks/s':>11} {'sim h/s':>11} {'peak MB':>9}")
+    for engine in args.engines:
+        for num_trucks in args.trucks:
+            for num_stations in args.stations:
+                key = case_key(engine, num_trucks, num_stations)
+                result = measure_case(
+                    engine, num_trucks, num_stations, args.steps, args.budget
+                )
+                results[key] = result
+                print(
+                    f"{key:>26} {result['construction_seconds']:9.3f} "
+                    f"{result['ticks_per_second']:11.1f} "
+                    f"{result['simulated_hours_per_second']:11.1f} "
+                    f"{result['peak_memory_mb']:9.1f}"
+                )
+
+    write_results(args.output, results)
+    if args.update_baseline:
+        write_results(args.baseline, results)
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(
+            f"No baseline at {args.baseline}, run with --update-baseline to record one"
+        )
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Throughput regressed:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print(f"No case regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import configparser
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from mining_simulator.config import config_from_dict
+from mining_simulator.sweep import (
+    ScenarioConfig,
+    SweepCache,
+    resolve_option,
+    scenario_key,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# job files a client can drop into the incoming directory
+JOB_SUFFIXES = (".json", ".ini")
+
+
+def submit_job(queue_dir: str, name: str, spec: dict[str, Any]) -> str:
+    """
+    Queue a scenario for a BatchServer, writing the job file atomically so the server never
+    reads it half written.
+
+    Args:
+        queue_dir: queue directory the server watches.
+        name: job name, also the name of its result file.
+        spec: options to change, as {section: {option: value}} or {option: value}.
+
+    Returns:
+        The path of the queued job file.
+    """
+
+    incoming = os.path.join(queue_dir, "incoming")
+    os.makedirs(incoming, exist_ok=True)
+    path = os.path.join(incoming, f"{name}.json")
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(spec, file)
+    os.replace(temporary, path)
+    return path
+
+
+def load_job(path: str, base: ScenarioConfig) -> ScenarioConfig:
+    """
+    Read a job file and apply its options on top of the server's base scenario. A job is either
+    an .ini file with the sections and options of sim_parameters.ini, or a .json file mapping
+    sections to options or bare option names to values.
+
+    Args:
+        path: job file.
+        base: simulation parameters of options the job does not set.
+
+    Returns:
+        The full scenario config of the job.
+    """
+
+    if path.endswith(".ini"):
+        parser = configparser.ConfigParser()
+        parser.read(path)
+        spec: dict[str, Any] = {
+            section: dict(parser[section]) for section in parser.sections()
+        }
+    else:
+        with open(path) as file:
+            spec = json.load(file)
+        if not isinstance(spec, dict):
+            raise ValueError(f"Job {path} is not a mapping of options")
+
+    point = {section: dict(options) for section, options in base.items()}
+    for name, value in spec.items():
+        entries = (
+            {f"{name}.{option}": item for option, item in value.items()}
+            if isinstance(value, dict)
+            else {name: value}
+        )
+        for entry, item in entries.items():
+            section, option = resolve_option(entry)
+            point.setdefault(section, {})[option] = str(item)
+    # reject values that do not parse before the job reaches a worker
+    config_from_dict(point)
+    return point
+
+
+class BatchServer:
+    """
+    Long-lived server running queued scenarios on a warm pool of worker processes, so a batch
+    of what-if runs pays interpreter start-up, imports and config parsing only once.
+
+    Clients drop job files into queue_dir/incoming, see submit_job and load_job. The server
+    claims a job by moving it to queue_dir/running and writes its statistics to
+    queue_dir/results/<job>.json, or the error to queue_dir/failed/<job>.json. Jobs still
+    running when a server stops are requeued when it restarts, so only one server should
+    watch a queue directory. Statistics are also stored in a SweepCache shared with
+    parameter sweeps, so a scenario that has been run before is answered without running it.
+
+    Args:
+        queue_dir: directory holding the incoming, running, results and failed directories.
+        base: simulation parameters of options jobs do not set.
+        run_point: picklable function running one scenario and returning its statistics.
+        cache: results store shared by every server and sweep.
+        max_workers: number of worker processes, defaults to the number of CPUs.
+        initializer: called once in every worker process before it runs jobs.
+    """
+
+    def __init__(
+        self,
+        queue_dir: str,
+        base: ScenarioConfig,
+        run_point: Callable[[ScenarioConfig], dict[str, float]],
+        cache: SweepCache,
+        max_workers: Optional[int] = None,
+        initializer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.base = base
+        self.run_point = run_point
+        self.cache = cache
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initializer = initializer
+
+        self.directories = {
+            name: os.path.join(queue_dir, name)
+            for name in ("incoming", "running", "results", "failed")
+        }
+        for directory in self.directories.values():
+            os.makedirs(directory, exist_ok=True)
+        self.jobs_done = 0
+
+    def requeue_interrupted(self) -> None:
+        """Move jobs left running by a server that stopped back to the incoming queue."""
+
+        for name in os.listdir(self.directories["running"]):
+            os.replace(
+                os.path.join(self.directories["running"], name),
+                os.path.join(self.directories["incoming"], name),
+            )
+
+    def claim_jobs(self, limit: int) -> list[str]:
+        """
+        Move up to limit queued jobs, oldest first, to the running directory.
+
+        Returns:
+            The paths of the claimed job files.
+        """
+
+        incoming = self.directories["incoming"]
+        names = [name for name in os.listdir(incoming) if name.endswith(JOB_SUFFIXES)]
+        names.sort(
+            key=lambda name: (os.path.getmtime(os.path.join(incoming, name)), name)
+        )
+
+        claimed = []
+        for name in names[:limit]:
+            running = os.path.join(self.directories["running"], name)
+            try:
+                os.replace(os.path.join(incoming, name), running)
+            except FileNotFoundError:
+                # withdrawn by the client
+                continue
+            claimed.append(running)
+        return claimed
+
+    def finish_job(
+        self,
+        path: str,
+        key: Optional[str],
+        point: Optional[ScenarioConfig],
+        statistics: Optional[dict[str, float]] = None,
+        error: Optional[BaseException] = None,
+        cached: bool = False,
+    ) -> None:
+        """Write the result or error of a job and remove it from the running directory."""
+
+        job = os.path.splitext(os.path.basename(path))[0]
+        if error is None:
+            directory = self.directories["results"]
+            payload = {
+                "job": job,
+                "key": key,
+                "config": point,
+                "statistics": statistics,
+                "cached": cached,
+            }
+            logger.info(f"Finished job {job}.\n")
+        else:
+            directory = self.directories["failed"]
+            payload = {"job": job, "config": point, "error": repr(error)}
+            logger.info(f"Job {job} failed: {error!r}\n")
+
+        result_path = os.path.join(directory, f"{job}.json")
+        temporary = f"{result_path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(payload, file)
+        os.replace(temporary, result_path)
+        os.remove(path)
+        self.jobs_done += 1
+
+    def serve(self, poll_interval: float = 1.0, once: bool = False) -> int:
+        """
+        Run queued jobs until interrupted, keeping every worker busy and picking up new jobs as
+        they arrive.
+
+        Args:
+            poll_interval: seconds between checks of the incoming directory while idle.
+            once: return once the queue is empty and every job has finished.
+
+        Returns:
+            The number of jobs finished.
+        """
+
+        self.requeue_interrupted()
+        logger.info(
+            f"Serving jobs from {self.directories['incoming']} with {self.max_workers} workers.\n"
+        )
+        pending: dict[Future, tuple[str, str, ScenarioConfig]] = {}
+        with ProcessPoolExecutor(
+            self.max_workers, initializer=self.initializer
+        ) as executor:
+            while True:
+                # keep a job queued behind every busy worker so none of them idles
+                for path in self.claim_jobs(2 * self.max_workers - len(pending)):
+                    try:
+                        point = load_job(path, self.base)
+                        key = scenario_key(point)
+                    except Exception as error:
+                        # whatever is wrong with a job, fail it rather than the server, which
+                        # would otherwise requeue and trip over it again on every restart
+                        self.finish_job(path, None, None, error=error)
+                        continue
+                    statistics = self.cache.get(key)
+                    if statistics is not None:
+                        self.finish_job(path, key, point, statistics, cached=True)
+                        continue
+                    future = executor.submit(self.run_point, point)
+                    pending[future] = (path, key, point)
+
+                if not pending:
+                    if once:
+                        return self.jobs_done
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(pending, poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, key, point = pending.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        self.finish_job(path, key, point, error=error)
+                        continue
+                    statistics = future.result()
+                    self.cache.put(key, point, statistics)
+                    self.finish_job(path, key, point, statistics)
@@ -0,0 +1,162 @@
+import io
+import logging
+import os
+import pickle
+import random
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# bump when a change to the simulator makes older checkpoints unreadable
+CHECKPOINT_VERSION = 6
+CHECKPOINT_MAGIC = b"VASTCKPT"
+
+
+class _StatePickler(pickle.Pickler):
+    """Pickles references to the random module, the default generator, by name."""
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        return "random" if obj is random else None
+
+
+class _StateUnpickler(pickle.Unpickler):
+    """Resolves the references written by _StatePickler."""
+
+    def persistent_load(self, pid: str) -> Any:
+        if pid == "random":
+            return random
+        raise pickle.UnpicklingError(f"Unknown persistent id {pid}")
+
+
+def capture_state(coordinator: Any, time_step: int) -> bytes:
+    """
+    Serialize everything a run needs to continue bit-exactly: the trucks, mines and stations
+    with their queues, timers and counters, the coordinator's bookkeeping and random number
+    generator, and the state of the random module. Runs in the calling thread
+    so the snapshot is consistent, leaving compression and writing to a CheckpointWriter.
+    An attached telemetry recorder is flushed so the trace can continue from the same chunk.
+
+    Args:
+        coordinator: the MiningCoordinator or VectorizedFleet being simulated.
+        time_step: simulated minutes elapsed.
+
+    Returns:
+        The pickled state.
+    """
+
+    recorder = coordinator.recorder
+    telemetry_chunk = None
+    if recorder is not None:
+        recorder.flush()
+        telemetry_chunk = recorder.next_chunk
+    # attached telemetry recorders, profilers and publishers belong to the process, not to the
+    # simulated state
+    profiler = coordinator.profiler
+    publisher = coordinator.publisher
+    coordinator.recorder = coordinator.profiler = coordinator.publisher = None
+    try:
+        buffer = io.BytesIO()
+        _StatePickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(
+            {
+                "time_step": time_step,
+                "coordinator": coordinator,
+                "random_state": random.getstate(),
+                "telemetry_chunk": telemetry_chunk,
+            }
+        )
+        return buffer.getvalue()
+    finally:
+        coordinator.recorder = recorder
+        coordinator.profiler = profiler
+        coordinator.publisher = publisher
+
+
+def write_checkpoint(path: str, state: bytes) -> None:
+    """Compress a captured state and write it to path, replacing the file atomically."""
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(CHECKPOINT_MAGIC)
+        file.write(CHECKPOINT_VERSION.to_bytes(2, "little"))
+        file.write(zlib.compress(state, 1))
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path: str) -> dict[str, Any]:
+    """
+    Read a checkpoint and restore the random module state it recorded.
+
+    Args:
+        path: file written by write_checkpoint.
+
+    Returns:
+        The time_step and coordinator to continue the run from, and the telemetry_chunk to
+        continue its trace from if it was recorded.
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+    header = len(CHECKPOINT_MAGIC)
+    if data[:header] != CHECKPOINT_MAGIC:
+        raise ValueError(f"{path} is not a simulation checkpoint")
+    version = int.from_bytes(data[header : header + 2], "little")
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(
+            f"Checkpoint {path} has version {version}, expected {CHECKPOINT_VERSION}"
+        )
+
+    state = _StateUnpickler(io.BytesIO(zlib.decompress(data[header + 2 :]))).load()
+    random.setstate(state["random_state"])
+    return state
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints on a background thread so compressing and saving a large state does not
+    stall the simulation. At most one write is in flight; saving again first waits for it.
+
+    Args:
+        path: file every checkpoint overwrites.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending: Optional[Future] = None
+
+    def __enter__(self) -> "CheckpointWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def save(self, coordinator: Any, time_step: int) -> None:
+        """
+        Capture the state of a run and write it in the background.
+
+        Args:
+            coordinator: the MiningCoordinator or VectorizedFleet being simulated.
+            time_step: simulated minutes elapsed.
+        """
+
+        state = capture_state(coordinator, time_step)
+        self.wait()
+        self._pending = self._executor.submit(write_checkpoint, self.path, state)
+        logger.info(f"Checkpointing at {time_step} minutes to {self.path}\n")
+
+    def wait(self) -> None:
+        """Block until the last checkpoint is written, raising any error writing it."""
+
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def close(self) -> None:
+        """Finish writing the last checkpoint and stop the background thread."""
+
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
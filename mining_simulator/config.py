@@ -0,0 +1,277 @@
+import configparser
+import dataclasses
+import functools
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+# sim_parameters.ini shipped next to the mining_simulator package
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sim_parameters.ini"
+)
+CONFIG_PATH_VARIABLE = "VAST_SIM_CONFIG"
+# environment variables overriding single options, e.g. VAST_SIM_NUM_TRUCKS=100
+ENV_PREFIX = "VAST_SIM_"
+
+
+@dataclass(frozen=True)
+class SimConfig:
+    """
+    Immutable, typed view of the simulation parameters. Parsed once with load_config and shared
+    by the simulator, coordinator and every truck, mine and unloading station. Field names match
+    the option names in sim_parameters.ini.
+    """
+
+    __slots__ = (
+        "num_trucks",
+        "num_stations",
+        "sim_duration_hours",
+        "sim_step_minutes",
+        "engine",
+        "station_policy",
+        "mine_policy",
+        "seed",
+        "num_replications",
+        "max_workers",
+        "unload_time_minutes",
+        "travel_time_minutes",
+        "truck_classes_file",
+        "min_mining_time_hours",
+        "max_mining_time_hours",
+        "mining_time_distribution",
+        "mining_time_mode_hours",
+        "mining_time_file",
+        "network_file",
+        "network_cache_dir",
+        "schedule_file",
+        "num_regions",
+        "region_sync_hours",
+        "transfer_probability",
+        "verbose",
+        "report_top_trucks",
+        "telemetry_directory",
+        "telemetry_buffer_mb",
+        "live_socket",
+        "live_batch_steps",
+        "checkpoint_path",
+        "checkpoint_interval_hours",
+        "profile_phases",
+        "cprofile_window_hours",
+        "cprofile_output",
+    )
+
+    num_trucks: int
+    num_stations: int
+    sim_duration_hours: int
+    sim_step_minutes: int
+    engine: str
+    station_policy: str
+    mine_policy: str
+    seed: Optional[int]
+    num_replications: int
+    max_workers: int
+    unload_time_minutes: int
+    travel_time_minutes: int
+    truck_classes_file: Optional[str]
+    min_mining_time_hours: int
+    max_mining_time_hours: int
+    mining_time_distribution: str
+    mining_time_mode_hours: Optional[float]
+    mining_time_file: Optional[str]
+    network_file: Optional[str]
+    network_cache_dir: str
+    schedule_file: Optional[str]
+    num_regions: int
+    region_sync_hours: int
+    transfer_probability: float
+    verbose: bool
+    report_top_trucks: int
+    telemetry_directory: Optional[str]
+    telemetry_buffer_mb: int
+    live_socket: Optional[str]
+    live_batch_steps: int
+    checkpoint_path: Optional[str]
+    checkpoint_interval_hours: int
+    profile_phases: bool
+    cprofile_window_hours: Optional[str]
+    cprofile_output: str
+
+    def __reduce__(self):
+        """Pickle by value, a frozen slotted instance cannot have its state set after creation."""
+
+        return SimConfig, tuple(getattr(self, name) for name in self.__slots__)
+
+    def replace(self, **changes) -> "SimConfig":
+        """Returns a copy of the config with some fields changed."""
+
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self) -> dict[str, dict[str, str]]:
+        """Returns the config as sections and options of sim_parameters.ini, as strings."""
+
+        sections: dict[str, dict[str, str]] = {}
+        for name, (section, _, _) in OPTIONS.items():
+            value = getattr(self, name)
+            if value is not None:
+                sections.setdefault(section, {})[name] = str(value)
+        return sections
+
+
+def _parse_optional_int(value: str) -> Optional[int]:
+    return int(value) if value.strip() else None
+
+
+def _parse_optional_float(value: str) -> Optional[float]:
+    return float(value) if value.strip() else None
+
+
+def _parse_optional_str(value: str) -> Optional[str]:
+    return value.strip() or None
+
+
+def _parse_bool(value: str) -> bool:
+    try:
+        return configparser.ConfigParser.BOOLEAN_STATES[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Not a boolean: {value}") from None
+
+
+_REQUIRED = object()
+
+# field name: (section, parser, fallback used when the option is missing)
+OPTIONS = {
+    "num_trucks": ("sim", int, _REQUIRED),
+    "num_stations": ("sim", int, _REQUIRED),
+    "sim_duration_hours": ("sim", int, _REQUIRED),
+    "sim_step_minutes": ("sim", int, _REQUIRED),
+    "engine": ("sim", str, "stepped"),
+    "station_policy": ("unloading", str, "shortest_wait"),
+    "mine_policy": ("mining", str, "shortest_queue"),
+    "seed": ("sim", _parse_optional_int, None),
+    "num_replications": ("replication", int, 1),
+    "max_workers": ("replication", int, 0),
+    "unload_time_minutes": ("unloading", int, _REQUIRED),
+    "travel_time_minutes": ("truck", int, _REQUIRED),
+    "truck_classes_file": ("truck", _parse_optional_str, None),
+    "min_mining_time_hours": ("mining", int, _REQUIRED),
+    "max_mining_time_hours": ("mining", int, _REQUIRED),
+    "mining_time_distribution": ("mining", str, "uniform"),
+    "mining_time_mode_hours": ("mining", _parse_optional_float, None),
+    "mining_time_file": ("mining", _parse_optional_str, None),
+    "network_file": ("network", _parse_optional_str, None),
+    "network_cache_dir": ("network", str, ".network_cache"),
+    "schedule_file": ("schedule", _parse_optional_str, None),
+    "num_regions": ("regions", int, 1),
+    "region_sync_hours": ("regions", int, 1),
+    "transfer_probability": ("regions", float, 0.0),
+    "verbose": ("misc", _parse_bool, False),
+    "report_top_trucks": ("misc", int, 0),
+    "telemetry_directory": ("telemetry", _parse_optional_str, None),
+    "telemetry_buffer_mb": ("telemetry", int, 64),
+    "live_socket": ("live", _parse_optional_str, None),
+    "live_batch_steps": ("live", int, 12),
+    "checkpoint_path": ("checkpoint", _parse_optional_str, None),
+    "checkpoint_interval_hours": ("checkpoint", int, 24),
+    "profile_phases": ("profiling", _parse_bool, False),
+    "cprofile_window_hours": ("profiling", _parse_optional_str, None),
+    "cprofile_output": ("profiling", str, "simulation.prof"),
+}
+
+
+def resolve_field(name: str) -> str:
+    """
+    Returns the config field of an option given as section.option or as a bare option name.
+
+    Args:
+        name: option name, e.g. sim.num_stations or num_stations.
+    """
+
+    section, _, option = name.rpartition(".")
+    if option not in OPTIONS or (section and OPTIONS[option][0] != section):
+        raise ValueError(f"Unknown simulation parameter {name}")
+    return option
+
+
+def config_from_dict(
+    sections: Mapping[str, Mapping[str, str]],
+    overrides: Optional[Mapping[str, str]] = None,
+) -> SimConfig:
+    """
+    Build a SimConfig from sections and options of sim_parameters.ini.
+
+    Args:
+        sections: option values as strings, grouped by section.
+        overrides: option values taking precedence over sections, keyed by section.option
+            or bare option name.
+
+    Returns:
+        The parsed SimConfig.
+    """
+
+    raw = {}
+    for name, (section, _, _) in OPTIONS.items():
+        if name in sections.get(section, {}):
+            raw[name] = sections[section][name]
+    for name, value in (overrides or {}).items():
+        raw[resolve_field(name)] = value
+
+    values = {}
+    for name, (section, parse, fallback) in OPTIONS.items():
+        if name in raw:
+            values[name] = parse(raw[name])
+        elif fallback is _REQUIRED:
+            raise ValueError(f"Missing simulation parameter {section}.{name}")
+        else:
+            values[name] = fallback
+    return SimConfig(**values)
+
+
+def load_config(
+    path: Optional[str] = None,
+    overrides: Optional[Mapping[str, str]] = None,
+    environ: Optional[Mapping[str, str]] = None,
+) -> SimConfig:
+    """
+    Parse the simulation parameters. The file is the one named by VAST_SIM_CONFIG, otherwise
+    ./sim_parameters.ini if there is one, otherwise the sim_parameters.ini shipped with the simulator.
+    Environment variables such as VAST_SIM_NUM_TRUCKS override the file and explicit overrides
+    take precedence over both.
+
+    Args:
+        path: parameter file to read instead of the default one.
+        overrides: option values keyed by section.option or bare option name.
+        environ: environment to read overrides from, defaults to os.environ.
+
+    Returns:
+        The parsed SimConfig.
+    """
+
+    environ = os.environ if environ is None else environ
+    if path is None:
+        path = environ.get(CONFIG_PATH_VARIABLE)
+    if path is None:
+        path = (
+            "./sim_parameters.ini"
+            if os.path.exists("./sim_parameters.ini")
+            else DEFAULT_CONFIG_PATH
+        )
+
+    parameters = configparser.ConfigParser()
+    if not parameters.read(path):
+        raise FileNotFoundError(f"Simulation parameters not found at {path}")
+
+    merged = {
+        name: environ[f"{ENV_PREFIX}{name.upper()}"]
+        for name in OPTIONS
+        if f"{ENV_PREFIX}{name.upper()}" in environ
+    }
+    merged.update(overrides or {})
+    sections = {section: dict(parameters[section]) for section in parameters.sections()}
+    return config_from_dict(sections, merged)
+
+
+@functools.lru_cache(maxsize=None)
+def default_config() -> SimConfig:
+    """Returns the default SimConfig, parsed only once per process."""
+
+    return load_config()
@@ -1,7 +1,20 @@
 import logging
+import random
+from typing import Optional
 
+from mining_simulator import trace
+from mining_simulator.config import SimConfig, default_config
+from mining_simulator.dispatch import mine_policy, station_policy
+from mining_simulator.live import LivePublisher
 from mining_simulator.mining_site import MiningSite
 from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.network import network_router
+from mining_simulator.profiling import PhaseProfiler
+from mining_simulator.sampling import mining_time_sampler
+from mining_simulator.schedule import MINE, STATION, Schedule, schedule
+from mining_simulator.statistics import output_top_k
+from mining_simulator.telemetry import TelemetryRecorder
+from mining_simulator.truck_classes import truck_classes
 from mining_simulator.unloading_station import UnloadStation
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -11,17 +24,79 @@ class MiningCoordinator:
     """
     Top-level coordinator to manage all instances of mining trucks, unloading stations, and mines.
     Has each mine and unloading station manager their queues and add trucks to queues when in the
-    appropriate state. Finally moves the state forwards by one time step.
+    appropriate state. Finally moves the state forwards by one time step. If a TelemetryRecorder
+    is attached through the recorder attribute, the state after every time step is recorded, and
+    with a PhaseProfiler attached through the profiler attribute each phase is timed. A
+    LivePublisher attached through the publisher attribute streams the changes to subscribers.
+
+    Arriving trucks are sent to the mine and unloading station picked by the dispatch policies
+    named by mine_policy and station_policy in the config, see mining_simulator.dispatch. By
+    default, the free mine and the station with the shortest current wait time that come first.
+    The coordinator tells the policies whenever it changes a queue, so they can keep an index
+    instead of scanning every mine and station. With a site graph configured through
+    network_file, a NetworkRouter books every truck at its next mine or station when it leaves
+    its current one instead, see mining_simulator.network.
+
+    With a schedule configured through schedule_file, stations, mines and trucks become
+    unavailable during their windows, see mining_simulator.schedule. Closed stations and mines
+    take no arriving trucks but finish serving the ones they hold, and trucks in maintenance are
+    not sent to a mine. Trucks that cannot be dispatched idle where they are and try again at
+    the next time step.
+
+    Mines and unloading stations are numbered densely from zero, so their id is their position
+    in mining_sites and unloading_stations. Trucks are numbered from first_truck_id, letting the
+    regions of a ShardedCoordinator number their trucks densely across the whole scenario. The
+    truck classes of the config are assigned by truck id, see TruckClasses.assign.
 
     Args:
         num_trucks: number of MiningTruck instances to create.
         num_stations: number of UnloadingStation instances to create.
+        rng: random number generator seeding the mining time sampler shared by the mines and
+            used by randomized dispatch policies, defaults to the random module.
+        config: simulation parameters shared by every instance, defaults to the parsed
+            sim_parameters.ini.
+        first_truck_id: id of the first truck.
     """
 
-    def __init__(self, num_trucks: int, num_stations: int) -> None:
-        self.unloading_stations = [UnloadStation() for _ in range(num_stations)]
-        self.trucks = [MiningTruck() for _ in range(num_trucks)]
-        self.mining_sites = [MiningSite() for _ in range(num_trucks)]
+    def __init__(
+        self,
+        num_trucks: int,
+        num_stations: int,
+        rng: Optional[random.Random] = None,
+        config: Optional[SimConfig] = None,
+        first_truck_id: int = 0,
+    ) -> None:
+        self.config = config if config is not None else default_config()
+        self.unloading_stations = [
+            UnloadStation(self.config, station_id) for station_id in range(num_stations)
+        ]
+        classes = truck_classes(self.config)
+        self.trucks = [
+            MiningTruck(self.config, first_truck_id + index, classes[class_index])
+            for index, class_index in enumerate(
+                classes.assign(first_truck_id, num_trucks).tolist()
+            )
+        ]
+        self.sampler = mining_time_sampler(self.config, rng)
+        self.mining_sites = [
+            MiningSite(self.sampler, self.config, mine_id)
+            for mine_id in range(num_trucks)
+        ]
+
+        self.recorder: Optional[TelemetryRecorder] = None
+        self.profiler: Optional[PhaseProfiler] = None
+        self.publisher: Optional[LivePublisher] = None
+
+        self.station_policy = station_policy(self.unloading_stations, self.config, rng)
+        self.mine_policy = mine_policy(self.mining_sites, self.config)
+        self.router = network_router(
+            self.config, self.unloading_stations, len(self.mining_sites)
+        )
+        self.schedule: Optional[Schedule] = schedule(
+            self.config, num_stations, len(self.mining_sites), num_trucks
+        )
+        if self.schedule is not None and self.router is not None:
+            raise ValueError("Schedules are not supported with site graphs")
 
     def time_step(self) -> None:
         """
@@ -30,33 +105,318 @@ class MiningCoordinator:
         on state.
         """
 
+        if self.schedule is not None:
+            self.apply_schedule(self.schedule)
+        if self.profiler is not None:
+            self.profiled_time_step(self.profiler)
+        else:
+            for mine in self.mining_sites:
+                self.manage_mining_site(mine)
+            for station in self.unloading_stations:
+                self.manage_unloading_station(station)
+
+            for truck in self.trucks:
+                self.dispatch_truck(truck)
+            if self.schedule is not None:
+                self.move_scheduled_trucks()
+            else:
+                for truck in self.trucks:
+                    truck.take_action()
+                    # print(truck)
+        if self.recorder is not None:
+            self.recorder.record_coordinator(self)
+        if self.publisher is not None:
+            self.publisher.record_coordinator(self)
+
+    def profiled_time_step(self, profiler: PhaseProfiler) -> None:
+        """
+        Same phases as time_step, timing each of them and counting the mines freed, trucks
+        unloaded and trucks dispatched.
+
+        Args:
+            profiler: the PhaseProfiler to accumulate into.
+        """
+
+        start = profiler.start_tick()
+        mining = sum(len(mine.queue) for mine in self.mining_sites)
         for mine in self.mining_sites:
-            mine.manage_queue()
+            self.manage_mining_site(mine)
+        mines_freed = mining - sum(len(mine.queue) for mine in self.mining_sites)
+        start = profiler.lap("mines", start)
+
+        # every finished unload records its wait, whatever the truck's payload
+        finished = sum(station.wait_times.count for station in self.unloading_stations)
         for station in self.unloading_stations:
-            station.manage_queue()
+            self.manage_unloading_station(station)
+        unloads = (
+            sum(station.wait_times.count for station in self.unloading_stations)
+            - finished
+        )
+        start = profiler.lap("stations", start)
 
+        dispatches = 0
         for truck in self.trucks:
-            if (
-                truck.current_action == truck.Actions.TRAVEL_TO_UNLOAD
-                and truck.timer == 0
-            ):
-                station = min(self.unloading_stations)
-                logger.debug(f"adding truck {truck.id} to station {station.id}")
-                station.add_truck_to_queue(truck)
-            elif (
-                truck.current_action == truck.Actions.TRAVEL_TO_MINE
-                and truck.timer == 0
+            if truck.timer == 0 and truck.current_action in (
+                truck.Actions.TRAVEL_TO_UNLOAD,
+                truck.Actions.TRAVEL_TO_MINE,
             ):
-                mine = min(self.mining_sites)
-                logger.debug(f"adding truck {truck.id} to mine {mine.id}")
-                mine.add_truck_to_queue(truck)
+                dispatches += 1
+                self.dispatch_truck(truck)
+        start = profiler.lap("dispatch", start)
+
+        if self.schedule is not None:
+            self.move_scheduled_trucks()
+        else:
+            for truck in self.trucks:
+                truck.take_action()
+        profiler.lap("trucks", start)
+        profiler.end_tick(mines_freed, unloads, dispatches)
+
+    def apply_schedule(self, schedule: Schedule) -> None:
+        """
+        Open and close the stations, mines and trucks whose scheduled availability changes at
+        the coming time step, letting the dispatch policies know.
+
+        Args:
+            schedule: the coordinator's Schedule.
+        """
+
+        for kind, position, available in schedule.advance():
+            if kind == STATION:
+                self.unloading_stations[position].available = available
+                self.station_policy.update(position)
+            elif kind == MINE:
+                self.mining_sites[position].available = available
+                self.mine_policy.update(position)
+            else:
+                self.trucks[position].available = available
+            if __debug__ and trace.enabled:
+                trace.event(
+                    logger,
+                    "schedule",
+                    "%(kind)s %(position)d is now %(state)s",
+                    kind=("Station", "Mine", "Truck")[kind],
+                    position=position,
+                    state="available" if available else "unavailable",
+                )
+
+    def move_scheduled_trucks(self) -> None:
+        """
+        Progress every truck's state machine as time_step does, except for trucks that arrived
+        but could not be dispatched, which idle where they are instead.
+        """
+
         for truck in self.trucks:
-            truck.take_action()
-            # print(truck)
+            if truck.timer == 0 and (
+                truck.current_action == truck.Actions.TRAVEL_TO_UNLOAD
+                or truck.current_action == truck.Actions.TRAVEL_TO_MINE
+            ):
+                truck.hold()
+            else:
+                truck.take_action()
+
+    def dispatch_truck(self, truck: MiningTruck) -> None:
+        """
+        Hand a truck that has just arrived at its destination over to the unloading station or
+        mine picked by the dispatch policies. Trucks that are still underway are left untouched,
+        as are trucks in maintenance arriving at a mine and trucks finding every open station
+        or mine taken.
+
+        Args:
+            truck: an instance of a MiningTruck.
+        """
+
+        if truck.timer != 0:
+            return
+        if truck.current_action == truck.Actions.TRAVEL_TO_UNLOAD:
+            station = self.select_unloading_station(truck)
+            if station.available:
+                self.assign_unloading_station(truck, station)
+        elif truck.current_action == truck.Actions.TRAVEL_TO_MINE:
+            if not truck.available:
+                return
+            mine = self.select_mining_site(truck)
+            if mine.available and not mine.queue:
+                self.assign_mining_site(truck, mine)
+
+    def assign_unloading_station(
+        self, truck: MiningTruck, station: Optional[UnloadStation] = None
+    ) -> UnloadStation:
+        """
+        Add a truck to the unloading station picked by the station policy.
+
+        Args:
+            truck: an instance of a MiningTruck.
+            station: station already picked for the truck with select_unloading_station.
+
+        Returns:
+            The UnloadStation the truck was queued at.
+        """
+
+        if station is None:
+            station = self.select_unloading_station(truck)
+        if __debug__ and trace.enabled:
+            trace.event(
+                logger,
+                "assign_station",
+                "adding truck %(truck)d to station %(station)d",
+                truck=truck.id,
+                station=station.id,
+            )
+        station.add_truck_to_queue(truck)
+        self.station_policy.update(station.id)
+        return station
 
-    def output_truck_statistics(self) -> None:
-        """Sort trucks by quantity He-3 mined in descending order and log statistics."""
+    def assign_mining_site(
+        self, truck: MiningTruck, mine: Optional[MiningSite] = None
+    ) -> MiningSite:
+        """
+        Add a truck to the mining site picked by the mine policy.
+
+        Args:
+            truck: an instance of a MiningTruck.
+            mine: mine already picked for the truck with select_mining_site.
+
+        Returns:
+            The MiningSite the truck was sent to.
+        """
+
+        if mine is None:
+            mine = self.select_mining_site(truck)
+        if __debug__ and trace.enabled:
+            trace.event(
+                logger,
+                "assign_mine",
+                "adding truck %(truck)d to mine %(mine)d",
+                truck=truck.id,
+                mine=mine.id,
+            )
+        mine.add_truck_to_queue(truck)
+        self.mine_policy.update(mine.id)
+        return mine
+
+    def manage_mining_site(self, mine: MiningSite) -> None:
+        """
+        Have a mine manage its queue and mark it as free once its truck has left, letting the
+        station policy know the truck is on its way to unload.
+
+        Args:
+            mine: an instance of a MiningSite.
+        """
+
+        truck = mine.queue[0] if mine.queue else None
+        mine.manage_queue()
+        if truck is not None and not mine.queue:
+            self.mine_policy.update(mine.id)
+            if self.router is not None:
+                self.router.depart_mine(truck, mine.id)
+            else:
+                self.station_policy.reserve(truck)
+
+    def manage_unloading_station(self, station: UnloadStation) -> None:
+        """
+        Have an unloading station manage its queue and let the station policy know if its wait
+        time changed.
+
+        Args:
+            station: an instance of an UnloadStation.
+        """
+
+        wait_time = station.current_wait_time
+        front = station.queue[0] if station.queue else None
+        station.manage_queue()
+        if station.current_wait_time != wait_time:
+            self.station_policy.update(station.id)
+            if self.router is not None and front is not None:
+                if not station.queue or station.queue[0] is not front:
+                    self.router.depart_station(front, station.id)
+
+    def select_unloading_station(
+        self, truck: Optional[MiningTruck] = None
+    ) -> UnloadStation:
+        """
+        Returns the unloading station the station policy picks for a truck, or the one the
+        router booked it at. With the default policy, the station with the shortest current
+        wait time, ties going to the station that comes first, the same as
+        min(self.unloading_stations).
+
+        Args:
+            truck: the arriving truck, if known.
+        """
+
+        if self.router is not None and truck is not None:
+            position = self.router.arrive_station(truck)
+            if position is not None:
+                return self.unloading_stations[position]
+        return self.unloading_stations[self.station_policy.select(truck)]
+
+    def select_mining_site(self, truck: Optional[MiningTruck] = None) -> MiningSite:
+        """
+        Returns the mining site the mine policy picks for a truck, or the one the router booked
+        it at. With the default policy, the free mine that comes first, the same as
+        min(self.mining_sites).
+
+        Args:
+            truck: the arriving truck, if known.
+        """
+
+        if self.router is not None and truck is not None:
+            return self.mining_sites[self.router.arrive_mine(truck)]
+        return self.mining_sites[self.mine_policy.select(truck)]
+
+    def add_truck(self, truck: MiningTruck) -> None:
+        """
+        Take over a truck from another coordinator, adding a mine for it if every mine has a
+        truck of its own. The truck keeps its state and timer.
+
+        Args:
+            truck: an instance of a MiningTruck.
+        """
+
+        self.trucks.append(truck)
+        if len(self.mining_sites) < len(self.trucks):
+            mine = MiningSite(self.sampler, self.config, len(self.mining_sites))
+            self.mining_sites.append(mine)
+            self.mine_policy.update(mine.id)
+
+    def remove_truck(self, truck: MiningTruck) -> None:
+        """
+        Hand a truck over to another coordinator. Only trucks on their way back to a mine, in no
+        queue and booked at no station, can leave. Its mine stays behind, free for the
+        remaining trucks.
+
+        Args:
+            truck: an instance of a MiningTruck.
+        """
+
+        if truck.current_action != truck.Actions.TRAVEL_TO_MINE or any(
+            station.queue and station.queue[0] is truck
+            for station in self.unloading_stations
+        ):
+            raise ValueError(f"Truck {truck.id} is not travelling to a mine")
+        self.trucks.remove(truck)
+
+    def rebuild_dispatch_indexes(self) -> None:
+        """Rebuild the dispatch policies' indexes after queues were changed behind their back."""
+
+        self.station_policy.rebuild()
+        self.mine_policy.rebuild()
+
+    def output_truck_statistics(self, top_k: int = 0) -> None:
+        """
+        Log statistics of every truck by quantity He-3 mined in descending order, or only of
+        the top_k trucks that mined the most and the least.
+        """
 
+        if top_k > 0:
+            output_top_k(
+                self.trucks,
+                top_k,
+                lambda truck: truck.units_mined,
+                "trucks that mined the {} He-3",
+                MiningTruck.output_statistics,
+            )
+            return
         sorted_trucks = sorted(
             self.trucks, key=lambda truck: truck.units_mined, reverse=True
         )
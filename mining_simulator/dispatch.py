@@ -0,0 +1,294 @@
+import heapq
+import random
+import sys
+from typing import Any, Callable, Optional, Sequence
+
+from mining_simulator.config import SimConfig
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.truck_classes import truck_classes
+
+# load of a site closed by its schedule, never picked while another site is open
+CLOSED_LOAD = sys.maxsize
+
+
+def wait_time(site: Any) -> int:
+    """Load of an unloading station: the unloading time of every truck in its queue."""
+
+    return site.current_wait_time if site.available else CLOSED_LOAD
+
+
+def queue_length(site: Any) -> int:
+    """Load of a mine or unloading station: the number of trucks in its queue."""
+
+    return len(site.queue) if site.available else CLOSED_LOAD
+
+
+class DispatchPolicy:
+    """
+    Rule picking the mine or unloading station an arriving truck is sent to. The coordinator
+    calls select when a truck arrives, update whenever it changes the queue of a site and
+    reserve when a truck leaves its mine for the unloading stations. Policies keep whatever
+    index they need up to date from those calls, so picking a site does not scan every site.
+
+    Args:
+        sites: the mines or unloading stations to choose from, in coordinator order.
+        load: function returning how busy a site is, lower is better.
+        rng: random number generator for randomized policies, defaults to the random module.
+        capacity: sites with at least this load are never picked while another site has room.
+    """
+
+    def __init__(
+        self,
+        sites: Sequence[Any],
+        load: Callable[[Any], int],
+        rng: Optional[random.Random] = None,
+        capacity: Optional[int] = None,
+    ) -> None:
+        self.sites = sites
+        self.load = load
+        self.rng = rng if rng is not None else random
+        self.capacity = capacity
+
+    def select(self, truck: Optional[MiningTruck] = None) -> int:
+        """
+        Returns the position of the site to send a truck to. Randomized and stateful policies
+        move on with every call, so call it once per truck.
+
+        Args:
+            truck: the arriving truck, if known.
+        """
+
+        raise NotImplementedError
+
+    def update(self, position: int) -> None:
+        """Note that the load of the site at position has changed."""
+
+    def reserve(self, truck: MiningTruck) -> None:
+        """Note that a truck has left its mine and will arrive at the unloading stations."""
+
+    def rebuild(self) -> None:
+        """Rebuild the index from every site, after queues were changed behind the policy's back."""
+
+
+class LeastLoadedPolicy(DispatchPolicy):
+    """
+    Sends trucks to the site with the lowest load, ties going to the site that comes first, the
+    same as min over the sites. Keeps a min-heap of (load, position) entries that is pushed to
+    whenever a site's load changes. Stale entries are discarded when they reach the top.
+    """
+
+    def __init__(
+        self,
+        sites: Sequence[Any],
+        load: Callable[[Any], int],
+        rng: Optional[random.Random] = None,
+        capacity: Optional[int] = None,
+    ) -> None:
+        super().__init__(sites, load, rng, capacity)
+        self._heap: list[tuple[int, int]] = []
+        self.rebuild()
+
+    def select(self, truck: Optional[MiningTruck] = None) -> int:
+        heap = self._heap
+        sites = self.sites
+        site_load = self.load
+        while heap:
+            load, position = heap[0]
+            if site_load(sites[position]) == load:
+                return position
+            heapq.heappop(heap)
+        # every entry was stale, the sites were changed behind the policy's back
+        self.rebuild()
+        return heap[0][1]
+
+    def update(self, position: int) -> None:
+        heapq.heappush(self._heap, (self.load(self.sites[position]), position))
+        if len(self._heap) > 4 * len(self.sites) + 16:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        self._heap[:] = [
+            (self.load(site), position) for position, site in enumerate(self.sites)
+        ]
+        heapq.heapify(self._heap)
+
+
+class RoundRobinPolicy(DispatchPolicy):
+    """
+    Sends trucks to each site in turn, skipping sites that are at capacity, regardless of how
+    busy the others are.
+    """
+
+    def __init__(
+        self,
+        sites: Sequence[Any],
+        load: Callable[[Any], int],
+        rng: Optional[random.Random] = None,
+        capacity: Optional[int] = None,
+    ) -> None:
+        super().__init__(sites, load, rng, capacity)
+        self.next_position = 0
+
+    def select(self, truck: Optional[MiningTruck] = None) -> int:
+        num_sites = len(self.sites)
+        position = self.next_position
+        if self.capacity is not None:
+            for _ in range(num_sites):
+                if self.load(self.sites[position]) < self.capacity:
+                    break
+                position = (position + 1) % num_sites
+        self.next_position = (position + 1) % num_sites
+        return position
+
+
+class PowerOfTwoPolicy(DispatchPolicy):
+    """
+    Samples two different sites at random and sends the truck to the less loaded one, ties
+    going to the site that comes first. Needs no index, so picking a site costs the same for any
+    number of sites, and in practice balances queues almost as well as the least loaded site.
+    When both samples are at capacity, e.g. closed by a schedule, every site is scanned for the
+    least loaded one instead.
+    """
+
+    def select(self, truck: Optional[MiningTruck] = None) -> int:
+        num_sites = len(self.sites)
+        if num_sites == 1:
+            return 0
+        first = self.rng.randrange(num_sites)
+        second = self.rng.randrange(num_sites - 1)
+        if second >= first:
+            second += 1
+        first, second = min(first, second), max(first, second)
+        first_load = self.load(self.sites[first])
+        second_load = self.load(self.sites[second])
+        position, load = (
+            (second, second_load) if second_load < first_load else (first, first_load)
+        )
+        if self.capacity is not None and load >= self.capacity:
+            return min(
+                range(num_sites), key=lambda position: self.load(self.sites[position])
+            )
+        return position
+
+
+class PredictedArrivalPolicy(LeastLoadedPolicy):
+    """
+    Picks an unloading station for a truck when it leaves its mine rather than when it arrives,
+    accounting for the trucks already on their way. A station's predicted wait is what is left
+    of its current wait time after the travel time, plus the unloading time of every truck
+    heading to it, taken from the truck's class. The truck then joins the station it was booked
+    at when it arrives. Trucks without a booking, e.g. at the start of a run, go to the station
+    with the lowest predicted wait.
+
+    Args:
+        travel_time_minutes: time trucks take from a mine to the unloading stations, the same
+            for every truck class.
+    """
+
+    def __init__(
+        self,
+        sites: Sequence[Any],
+        load: Callable[[Any], int],
+        rng: Optional[random.Random] = None,
+        capacity: Optional[int] = None,
+        travel_time_minutes: int = 0,
+    ) -> None:
+        self.station_load = load
+        self.travel_time_minutes = travel_time_minutes
+        # unloading minutes of the trucks heading to each station, by station id
+        self.booked_minutes: dict[int, int] = {}
+        # station position each truck on its way is booked at, by truck id
+        self.bookings: dict[int, int] = {}
+        super().__init__(sites, self.predicted_wait, rng, capacity)
+
+    def predicted_wait(self, site: Any) -> int:
+        """Returns the wait a truck leaving its mine now is predicted to find at a station."""
+
+        current = self.station_load(site) - self.travel_time_minutes
+        return max(current, 0) + self.booked_minutes.get(site.id, 0)
+
+    def select(self, truck: Optional[MiningTruck] = None) -> int:
+        position = self.bookings.pop(truck.id, None) if truck is not None else None
+        if position is None:
+            return super().select(truck)
+        # the station's wait time grows by as much once the truck joins its queue
+        self.booked_minutes[
+            self.sites[position].id
+        ] -= truck.truck_class.unload_time_minutes
+        return position
+
+    def reserve(self, truck: MiningTruck) -> None:
+        position = super().select(truck)
+        station_id = self.sites[position].id
+        self.bookings[truck.id] = position
+        self.booked_minutes[station_id] = (
+            self.booked_minutes.get(station_id, 0)
+            + truck.truck_class.unload_time_minutes
+        )
+        self.update(position)
+
+
+# station policies by name, selected with station_policy in sim_parameters.ini
+STATION_POLICIES = {
+    "shortest_wait": (LeastLoadedPolicy, wait_time),
+    "join_shortest_queue": (LeastLoadedPolicy, queue_length),
+    "round_robin": (RoundRobinPolicy, queue_length),
+    "power_of_two": (PowerOfTwoPolicy, wait_time),
+    "predicted_arrival": (PredictedArrivalPolicy, wait_time),
+}
+# mine policies by name, selected with mine_policy in sim_parameters.ini. A mine holds one
+# truck, so every policy only picks free mines.
+MINE_POLICIES = {
+    "shortest_queue": (LeastLoadedPolicy, queue_length),
+    "round_robin": (RoundRobinPolicy, queue_length),
+}
+
+
+def station_policy(
+    stations: Sequence[Any], config: SimConfig, rng: Optional[random.Random] = None
+) -> DispatchPolicy:
+    """
+    Returns the dispatch policy for unloading stations named by config.station_policy.
+
+    Args:
+        stations: the coordinator's unloading stations.
+        config: simulation parameters.
+        rng: random number generator for randomized policies.
+    """
+
+    if config.station_policy not in STATION_POLICIES:
+        raise ValueError(
+            f"Unknown station_policy {config.station_policy}, "
+            f"expected one of {', '.join(STATION_POLICIES)}"
+        )
+    policy_class, load = STATION_POLICIES[config.station_policy]
+    if policy_class is PredictedArrivalPolicy:
+        # predicted waits are kept in one index shared by every truck
+        travel_times = set(truck_classes(config).travel_time_minutes.tolist())
+        if len(travel_times) > 1:
+            raise ValueError(
+                "station_policy predicted_arrival needs every truck class to have the same "
+                "travel time"
+            )
+        return PredictedArrivalPolicy(
+            stations, load, rng, CLOSED_LOAD, travel_time_minutes=travel_times.pop()
+        )
+    return policy_class(stations, load, rng, CLOSED_LOAD)
+
+
+def mine_policy(mines: Sequence[Any], config: SimConfig) -> DispatchPolicy:
+    """
+    Returns the dispatch policy for mines named by config.mine_policy.
+
+    Args:
+        mines: the coordinator's mining sites.
+        config: simulation parameters.
+    """
+
+    if config.mine_policy not in MINE_POLICIES:
+        raise ValueError(
+            f"Unknown mine_policy {config.mine_policy}, "
+            f"expected one of {', '.join(MINE_POLICIES)}"
+        )
+    policy_class, load = MINE_POLICIES[config.mine_policy]
+    return policy_class(mines, load, capacity=1)
@@ -0,0 +1,306 @@
+import logging
+import math
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from mining_simulator.sweep import ScenarioConfig, SweepCache, grid_points, scenario_key
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# options estimates are interpolated over, every other option of a neighbour must match
+SIZE_OPTIONS = (("sim", "num_trucks"), ("sim", "num_stations"))
+
+# cached scenarios weighted into an estimate when no neighbours bracket the query
+NEAREST_NEIGHBOURS = 4
+
+Sizes = tuple[int, int]
+Statistics = dict[str, float]
+
+
+def family_key(config: ScenarioConfig) -> str:
+    """Returns a stable hash of the options of a scenario apart from its fleet size."""
+
+    return scenario_key(
+        {
+            section: {
+                option: value
+                for option, value in options.items()
+                if (section, option) not in SIZE_OPTIONS
+            }
+            for section, options in config.items()
+        }
+    )
+
+
+def scenario_sizes(config: ScenarioConfig) -> Sizes:
+    """Returns the number of trucks and stations of a scenario."""
+
+    return tuple(int(config[section][option]) for section, option in SIZE_OPTIONS)
+
+
+def check_sizes(num_trucks: int, num_stations: int) -> None:
+    """Reject fleet sizes without a truck or station, which no scenario can have."""
+
+    if num_trucks < 1 or num_stations < 1:
+        raise ValueError(
+            f"Fleet size needs at least one truck and station, got {num_trucks} trucks and "
+            f"{num_stations} stations"
+        )
+
+
+def interpolate_between(
+    known: dict[int, Statistics], value: int
+) -> Optional[Statistics]:
+    """
+    Linearly interpolate statistics known at some values of one parameter at another value.
+
+    Args:
+        known: statistics by parameter value.
+        value: value to interpolate at.
+
+    Returns:
+        The interpolated statistics, or None if value is not between two known values.
+    """
+
+    lower = max(
+        (known_value for known_value in known if known_value <= value), default=None
+    )
+    upper = min(
+        (known_value for known_value in known if known_value >= value), default=None
+    )
+    if lower is None or upper is None:
+        return None
+    if lower == upper:
+        return known[lower]
+    weight = (value - lower) / (upper - lower)
+    return {
+        metric: (1 - weight) * known[lower][metric] + weight * known[upper][metric]
+        for metric in known[lower]
+        if metric in known[upper]
+    }
+
+
+def interpolate(
+    known: dict[Sizes, Statistics], num_trucks: int, num_stations: int
+) -> Optional[Statistics]:
+    """
+    Estimate the statistics of a fleet size from those of cached fleet sizes. Statistics are
+    interpolated over the truck count within every cached station count and the results over the
+    station count, or the other way around. A fleet size outside the cached ones gets the
+    inverse distance weighted mean of its nearest cached neighbours, by relative distance.
+
+    Args:
+        known: statistics by number of trucks and stations.
+        num_trucks: number of trucks to estimate for.
+        num_stations: number of stations to estimate for.
+
+    Returns:
+        The estimated statistics, or None if nothing is known.
+    """
+
+    check_sizes(num_trucks, num_stations)
+    if not known:
+        return None
+    for axis in (0, 1):
+        value = (num_trucks, num_stations)[axis]
+        other = (num_stations, num_trucks)[axis]
+        lines: dict[int, dict[int, Statistics]] = {}
+        for sizes, statistics in known.items():
+            lines.setdefault(sizes[1 - axis], {})[sizes[axis]] = statistics
+        across = {}
+        for line, line_known in lines.items():
+            statistics = interpolate_between(line_known, value)
+            if statistics is not None:
+                across[line] = statistics
+        estimate = interpolate_between(across, other)
+        if estimate is not None:
+            return estimate
+
+    def distance(sizes: Sizes) -> float:
+        return math.hypot(
+            (sizes[0] - num_trucks) / num_trucks,
+            (sizes[1] - num_stations) / num_stations,
+        )
+
+    nearest = sorted(known, key=distance)[:NEAREST_NEIGHBOURS]
+    weights = [1 / distance(sizes) for sizes in nearest]
+    metrics = set.intersection(*(set(known[sizes]) for sizes in nearest))
+    return {
+        metric: sum(
+            weight * known[sizes][metric] for weight, sizes in zip(weights, nearest)
+        )
+        / sum(weights)
+        for metric in metrics
+    }
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """
+    Answer to a query of a ThroughputEstimator.
+
+    Args:
+        statistics: run statistics of the scenario, None if nothing close enough was cached.
+        exact: whether statistics come from a finished run of the scenario, rather than being
+            interpolated from cached neighbours.
+    """
+
+    statistics: Optional[Statistics]
+    exact: bool
+
+
+class ThroughputEstimator:
+    """
+    Answers what run statistics, such as the throughput and wait per unload, a number of trucks
+    and stations give, varying only the fleet size of a base scenario. Results come from a
+    SweepCache shared with sweeps and batch servers, so a scenario run before is answered at
+    once. On a miss the statistics are interpolated from cached scenarios that differ only in
+    their number of trucks and stations, see interpolate, and flagged as an estimate, while the
+    exact scenario runs in a background worker process and is stored in the cache for the next
+    query.
+
+    Args:
+        base: simulation parameters of options other than the fleet size.
+        run_point: picklable function running one scenario and returning its statistics.
+        cache: results store, bounded with max_entries to evict the least recently used.
+        max_workers: number of background worker processes.
+        initializer: called once in every worker process before it runs scenarios.
+    """
+
+    def __init__(
+        self,
+        base: ScenarioConfig,
+        run_point: Callable[[ScenarioConfig], Statistics],
+        cache: SweepCache,
+        max_workers: int = 1,
+        initializer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.base = base
+        self.run_point = run_point
+        self.cache = cache
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.family = family_key(base)
+
+        # statistics of cached scenarios of the base scenario's family, by fleet size
+        self.known: dict[Sizes, Statistics] = {}
+        self.indexed: dict[str, Optional[Sizes]] = {}
+        self.pending: dict[str, Future] = {}
+        self.lock = threading.Lock()
+        # notified whenever a background run has been cached
+        self.idle = threading.Condition(self.lock)
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ThroughputEstimator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def scenario(self, num_trucks: int, num_stations: int) -> ScenarioConfig:
+        """Returns the base scenario with the given number of trucks and stations."""
+
+        return grid_points(
+            self.base,
+            {
+                SIZE_OPTIONS[0]: [str(num_trucks)],
+                SIZE_OPTIONS[1]: [str(num_stations)],
+            },
+        )[0]
+
+    def refresh(self) -> None:
+        """
+        Index the scenarios cached since the last refresh, including those stored by sweeps,
+        batch servers and other estimators, and forget the ones evicted since.
+        """
+
+        keys = set(self.cache.keys())
+        with self.lock:
+            for key in set(self.indexed) - keys:
+                sizes = self.indexed.pop(key)
+                if sizes is not None:
+                    self.known.pop(sizes, None)
+            new = keys - set(self.indexed)
+        for key in new:
+            entry = self.cache.entry(key)
+            if entry is None:
+                continue
+            sizes = None
+            if family_key(entry["config"]) == self.family:
+                sizes = scenario_sizes(entry["config"])
+            self.index(key, sizes, entry["statistics"])
+
+    def index(self, key: str, sizes: Optional[Sizes], statistics: Statistics) -> None:
+        """Record a cached scenario, with its fleet size if it belongs to the base family."""
+
+        with self.lock:
+            self.indexed[key] = sizes
+            if sizes is not None:
+                self.known[sizes] = statistics
+
+    def estimate(self, num_trucks: int, num_stations: int) -> Estimate:
+        """
+        Returns the statistics of the base scenario with the given number of trucks and stations,
+        starting a background run of the scenario if it is not cached yet.
+
+        Args:
+            num_trucks: number of trucks.
+            num_stations: number of unloading stations.
+        """
+
+        check_sizes(num_trucks, num_stations)
+        point = self.scenario(num_trucks, num_stations)
+        key = scenario_key(point)
+        statistics = self.cache.get(key)
+        if statistics is not None:
+            return Estimate(statistics, True)
+
+        self.refresh()
+        with self.lock:
+            statistics = interpolate(self.known, num_trucks, num_stations)
+        self.launch(key, point)
+        return Estimate(statistics, False)
+
+    def launch(self, key: str, point: ScenarioConfig) -> None:
+        """Run a scenario in the background and cache its statistics, unless already running."""
+
+        with self.lock:
+            if key in self.pending:
+                return
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    self.max_workers, initializer=self.initializer
+                )
+            future = self.executor.submit(self.run_point, point)
+            self.pending[key] = future
+        future.add_done_callback(lambda done: self.finish(key, point, done))
+
+    def finish(self, key: str, point: ScenarioConfig, future: Future) -> None:
+        """Store the statistics of a finished background run."""
+
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"Background run of scenario {key} failed: {error!r}\n")
+        else:
+            statistics = future.result()
+            self.cache.put(key, point, statistics)
+            self.index(key, scenario_sizes(point), statistics)
+        with self.lock:
+            self.pending.pop(key, None)
+            self.idle.notify_all()
+
+    def wait(self) -> None:
+        """Block until every background run has finished and been cached."""
+
+        with self.idle:
+            self.idle.wait_for(lambda: not self.pending)
+
+    def close(self) -> None:
+        """Wait for the background runs and stop the worker processes."""
+
+        self.wait()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,188 @@
+import heapq
+import logging
+
+from mining_simulator import trace
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.mining_site import MiningSite
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.unloading_station import UnloadStation
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class EventDrivenEngine:
+    """
+    Discrete-event replacement for calling MiningCoordinator.time_step once per time step.
+    Keeps a calendar of the time steps at which each truck's timer runs out and jumps straight
+    from one such step to the next. Trucks, mines and unloading stations that are not involved
+    in an event are only brought up to date when they are next touched, so quiet stretches of
+    the simulation cost nothing.
+
+    Time is still measured in whole time steps and every event step replays the same phases,
+    in the same order, as MiningCoordinator.time_step. A run therefore produces exactly the
+    same statistics as the stepped engine, including the order of random mining time draws.
+
+    Args:
+        coordinator: MiningCoordinator holding the trucks, mines and unloading stations.
+        step_minutes: size of one simulation time step in minutes.
+        start_step: time step the coordinator's state is valid at, e.g. when resuming a run.
+    """
+
+    def __init__(
+        self, coordinator: MiningCoordinator, step_minutes: int, start_step: int = 0
+    ) -> None:
+        if coordinator.schedule is not None:
+            raise ValueError("Schedules are not supported by the event engine")
+        self.coordinator = coordinator
+        self.step_minutes = step_minutes
+        self.current_step = start_step
+
+        trucks = coordinator.trucks
+        self._truck_index = {truck.id: index for index, truck in enumerate(trucks)}
+        self._truck_synced = [start_step] * len(trucks)
+        self._station_synced = {
+            station.id: start_step for station in coordinator.unloading_stations
+        }
+        # where each truck is currently queued, if anywhere
+        self._mine_of: dict[int, MiningSite] = {}
+        self._station_of: dict[int, UnloadStation] = {}
+        for mine in coordinator.mining_sites:
+            for truck in mine.queue:
+                self._mine_of[self._truck_index[truck.id]] = mine
+        for station in coordinator.unloading_stations:
+            for truck in station.queue:
+                self._station_of[self._truck_index[truck.id]] = station
+
+        self._calendar: list[tuple[int, int]] = []
+        for index in range(len(trucks)):
+            self._schedule(index, start_step)
+
+    def run_until(self, end_step: int) -> None:
+        """
+        Process every event before end_step, then bring all trucks and unloading stations
+        up to date as if end_step time steps had been simulated.
+
+        Args:
+            end_step: number of time steps after which the simulation stops.
+        """
+
+        while self._calendar and self._calendar[0][0] < end_step:
+            step = self._calendar[0][0]
+            events = []
+            while self._calendar and self._calendar[0][0] == step:
+                events.append(heapq.heappop(self._calendar)[1])
+            if __debug__ and trace.enabled:
+                trace.event(
+                    logger,
+                    "time_step",
+                    "Current time step: %(minutes)d",
+                    minutes=step * self.step_minutes,
+                )
+            self._process_step(step, sorted(events))
+
+        trucks = self.coordinator.trucks
+        for index, truck in enumerate(trucks):
+            self._sync_truck(index, truck, end_step)
+        for station in self.coordinator.unloading_stations:
+            self._sync_station(station, end_step)
+        self.current_step = max(self.current_step, end_step)
+
+    def _process_step(self, step: int, events: list[int]) -> None:
+        """
+        Replay one time step of MiningCoordinator.time_step restricted to the trucks whose
+        timers run out at this step and the mines and stations they are queued at.
+
+        Args:
+            step: index of the time step being simulated.
+            events: indices of trucks with an event at this step, in fleet order.
+        """
+
+        trucks = self.coordinator.trucks
+        for index in events:
+            self._sync_truck(index, trucks[index], step)
+
+        # in mine order, as the stepped engine does, so trucks leaving their mines at the same
+        # step are handed to the station policy or router in the same order
+        freed = [self._mine_of.pop(index) for index in events if index in self._mine_of]
+        for mine in sorted(freed, key=lambda mine: mine.id):
+            self.coordinator.manage_mining_site(mine)
+
+        active = list(events)
+        unloaded = [
+            (self._station_of[index], index)
+            for index in events
+            if index in self._station_of
+            and self._station_of[index].queue[0] is trucks[index]
+        ]
+        # in station order, for the same reason
+        for station, index in sorted(unloaded, key=lambda entry: entry[0].id):
+            del self._station_of[index]
+            if len(station.queue) > 1:
+                # the truck behind may be let through to unload, so account for its wait first
+                next_truck = station.queue[1]
+                next_index = self._truck_index[next_truck.id]
+                self._sync_truck(next_index, next_truck, step)
+                active.append(next_index)
+            self._sync_station(station, step)
+            self.coordinator.manage_unloading_station(station)
+            self._station_synced[station.id] = step + 1
+
+        for index in events:
+            truck = trucks[index]
+            if truck.timer != 0:
+                continue
+            if truck.current_action == truck.Actions.TRAVEL_TO_UNLOAD:
+                # account for the station's wait with its current queue before it grows
+                station = self.coordinator.select_unloading_station(truck)
+                self._sync_station(station, step + 1)
+                self.coordinator.assign_unloading_station(truck, station)
+                self._station_of[index] = station
+            elif truck.current_action == truck.Actions.TRAVEL_TO_MINE:
+                mine = self.coordinator.assign_mining_site(truck)
+                if mine.queue and mine.queue[0] is truck:
+                    self._mine_of[index] = mine
+
+        for index in active:
+            truck = trucks[index]
+            truck.take_action()
+            self._truck_synced[index] = step + 1
+            self._schedule(index, step + 1)
+
+        if self.coordinator.recorder is not None:
+            # actions, queues and deposits only change at events, so they are up to date
+            self.coordinator.recorder.record_coordinator(self.coordinator, step)
+        if self.coordinator.publisher is not None:
+            self.coordinator.publisher.record_coordinator(self.coordinator, step)
+
+    def _schedule(self, index: int, step: int) -> None:
+        """
+        Add the step at which a truck's timer next runs out to the calendar. Waiting trucks
+        are not scheduled as they only move once their station lets them unload, and trucks
+        whose timer skips past zero never trigger another event.
+
+        Args:
+            index: position of the truck in the fleet.
+            step: time step at which the truck's current state is valid.
+        """
+
+        truck = self.coordinator.trucks[index]
+        if truck.current_action == truck.Actions.WAITING:
+            return
+        if truck.timer == 0:
+            heapq.heappush(self._calendar, (step, index))
+        elif truck.timer > 0 and truck.timer % self.step_minutes == 0:
+            heapq.heappush(
+                self._calendar, (step + truck.timer // self.step_minutes, index)
+            )
+
+    def _sync_truck(self, index: int, truck: MiningTruck, step: int) -> None:
+        """Bring a truck's timer and counters up to the start of the given step."""
+
+        truck.fast_forward(step - self._truck_synced[index])
+        self._truck_synced[index] = max(self._truck_synced[index], step)
+
+    def _sync_station(self, station: UnloadStation, step: int) -> None:
+        """Bring a station's accumulated wait time up to the start of the given step."""
+
+        station.accumulate_wait_time(step - self._station_synced[station.id])
+        self._station_synced[station.id] = max(self._station_synced[station.id], step)
@@ -0,0 +1,466 @@
+import heapq
+import logging
+import random
+from itertools import count
+from typing import Optional
+
+import numpy as np
+
+from mining_simulator import trace
+from mining_simulator.config import SimConfig, default_config
+from mining_simulator.live import LivePublisher
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.profiling import PhaseProfiler
+from mining_simulator.sampling import mining_time_sampler
+from mining_simulator.statistics import (
+    Distribution,
+    RunningStatisticsArray,
+    output_top_k,
+)
+from mining_simulator.telemetry import TelemetryRecorder
+from mining_simulator.truck_classes import truck_classes
+from mining_simulator.unloading_station import UnloadStation
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# integer codes of MiningTruck.Actions
+WAITING = MiningTruck.Actions.WAITING
+TRAVEL_TO_MINE = MiningTruck.Actions.TRAVEL_TO_MINE
+TRAVEL_TO_UNLOAD = MiningTruck.Actions.TRAVEL_TO_UNLOAD
+UNLOADING = MiningTruck.Actions.UNLOADING
+MINING = MiningTruck.Actions.MINING
+
+# state machine of MiningTruck.next_action, indexed by action code
+NEXT_ACTION = np.array(MiningTruck.NEXT_ACTION, dtype=np.int8)
+
+# columns of VectorizedFleet.time_counters, indexed by action code
+TIME_WAITING = 0
+TIME_TRAVELLING = 1
+TIME_UNLOADING = 2
+TIME_MINING = 3
+COUNTER_OF_ACTION = np.array(
+    [TIME_WAITING, TIME_TRAVELLING, TIME_TRAVELLING, TIME_UNLOADING, TIME_MINING],
+    dtype=np.intp,
+)
+
+NO_ENTRY = -1
+
+# dispatch policies the fleet implements, see mining_simulator.dispatch
+FLEET_STATION_POLICIES = ("shortest_wait", "join_shortest_queue")
+FLEET_MINE_POLICIES = ("shortest_queue",)
+
+
+class VectorizedFleet:
+    """
+    Struct-of-arrays alternative to MiningCoordinator. Truck timers, actions and time counters,
+    mine occupancy and unloading station queues are stored in NumPy arrays so that every time
+    step advances the whole fleet with a handful of batched array operations instead of a
+    Python method call per truck.
+
+    Unloading station queues are kept as linked lists through the trucks: each station stores
+    its front and back truck and each queued truck stores the truck behind it. Each truck stores
+    the index of its truck class, from which its travel time, unloading time and payload are
+    gathered out of the per class arrays of the TruckClasses as trucks change state.
+
+    Follows the same rules, in the same order, as MiningCoordinator.time_step and draws mining
+    times in the same order, so a run with the same seed produces the same statistics. MiningTruck
+    and UnloadStation objects are only built on demand for reporting. If a TelemetryRecorder is
+    attached through the recorder attribute, the state after every time step is recorded, and
+    with a PhaseProfiler attached through the profiler attribute each phase is timed. A
+    LivePublisher attached through the publisher attribute streams the changes to subscribers.
+    Only the dispatch policies in FLEET_STATION_POLICIES and FLEET_MINE_POLICIES are supported.
+
+    Args:
+        num_trucks: number of mining trucks to simulate.
+        num_stations: number of unloading stations to simulate.
+        rng: random number generator seeding the mining time sampler, defaults to the random
+            module.
+        config: simulation parameters, defaults to the parsed sim_parameters.ini.
+    """
+
+    def __init__(
+        self,
+        num_trucks: int,
+        num_stations: int,
+        rng: Optional[random.Random] = None,
+        config: Optional[SimConfig] = None,
+    ) -> None:
+        self.config = config if config is not None else default_config()
+        self.sampler = mining_time_sampler(self.config, rng)
+        self.sim_step_time_minutes = self.config.sim_step_minutes
+        self.truck_classes = truck_classes(self.config)
+        if self.config.station_policy not in FLEET_STATION_POLICIES:
+            raise ValueError(
+                f"station_policy {self.config.station_policy} is not supported by the "
+                f"vectorized engine, use one of {', '.join(FLEET_STATION_POLICIES)}"
+            )
+        if self.config.network_file is not None:
+            raise ValueError("Site graphs are not supported by the vectorized engine")
+        if self.config.schedule_file is not None:
+            raise ValueError("Schedules are not supported by the vectorized engine")
+        if self.config.mine_policy not in FLEET_MINE_POLICIES:
+            raise ValueError(
+                f"mine_policy {self.config.mine_policy} is not supported by the "
+                f"vectorized engine, use one of {', '.join(FLEET_MINE_POLICIES)}"
+            )
+
+        self.num_trucks = num_trucks
+        self.num_stations = num_stations
+        self.num_mines = num_trucks
+
+        # truck state
+        self.truck_class = self.truck_classes.assign(0, num_trucks)
+        self.timer = np.zeros(num_trucks, dtype=np.int64)
+        self.action = np.full(num_trucks, TRAVEL_TO_MINE, dtype=np.int8)
+        self.time_counters = np.zeros((num_trucks, 4), dtype=np.int64)
+        self.units_mined = np.zeros(num_trucks, dtype=np.int64)
+        self.next_in_queue = np.full(num_trucks, NO_ENTRY, dtype=np.int64)
+
+        # mine state, each mine holds at most one truck
+        self.mine_truck = np.full(self.num_mines, NO_ENTRY, dtype=np.int64)
+
+        # unloading station state
+        self.queue_front = np.full(num_stations, NO_ENTRY, dtype=np.int64)
+        self.queue_back = np.full(num_stations, NO_ENTRY, dtype=np.int64)
+        self.queue_length = np.zeros(num_stations, dtype=np.int64)
+        self.station_of = np.full(num_trucks, NO_ENTRY, dtype=np.int64)
+        self.current_wait_time = np.zeros(num_stations, dtype=np.int64)
+        self.total_wait_time = np.zeros(num_stations, dtype=np.int64)
+        self.units_deposited = np.zeros(num_stations, dtype=np.int64)
+        self.units_by_class = np.zeros(
+            (num_stations, len(self.truck_classes)), dtype=np.int64
+        )
+
+        # cycle and wait statistics, updated as trucks join and leave station queues
+        self.cycle_start = np.zeros(num_trucks, dtype=np.int64)
+        self.cycle_wait_start = np.zeros(num_trucks, dtype=np.int64)
+        self.truck_cycle_times = RunningStatisticsArray(num_trucks)
+        self.station_wait_times = RunningStatisticsArray(num_stations)
+        self.station_queue_lengths = RunningStatisticsArray(num_stations)
+        self.cycle_times = Distribution()
+        self.wait_times = Distribution()
+        self.queue_lengths = Distribution()
+
+        self._fleet_indices = np.arange(num_trucks)
+        self.recorder: Optional[TelemetryRecorder] = None
+        self.profiler: Optional[PhaseProfiler] = None
+        self.publisher: Optional[LivePublisher] = None
+
+    def time_step(self) -> None:
+        """
+        Moves the whole fleet forwards by one time step. Frees mines whose truck is done mining,
+        advances the unloading station queues, assigns arriving trucks to unloading stations
+        and mines, then progresses every truck's state machine.
+        """
+
+        if self.profiler is not None:
+            self.profiled_time_step(self.profiler)
+        else:
+            self.manage_mines()
+            self.manage_station_queues()
+
+            arrived = self.timer == 0
+            self.assign_unloading_stations(
+                np.flatnonzero(arrived & (self.action == TRAVEL_TO_UNLOAD))
+            )
+            self.assign_mining_sites(
+                np.flatnonzero(arrived & (self.action == TRAVEL_TO_MINE))
+            )
+
+            self.take_action()
+        if self.recorder is not None:
+            self.recorder.record(self.action, self.queue_length, self.units_deposited)
+        if self.publisher is not None:
+            self.publisher.record(self.action, self.queue_length, self.units_deposited)
+
+    def profiled_time_step(self, profiler: PhaseProfiler) -> None:
+        """
+        Same phases as time_step, timing each of them and counting the mines freed, trucks
+        unloaded and trucks dispatched.
+
+        Args:
+            profiler: the PhaseProfiler to accumulate into.
+        """
+
+        start = profiler.start_tick()
+        mining = np.count_nonzero(self.mine_truck != NO_ENTRY)
+        self.manage_mines()
+        mines_freed = mining - np.count_nonzero(self.mine_truck != NO_ENTRY)
+        start = profiler.lap("mines", start)
+
+        # every finished unload records its wait, whatever the truck's payload
+        finished = self.wait_times.count
+        self.manage_station_queues()
+        unloads = self.wait_times.count - finished
+        start = profiler.lap("stations", start)
+
+        arrived = self.timer == 0
+        to_stations = np.flatnonzero(arrived & (self.action == TRAVEL_TO_UNLOAD))
+        to_mines = np.flatnonzero(arrived & (self.action == TRAVEL_TO_MINE))
+        self.assign_unloading_stations(to_stations)
+        self.assign_mining_sites(to_mines)
+        start = profiler.lap("dispatch", start)
+
+        self.take_action()
+        profiler.lap("trucks", start)
+        profiler.end_tick(
+            int(mines_freed), int(unloads), int(to_stations.size + to_mines.size)
+        )
+
+    def manage_mines(self) -> None:
+        """Remove trucks that have finished mining from their mines."""
+
+        occupied = np.flatnonzero(self.mine_truck != NO_ENTRY)
+        finished = occupied[self.timer[self.mine_truck[occupied]] == 0]
+        self.mine_truck[finished] = NO_ENTRY
+
+    def manage_station_queues(self) -> None:
+        """
+        Tally the wait time of every queue, remove trucks that have finished unloading from the
+        front of their queue and let the next truck in line begin unloading.
+        """
+
+        step = self.sim_step_time_minutes
+        self.total_wait_time += np.maximum(self.queue_length - 1, 0) * step
+
+        busy = np.flatnonzero(self.queue_front != NO_ENTRY)
+        fronts = self.queue_front[busy]
+        finished = self.timer[fronts] == 0
+        stations, trucks = busy[finished], fronts[finished]
+        if trucks.size:
+            if __debug__ and trace.enabled:
+                trace.event(
+                    logger,
+                    "finish_unloading",
+                    "Trucks %(trucks)s have completed unloading at %(stations)s!",
+                    trucks=trucks.tolist(),
+                    stations=stations.tolist(),
+                )
+            classes = self.truck_class[trucks]
+            payload = self.truck_classes.payload_units[classes]
+            self.units_mined[trucks] += payload
+            self.units_deposited[stations] += payload
+            # a station unloads at most one truck per time step
+            self.units_by_class[stations, classes] += payload
+            self.finish_cycles(stations, trucks)
+            self.current_wait_time[stations] -= self.truck_classes.unload_time_minutes[
+                classes
+            ]
+            self.queue_length[stations] -= 1
+            self.station_of[trucks] = NO_ENTRY
+            self.queue_front[stations] = self.next_in_queue[trucks]
+            self.next_in_queue[trucks] = NO_ENTRY
+            emptied = stations[self.queue_front[stations] == NO_ENTRY]
+            self.queue_back[emptied] = NO_ENTRY
+
+            fronts = self.queue_front[stations]
+            fronts = fronts[fronts != NO_ENTRY]
+            waiting = fronts[self.action[fronts] == WAITING]
+            self.action[waiting] = UNLOADING
+
+    def finish_cycles(self, stations: np.ndarray, trucks: np.ndarray) -> None:
+        """
+        Record the cycle and wait times of trucks that have finished unloading.
+
+        Args:
+            stations: indices of the stations the trucks unloaded at.
+            trucks: indices of the trucks.
+        """
+
+        # every truck has spent the same minutes since the start of the run
+        elapsed = self.time_counters[0].sum()
+        waited = self.time_counters[trucks, TIME_WAITING]
+        cycles = elapsed - self.cycle_start[trucks]
+        waits = waited - self.cycle_wait_start[trucks]
+        self.cycle_start[trucks] = elapsed
+        self.cycle_wait_start[trucks] = waited
+        self.truck_cycle_times.add_at(trucks, cycles)
+        self.station_wait_times.add_at(stations, waits)
+        self.cycle_times.add_many(cycles)
+        self.wait_times.add_many(waits)
+
+    def assign_unloading_stations(self, trucks: np.ndarray) -> None:
+        """
+        Queue arriving trucks, in fleet order, at the unloading station with the shortest
+        current wait time, or the shortest queue with the join_shortest_queue policy. A
+        station's wait time is the unloading time of its queued trucks, by their class.
+
+        Stations are picked from a min-heap of (load, station) entries, ties going to the
+        station that comes first as with LeastLoadedPolicy, and the queues are then extended
+        for every arriving truck at once.
+
+        Args:
+            trucks: indices of trucks that have arrived to unload.
+        """
+
+        if not trucks.size:
+            return
+        unload_times = self.truck_classes.unload_time_minutes[self.truck_class[trucks]]
+        by_queue = self.config.station_policy == "join_shortest_queue"
+        lengths = self.queue_length.tolist()
+        heap = list(
+            zip(lengths if by_queue else self.current_wait_time.tolist(), count())
+        )
+        heapq.heapify(heap)
+        chosen = []
+        found = []
+        for unload_time in unload_times.tolist():
+            load, station = heap[0]
+            chosen.append(station)
+            found.append(lengths[station])
+            lengths[station] += 1
+            heapq.heapreplace(heap, (load + (1 if by_queue else unload_time), station))
+        stations = np.array(chosen, dtype=np.int64)
+        found = np.array(found, dtype=np.int64)
+
+        # link the trucks joining each station behind its back truck, in arrival order
+        order = np.argsort(stations, kind="stable")
+        grouped, queued = stations[order], trucks[order]
+        same = grouped[1:] == grouped[:-1]
+        self.next_in_queue[queued[:-1][same]] = queued[1:][same]
+        firsts = np.flatnonzero(np.concatenate(([True], ~same)))
+        lasts = np.concatenate((firsts[1:], [grouped.size])) - 1
+        first_stations = grouped[firsts]
+        backs = self.queue_back[first_stations]
+        joined = backs != NO_ENTRY
+        self.next_in_queue[backs[joined]] = queued[firsts][joined]
+        self.queue_front[first_stations[~joined]] = queued[firsts][~joined]
+        self.queue_back[first_stations] = queued[lasts]
+
+        self.action[trucks] = np.where(found == 0, UNLOADING, WAITING)
+        self.queue_length[:] = lengths
+        self.station_of[trucks] = stations
+        self.timer[trucks] = unload_times
+        np.add.at(self.current_wait_time, stations, unload_times)
+
+        if firsts.size == stations.size:
+            self.station_queue_lengths.add_at(stations, found)
+        else:
+            self.station_queue_lengths.add_grouped(stations, found)
+        self.queue_lengths.add_many(found)
+
+    def assign_mining_sites(self, trucks: np.ndarray) -> None:
+        """
+        Send arriving trucks, in fleet order, to the free mines with the lowest index and draw
+        their mining times. Trucks that find no free mine are left where they are.
+
+        Args:
+            trucks: indices of trucks that have arrived to mine.
+        """
+
+        if not trucks.size:
+            return
+        free = np.flatnonzero(self.mine_truck == NO_ENTRY)
+        trucks = trucks[: free.size]
+        self.mine_truck[free[: trucks.size]] = trucks
+        self.timer[trucks] = self.sampler.draw_many(trucks.size)
+        self.action[trucks] = MINING
+
+    def take_action(self) -> None:
+        """
+        Progress every truck's state timer forward by one step. Trucks whose action is
+        complete move to their next state. Tally time spent in each state.
+        """
+
+        step = self.sim_step_time_minutes
+        self.time_counters[self._fleet_indices, COUNTER_OF_ACTION[self.action]] += step
+
+        done = self.timer == 0
+        self.timer[~done] -= step
+        self.action[done] = NEXT_ACTION[self.action[done]]
+        travelling = done & (
+            (self.action == TRAVEL_TO_MINE) | (self.action == TRAVEL_TO_UNLOAD)
+        )
+        travelling = np.flatnonzero(travelling)
+        self.timer[travelling] = self.truck_classes.travel_time_minutes[
+            self.truck_class[travelling]
+        ]
+
+    def build_truck(self, index: int) -> MiningTruck:
+        """
+        Build a MiningTruck holding the current state and statistics of one truck.
+
+        Args:
+            index: position of the truck in the fleet.
+
+        Returns:
+            A MiningTruck whose id is its position in the fleet.
+        """
+
+        truck = MiningTruck(
+            self.config, index, self.truck_classes[int(self.truck_class[index])]
+        )
+        truck.timer = int(self.timer[index])
+        truck.current_action = int(self.action[index])
+        truck.sim_step_time_minutes = self.sim_step_time_minutes
+        counters = self.time_counters[index]
+        truck.time_waiting = int(counters[TIME_WAITING])
+        truck.time_travelling = int(counters[TIME_TRAVELLING])
+        truck.time_unloading = int(counters[TIME_UNLOADING])
+        truck.time_mining = int(counters[TIME_MINING])
+        truck.units_mined = int(self.units_mined[index])
+        truck.cycle_times = self.truck_cycle_times.get(index)
+        truck.cycle_start_minutes = int(self.cycle_start[index])
+        truck.cycle_wait_start = int(self.cycle_wait_start[index])
+        return truck
+
+    def build_trucks(self) -> list[MiningTruck]:
+        """Returns MiningTruck objects for the whole fleet, in fleet order."""
+
+        return [self.build_truck(index) for index in range(self.num_trucks)]
+
+    def build_unloading_station(self, index: int) -> UnloadStation:
+        """
+        Build an UnloadStation holding the current statistics of one unloading station.
+        Its queue is left empty.
+
+        Args:
+            index: position of the unloading station.
+
+        Returns:
+            An UnloadStation whose id is its position.
+        """
+
+        station = UnloadStation(self.config, index)
+        station.current_wait_time = int(self.current_wait_time[index])
+        station.total_wait_time = int(self.total_wait_time[index])
+        station.units_deposited = int(self.units_deposited[index])
+        station.units_by_class = self.units_by_class[index].tolist()
+        # per station, only the running statistics are tracked
+        station.wait_times.merge(self.station_wait_times.get(index))
+        station.queue_lengths.merge(self.station_queue_lengths.get(index))
+        return station
+
+    def queued_trucks(self, index: int) -> list[int]:
+        """Returns the positions of the trucks queued at an unloading station, front first."""
+
+        trucks = []
+        truck = int(self.queue_front[index])
+        while truck != NO_ENTRY:
+            trucks.append(truck)
+            truck = int(self.next_in_queue[truck])
+        return trucks
+
+    def output_truck_statistics(self, top_k: int = 0) -> None:
+        """
+        Log statistics of every truck by quantity He-3 mined in descending order, or only of
+        the top_k trucks that mined the most and the least.
+        """
+
+        if top_k > 0:
+            output_top_k(
+                range(self.num_trucks),
+                top_k,
+                self.units_mined.__getitem__,
+                "trucks that mined the {} He-3",
+                lambda index: self.build_truck(index).output_statistics(),
+            )
+            return
+        for index in np.argsort(-self.units_mined, kind="stable").tolist():
+            self.build_truck(index).output_statistics()
+
+    def output_unloading_site_statistics(self) -> None:
+        """Sort unloading sites by quantity He-3 received in descending order and log statistics."""
+
+        for index in np.argsort(-self.units_deposited, kind="stable").tolist():
+            self.build_unloading_station(index).output_statistics()
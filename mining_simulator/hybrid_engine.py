@@ -0,0 +1,326 @@
+import heapq
+import logging
+from typing import Optional
+
+import numpy as np
+
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.truck_classes import truck_classes
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# phases of a truck's cycle, in order. Each phase covers the time steps whose take_action
+# counts towards it, a mining phase starts at the step the truck is sent to a mine and an
+# unloading phase at the step it joins a station's queue.
+MINE, TO_UNLOAD, UNLOAD, TO_MINE = range(4)
+
+Actions = MiningTruck.Actions
+PHASE_OF_ACTION = {
+    Actions.MINING: MINE,
+    Actions.TRAVEL_TO_UNLOAD: TO_UNLOAD,
+    Actions.UNLOADING: UNLOAD,
+    Actions.TRAVEL_TO_MINE: TO_MINE,
+}
+# columns of the per truck time counters, indexed by phase
+TIME_MINING, TIME_TRAVELLING, TIME_UNLOADING = range(3)
+COUNTER_OF_PHASE = np.array(
+    [TIME_MINING, TIME_TRAVELLING, TIME_UNLOADING, TIME_TRAVELLING]
+)
+
+
+class HybridEngine:
+    """
+    Replacement for calling MiningCoordinator.time_step once per time step that skips through
+    stretches of the simulation in which no truck has to wait. While every unloading station has
+    at most one truck, trucks do not affect each other and each one repeats the same cycle:
+    travel, mine, travel, unload. The engine then samples the mining times of many cycles at once
+    and advances every truck to the end of a window in a few vectorized passes, stopping early at
+    the first time step at which more trucks would arrive at the stations than there are free
+    stations. From there it steps exactly, with MiningCoordinator.time_step, until the queues
+    have drained again.
+
+    Skipped windows follow the same rules as the stepped engine, including which station an
+    arriving truck is sent to, but take the mining times of a whole window from the coordinator's
+    sampler at once, in a different order than the trucks start mining in, and discard the ones
+    beyond where the window stops. Results are therefore statistically equivalent to, not the
+    same as, a stepped run with the same seed, except when mining times are fixed. While a
+    TelemetryRecorder is attached to the coordinator nothing is skipped, every time step is
+    stepped exactly and recorded. An attached LivePublisher is handed the state at the end of
+    every skipped window.
+
+    Args:
+        coordinator: MiningCoordinator holding the trucks, mines and unloading stations.
+        step_minutes: size of one simulation time step in minutes.
+        start_step: time step the coordinator's state is valid at, e.g. when resuming a run.
+        window_steps: most time steps skipped at once, defaults to about four truck cycles.
+    """
+
+    def __init__(
+        self,
+        coordinator: MiningCoordinator,
+        step_minutes: int,
+        start_step: int = 0,
+        window_steps: Optional[int] = None,
+    ) -> None:
+        self.coordinator = coordinator
+        self.step_minutes = step_minutes
+        self.current_step = start_step
+
+        config = coordinator.config
+        classes = truck_classes(config)
+        self.truck_class = classes[0]
+        self.travel_steps = self.truck_class.travel_time_minutes // step_minutes
+        self.unload_steps = self.truck_class.unload_time_minutes // step_minutes
+        self.sampler = coordinator.sampler
+        # whole cycles can only be skipped if every timer runs out on a time step, every truck
+        # belongs to the same class, every trip takes the same time and arriving trucks are sent
+        # to the first free station, as the least loaded station policies do, and nothing is
+        # ever closed by a schedule
+        self.supported = (
+            len(classes) == 1
+            and self.truck_class.travel_time_minutes % step_minutes == 0
+            and self.truck_class.unload_time_minutes % step_minutes == 0
+            and self.unload_steps >= 1
+            and self.sampler.granularity_minutes % step_minutes == 0
+            and self.sampler.min_minutes >= step_minutes
+            and len(coordinator.mining_sites) >= len(coordinator.trucks)
+            and config.station_policy in ("shortest_wait", "join_shortest_queue")
+            and coordinator.router is None
+            and coordinator.schedule is None
+        )
+
+        mean_mining_steps = int(self.sampler.mean_minutes) // step_minutes
+        cycle_steps = mean_mining_steps + 2 * self.travel_steps + self.unload_steps + 2
+        self.window_steps = window_steps or 4 * cycle_steps
+        # after contention, step exactly for about one cycle before trying to skip again
+        self.backoff_steps = cycle_steps
+
+        self.exact_steps = 0
+        self.fast_forward_steps = 0
+
+    def run_until(self, end_step: int) -> None:
+        """
+        Simulate until end_step time steps have elapsed.
+
+        Args:
+            end_step: number of time steps after which the simulation stops.
+        """
+
+        retry_step = self.current_step
+        while self.current_step < end_step:
+            if self.current_step >= retry_step and self.is_steady():
+                horizon = min(end_step, self.current_step + self.window_steps)
+                skipped = self.fast_forward(horizon)
+                if skipped < self.backoff_steps:
+                    retry_step = self.current_step + self.backoff_steps
+                if skipped:
+                    continue
+            self.coordinator.time_step()
+            self.current_step += 1
+            self.exact_steps += 1
+
+    def is_steady(self) -> bool:
+        """
+        Returns whether no truck is waiting, every station is empty or unloading its only truck
+        and every timer runs out on a time step.
+        """
+
+        if not self.supported:
+            return False
+        # a telemetry recorder needs the state after every time step, which windows skip
+        if self.coordinator.recorder is not None:
+            return False
+        for station in self.coordinator.unloading_stations:
+            if station.num_waiting:
+                return False
+            # a truck whose unloading time ran out while it waited holds the station until its
+            # next timer runs out too, which skipped windows do not model
+            if station.queue and station.queue[0].current_action != Actions.UNLOADING:
+                return False
+        for truck in self.coordinator.trucks:
+            if (
+                truck.current_action == truck.Actions.WAITING
+                or truck.timer < 0
+                or truck.timer % self.step_minutes
+            ):
+                return False
+        return True
+
+    def fast_forward(self, horizon: int) -> int:
+        """
+        Advance every truck, mine and station to the start of horizon, or of the first earlier
+        time step at which a truck would have to wait for a station.
+
+        Args:
+            horizon: time step to skip to if no truck has to wait before it.
+
+        Returns:
+            The number of time steps skipped.
+        """
+
+        coordinator = self.coordinator
+        trucks = coordinator.trucks
+        stations = coordinator.unloading_stations
+        num_trucks = len(trucks)
+        start_step = self.current_step
+
+        station_of = np.full(num_trucks, -1, dtype=np.int64)
+        truck_index = {truck.id: index for index, truck in enumerate(trucks)}
+        for position, station in enumerate(stations):
+            for truck in station.queue:
+                station_of[truck_index[truck.id]] = position
+
+        # the phase each truck is in and the step it ends at, exclusive
+        kind = np.fromiter(
+            (PHASE_OF_ACTION[truck.current_action] for truck in trucks),
+            np.int64,
+            num_trucks,
+        )
+        remaining = np.fromiter(
+            (truck.timer // self.step_minutes for truck in trucks),
+            np.int64,
+            num_trucks,
+        )
+        end = start_step + remaining + ((kind == MINE) | (kind == UNLOAD))
+        rows = [
+            (
+                np.arange(num_trucks),
+                kind.copy(),
+                np.full(num_trucks, start_step),
+                end.copy(),
+            )
+        ]
+
+        lengths = np.array(
+            [0, self.travel_steps, self.unload_steps + 1, self.travel_steps]
+        )
+        active = np.flatnonzero(end <= horizon)
+        while active.size:
+            next_kind = (kind[active] + 1) % 4
+            length = lengths[next_kind]
+            mining = next_kind == MINE
+            length[mining] = (
+                self.sampler.draw_many(np.count_nonzero(mining)) // self.step_minutes
+                + 1
+            )
+            next_start = end[active]
+            kind[active] = next_kind
+            end[active] = next_start + length
+            rows.append((active, next_kind, next_start, end[active]))
+            active = active[end[active] <= horizon]
+
+        truck = np.concatenate([row[0] for row in rows])
+        phase = np.concatenate([row[1] for row in rows])
+        start = np.concatenate([row[2] for row in rows])
+        end = np.concatenate([row[3] for row in rows])
+
+        # send arrivals to the first free station, in the order the stepped engine would, and
+        # stop at the first time step at which an arriving truck finds every station taken. A
+        # truck holds its station from the step it joins the queue until the step it leaves.
+        unloading = phase == UNLOAD
+        row_station = np.full(truck.size, -1, dtype=np.int64)
+        row_station[:num_trucks] = np.where(unloading[:num_trucks], station_of, -1)
+        free = [
+            position
+            for position in range(len(stations))
+            if not stations[position].queue
+        ]
+        heapq.heapify(free)
+        busy = [
+            (int(end[row]) - 1, int(station_of[row]))
+            for row in np.flatnonzero(unloading[:num_trucks])
+        ]
+        heapq.heapify(busy)
+        arrivals = np.flatnonzero(unloading & (start < horizon))
+        arrivals = arrivals[arrivals >= num_trucks]
+        arrivals = arrivals[np.lexsort((truck[arrivals], start[arrivals]))]
+        stop = horizon
+        for row, arrival, leave in zip(
+            arrivals.tolist(), start[arrivals].tolist(), (end[arrivals] - 1).tolist()
+        ):
+            while busy and busy[0][0] <= arrival:
+                heapq.heappush(free, heapq.heappop(busy)[1])
+            if not free:
+                stop = arrival
+                break
+            position = heapq.heappop(free)
+            heapq.heappush(busy, (leave, position))
+            row_station[row] = position
+        if stop <= start_step:
+            return 0
+        # trucks arriving at the step the window stops at are dispatched by the stepped engine
+        for row in arrivals[start[arrivals] < stop].tolist():
+            stations[row_station[row]].queue_lengths.add(0)
+
+        counters = np.zeros((num_trucks, 3), dtype=np.int64)
+        elapsed = np.clip(np.minimum(end, stop) - start, 0, None) * self.step_minutes
+        np.add.at(counters, (truck, COUNTER_OF_PHASE[phase]), elapsed)
+
+        # trucks unload as the step they leave the station at begins
+        unloaded = np.flatnonzero(unloading & (end <= stop))
+        units_mined = np.bincount(truck[unloaded], minlength=num_trucks)
+        units_deposited = np.bincount(row_station[unloaded], minlength=len(stations))
+        # close the cycles of the trucks that unloaded, in order, from their elapsed minutes at
+        # the step they left their station
+        for row in unloaded[np.argsort(end[unloaded], kind="stable")].tolist():
+            mining_truck = trucks[truck[row]]
+            elapsed = mining_truck.elapsed_minutes() + (
+                (int(end[row]) - 1 - start_step) * self.step_minutes
+            )
+            stations[row_station[row]].finish_unloading(mining_truck, elapsed)
+
+        current = np.flatnonzero((start <= stop) & (stop < end))
+        for station in stations:
+            station.queue.clear()
+        for mine in coordinator.mining_sites:
+            mine.queue.clear()
+        mines = iter(coordinator.mining_sites)
+        step = self.step_minutes
+        payload = self.truck_class.payload_units
+        unload_minutes = self.truck_class.unload_time_minutes
+        for row in current.tolist():
+            index = int(truck[row])
+            mining_truck = trucks[index]
+            row_phase = phase[row]
+            arriving = start[row] == stop
+            if row_phase == MINE and not arriving:
+                mining_truck.current_action = Actions.MINING
+                mining_truck.timer = int(end[row] - 1 - stop) * step
+                next(mines).queue.append(mining_truck)
+            elif row_phase == UNLOAD and not arriving:
+                mining_truck.current_action = Actions.UNLOADING
+                mining_truck.timer = int(end[row] - 1 - stop) * step
+                stations[row_station[row]].queue.append(mining_truck)
+            elif row_phase == MINE:
+                # sent to a mine during this step
+                mining_truck.current_action = Actions.TRAVEL_TO_MINE
+                mining_truck.timer = 0
+            elif row_phase == UNLOAD:
+                # sent to a station during this step
+                mining_truck.current_action = Actions.TRAVEL_TO_UNLOAD
+                mining_truck.timer = 0
+            elif row_phase == TO_MINE:
+                mining_truck.current_action = Actions.TRAVEL_TO_MINE
+                mining_truck.timer = int(end[row] - stop) * step
+            else:
+                mining_truck.current_action = Actions.TRAVEL_TO_UNLOAD
+                mining_truck.timer = int(end[row] - stop) * step
+
+        for index, mining_truck in enumerate(trucks):
+            mining_truck.time_mining += int(counters[index, TIME_MINING])
+            mining_truck.time_travelling += int(counters[index, TIME_TRAVELLING])
+            mining_truck.time_unloading += int(counters[index, TIME_UNLOADING])
+            mining_truck.units_mined += int(units_mined[index]) * payload
+        for position, station in enumerate(stations):
+            station.units_deposited += int(units_deposited[position]) * payload
+            station.units_by_class[0] += int(units_deposited[position]) * payload
+            station.current_wait_time = unload_minutes * len(station.queue)
+        coordinator.rebuild_dispatch_indexes()
+        if coordinator.publisher is not None:
+            # subscribers get the changes of the whole window at its last time step
+            coordinator.publisher.record_coordinator(coordinator, stop - 1)
+
+        self.fast_forward_steps += stop - start_step
+        self.current_step = stop
+        return stop - start_step
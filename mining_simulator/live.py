@@ -0,0 +1,378 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import AsyncIterator, Optional
+
+import numpy as np
+
+from mining_simulator.telemetry import coordinator_state
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# batches queued for a subscriber before it is too far behind and gets a snapshot instead
+MAX_PENDING_BATCHES = 64
+
+# seconds close waits for subscribers to read what was published before disconnecting them
+CLOSE_TIMEOUT = 5.0
+
+State = tuple[int, np.ndarray, np.ndarray, np.ndarray]
+# step, changed trucks and their actions, changed stations, their queue lengths and deposits
+Row = tuple[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class Subscriber:
+    """A connected client and the encoded batches still to be written to it."""
+
+    __slots__ = ("writer", "pending", "lagging", "ready")
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.pending: deque[bytes] = deque()
+        # sent a snapshot of the latest state before any further batches, as new clients are
+        self.lagging = True
+        self.ready = asyncio.Event()
+
+
+class LivePublisher:
+    """
+    Opt-in publisher streaming the state of a running simulation to any number of local
+    subscribers over a Unix socket, so dashboards can follow long runs live. After every time
+    step the simulation thread only compares the state with the previous one: each truck's
+    action code, each unloading station's queue length and each station's cumulative deposits.
+    Every batch_steps time steps the changes are handed to an asyncio event loop on a background
+    thread, which encodes them once and writes them to every subscriber as newline delimited
+    JSON messages:
+
+        {"type": "snapshot", "step": 12, "step_minutes": 5, "actions": [...],
+            "queue_lengths": [...], "deposits": [...]}
+        {"type": "delta", "step": 24, "steps": [{"step": 13, "trucks": [[truck, action], ...],
+            "stations": [[station, queue_length, deposits], ...]}, ...]}
+        {"type": "end"}
+
+    A subscriber first receives a snapshot. A subscriber that falls max_pending batches behind,
+    because it reads too slowly, has its queued batches dropped and receives one snapshot of the
+    latest state once it catches up, so slow consumers never hold up the simulation or each other.
+    Time steps in which nothing changed are left out of the batches, whose step is the last one
+    they cover.
+
+    Attach it to a MiningCoordinator or VectorizedFleet through their publisher attribute and
+    close it once the simulation is done. With the event-driven engine only the time steps at
+    which something changed are published, as with a TelemetryRecorder. With the hybrid engine
+    the changes of a fast-forwarded window are published together at its last time step.
+
+    Args:
+        path: Unix socket to listen on, replaced if it exists.
+        step_minutes: size of one simulation time step in minutes, sent with every snapshot.
+        batch_steps: time steps published together.
+        max_pending: batches queued for a subscriber before it gets a snapshot instead.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        step_minutes: int,
+        batch_steps: int = 12,
+        max_pending: int = MAX_PENDING_BATCHES,
+    ) -> None:
+        if batch_steps <= 0:
+            raise ValueError("live_batch_steps must be positive")
+        self.path = path
+        self.step_minutes = step_minutes
+        self.batch_steps = batch_steps
+        self.max_pending = max_pending
+
+        # state after the last recorded time step, owned by the simulation thread
+        self._state: Optional[State] = None
+        self._batch: list[Row] = []
+        self._batch_rows = 0
+        self.next_step = 0
+        # counted on the event loop
+        self.snapshots_sent = 0
+        self.batches_dropped = 0
+
+        # state last handed to the event loop and its encoded snapshot
+        self._published: Optional[State] = None
+        self._snapshot: Optional[bytes] = None
+        self.subscribers: set[Subscriber] = set()
+        self._handlers: set[asyncio.Task] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._error: Optional[BaseException] = None
+
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run_loop, args=(started,), name="live-publisher", daemon=True
+        )
+        self.thread.start()
+        started.wait()
+        if self._error is not None:
+            self.thread.join()
+            raise self._error
+        self.closed = False
+
+    def __enter__(self) -> "LivePublisher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(
+        self,
+        actions: np.ndarray,
+        queue_lengths: np.ndarray,
+        deposits: np.ndarray,
+        step: Optional[int] = None,
+    ) -> None:
+        """
+        Collect the changes since the last time step, handing them to the event loop once
+        batch_steps time steps were collected. Never waits for subscribers.
+
+        Args:
+            actions: action code of every truck.
+            queue_lengths: number of trucks queued at every unloading station.
+            deposits: units deposited so far at every unloading station.
+            step: index of the time step, defaults to the one after the last recorded step.
+        """
+
+        if step is None:
+            step = self.next_step
+        # copied, the vectorized engine updates its arrays in place
+        actions = np.array(actions, dtype=np.int8)
+        queue_lengths = np.array(queue_lengths, dtype=np.int64)
+        deposits = np.array(deposits, dtype=np.int64)
+
+        previous = self._state
+        if previous is None:
+            trucks = np.arange(actions.size)
+            stations = np.arange(queue_lengths.size)
+        else:
+            trucks = np.flatnonzero(actions != previous[1])
+            stations = np.flatnonzero(
+                (queue_lengths != previous[2]) | (deposits != previous[3])
+            )
+        if trucks.size or stations.size:
+            self._batch.append(
+                (
+                    step,
+                    trucks,
+                    actions[trucks],
+                    stations,
+                    queue_lengths[stations],
+                    deposits[stations],
+                )
+            )
+        self._state = (step, actions, queue_lengths, deposits)
+        self.next_step = step + 1
+        self._batch_rows += 1
+        if self._batch_rows >= self.batch_steps:
+            self.flush()
+
+    def record_coordinator(self, coordinator, step: Optional[int] = None) -> None:
+        """
+        Collect the changes to the state of a MiningCoordinator after one time step.
+
+        Args:
+            coordinator: the MiningCoordinator to publish.
+            step: index of the time step, defaults to the one after the last recorded step.
+        """
+
+        self.record(*coordinator_state(coordinator), step)
+
+    def flush(self) -> None:
+        """Hand the collected changes and the latest state to the event loop."""
+
+        if self._state is None:
+            return
+        batch, self._batch = self._batch, []
+        self._batch_rows = 0
+        self.loop.call_soon_threadsafe(self._publish, batch, self._state)
+
+    def close(self) -> None:
+        """
+        Publish the remaining changes, let subscribers read them and stop listening. The
+        publisher must not be used afterwards.
+        """
+
+        if self.closed:
+            return
+        self.closed = True
+        self.flush()
+        future = asyncio.run_coroutine_threadsafe(self._stop(), self.loop)
+        future.result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        if self.snapshots_sent or self.batches_dropped:
+            logger.debug(
+                f"Live publisher dropped {self.batches_dropped} batches for slow subscribers "
+                f"and sent {self.snapshots_sent} snapshots"
+            )
+
+    def _run_loop(self, started: threading.Event) -> None:
+        """Event loop thread, serving subscribers until close stops the loop."""
+
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(
+                asyncio.start_unix_server(self._serve_subscriber, self.path)
+            )
+        except OSError as error:
+            self._error = error
+            started.set()
+            self.loop.close()
+            return
+        started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def _publish(self, batch: list[Row], state: State) -> None:
+        """Queue an encoded batch for every subscriber, on the event loop."""
+
+        self._published = state
+        self._snapshot = None
+        message = None
+        if self.subscribers:
+            message = self._encode(
+                {
+                    "type": "delta",
+                    "step": state[0],
+                    "steps": [
+                        {
+                            "step": step,
+                            "trucks": np.column_stack((trucks, actions)).tolist(),
+                            "stations": np.column_stack(
+                                (stations, queue_lengths, deposits)
+                            ).tolist(),
+                        }
+                        for step, trucks, actions, stations, queue_lengths, deposits in batch
+                    ],
+                }
+            )
+        for subscriber in self.subscribers:
+            if message is not None and not subscriber.lagging:
+                if len(subscriber.pending) >= self.max_pending:
+                    # too far behind, catch up from a snapshot instead
+                    self.batches_dropped += len(subscriber.pending) + 1
+                    subscriber.pending.clear()
+                    subscriber.lagging = True
+                else:
+                    subscriber.pending.append(message)
+            subscriber.ready.set()
+
+    def _snapshot_message(self) -> bytes:
+        """Returns the encoded snapshot of the latest published state."""
+
+        if self._snapshot is None:
+            step, actions, queue_lengths, deposits = self._published
+            self._snapshot = self._encode(
+                {
+                    "type": "snapshot",
+                    "step": step,
+                    "step_minutes": self.step_minutes,
+                    "actions": actions.tolist(),
+                    "queue_lengths": queue_lengths.tolist(),
+                    "deposits": deposits.tolist(),
+                }
+            )
+        return self._snapshot
+
+    @staticmethod
+    def _encode(message: dict) -> bytes:
+        return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+    async def _serve_subscriber(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Write every message published to one subscriber until it or the publisher leaves."""
+
+        subscriber = Subscriber(writer)
+        self.subscribers.add(subscriber)
+        self._handlers.add(asyncio.current_task())
+        subscriber.ready.set()
+        try:
+            while self._server is not None or subscriber.pending:
+                await subscriber.ready.wait()
+                subscriber.ready.clear()
+                if subscriber.lagging and self._published is not None:
+                    subscriber.lagging = False
+                    self.snapshots_sent += 1
+                    writer.write(self._snapshot_message())
+                while subscriber.pending:
+                    writer.write(subscriber.pending.popleft())
+                await writer.drain()
+            writer.write(self._encode({"type": "end"}))
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def _stop(self) -> None:
+        """Stop accepting subscribers and let the connected ones finish reading."""
+
+        server, self._server = self._server, None
+        server.close()
+        for subscriber in self.subscribers:
+            subscriber.ready.set()
+        handlers = list(self._handlers)
+        if handlers:
+            _, unfinished = await asyncio.wait(handlers, timeout=CLOSE_TIMEOUT)
+            for handler in unfinished:
+                handler.cancel()
+            if unfinished:
+                await asyncio.wait(unfinished)
+        await server.wait_closed()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def subscribe(path: str) -> AsyncIterator[dict]:
+    """
+    Connect to a LivePublisher and yield every message it sends until the run ends.
+
+    Args:
+        path: Unix socket the publisher listens on.
+    """
+
+    reader, writer = await asyncio.open_unix_connection(path, limit=2**26)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            if message["type"] == "end":
+                return
+            yield message
+    finally:
+        writer.close()
+
+
+def apply_message(state: dict, message: dict) -> None:
+    """
+    Apply a message from a LivePublisher to a subscriber's copy of the simulation state, a
+    dictionary holding the step, actions, queue_lengths and deposits of the last snapshot.
+
+    Args:
+        state: the state to update, empty before the first snapshot.
+        message: a snapshot or delta message.
+    """
+
+    if message["type"] == "snapshot":
+        state.update(message)
+        return
+    for row in message["steps"]:
+        for truck, action in row["trucks"]:
+            state["actions"][truck] = action
+        for station, queue_length, deposits in row["stations"]:
+            state["queue_lengths"][station] = queue_length
+            state["deposits"][station] = deposits
+    state["step"] = message["step"]
@@ -1,9 +1,11 @@
-import configparser
-import itertools
 import logging
-import random
+from collections import deque
+from typing import Optional
 
+from mining_simulator import trace
+from mining_simulator.config import SimConfig, default_config
 from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.sampling import MiningTimeSampler, mining_time_sampler
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -12,21 +14,36 @@ class MiningSite:
     """
     Class to represent a mining site. Used to manage the addition and removal
     of mining trucks from its queue.
-    """
 
-    id_iter = itertools.count()
+    Args:
+        sampler: source of mining times, usually shared by every mine, defaults to one for the
+            distribution in config seeded from the random module.
+        config: simulation parameters, defaults to the parsed sim_parameters.ini.
+        mine_id: id of the mine, numbered densely from zero by its coordinator.
+    """
 
-    def __init__(self) -> None:
-        self.id = next(self.id_iter)
-        self.queue: list[MiningTruck] = []
-        self.parameters = configparser.ConfigParser()
-        self.parameters.read("./sim_parameters.ini")
-        self.min_mine_time_hours = self.parameters.getint(
-            "mining", "min_mining_time_hours"
-        )
-        self.max_mine_time_hours = self.parameters.getint(
-            "mining", "max_mining_time_hours"
+    __slots__ = (
+        "id",
+        "sampler",
+        "queue",
+        "config",
+        "available",
+    )
+
+    def __init__(
+        self,
+        sampler: Optional[MiningTimeSampler] = None,
+        config: Optional[SimConfig] = None,
+        mine_id: int = 0,
+    ) -> None:
+        self.id = mine_id
+        self.queue: deque[MiningTruck] = deque()
+        self.config = config if config is not None else default_config()
+        self.sampler = (
+            sampler if sampler is not None else mining_time_sampler(self.config)
         )
+        # whether trucks can be sent to the mine, cleared while it is closed
+        self.available = True
 
     def __lt__(self, other) -> bool:
         """Comparison dunder override on queue length to use min to sort."""
@@ -54,13 +71,17 @@ class MiningSite:
             return False
 
         self.queue.append(truck)
-        truck.timer = (
-            random.randint(self.min_mine_time_hours, self.max_mine_time_hours) * 60
-        )
+        truck.timer = self.sampler.draw()
         truck.current_action = truck.Actions.MINING
-        logger.debug(
-            f"Truck {truck.id} is now mining at mine {self.id} with duration of {truck.timer}!"
-        )
+        if __debug__ and trace.enabled:
+            trace.event(
+                logger,
+                "start_mining",
+                "Truck %(truck)d is now mining at mine %(mine)d with duration of %(duration)d!",
+                truck=truck.id,
+                mine=self.id,
+                duration=truck.timer,
+            )
         return True
 
     def manage_queue(self) -> None:
@@ -72,7 +93,12 @@ class MiningSite:
         if self.queue:
             truck = self.queue[0]
             if truck.timer == 0:
-                logger.debug(
-                    f"Truck {truck.id} has completed mining at mine {self.id}!"
-                )
-                self.queue.pop(0)
+                if __debug__ and trace.enabled:
+                    trace.event(
+                        logger,
+                        "finish_mining",
+                        "Truck %(truck)d has completed mining at mine %(mine)d!",
+                        truck=truck.id,
+                        mine=self.id,
+                    )
+                self.queue.popleft()
@@ -1,7 +1,9 @@
-import configparser
-import itertools
 import logging
-from enum import Enum
+from typing import Optional
+
+from mining_simulator.config import SimConfig, default_config
+from mining_simulator.statistics import RunningStatistics
+from mining_simulator.truck_classes import TruckClass, truck_classes
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -10,30 +12,79 @@ class MiningTruck:
     """
     Class to represent a mining truck. Used to manage its state machine
     and activity timers. Records its statistics to measure performance.
-    """
 
-    class Actions(Enum):
-        """Enumerations for possible truck actions to control state machine."""
+    Slotted, with actions stored as small integers and parameters shared through
+    one SimConfig and one TruckClass per class, to keep large fleets compact.
 
-        WAITING = "Waiting"
-        TRAVEL_TO_MINE = "Travel to Mine"
-        TRAVEL_TO_UNLOAD = "Travel to Unload"
-        UNLOADING = "Unloading"
-        MINING = "Mining"
-
-    id_iter = itertools.count()
+    Args:
+        config: simulation parameters, defaults to the parsed sim_parameters.ini.
+        truck_id: id of the truck, numbered densely from zero by its coordinator.
+        truck_class: class of the truck, defaults to the first of the config's truck classes.
+    """
 
-    def __init__(self) -> None:
-        self.id = next(self.id_iter)
+    class Actions:
+        """Integer codes for possible truck actions to control state machine."""
+
+        WAITING = 0
+        TRAVEL_TO_MINE = 1
+        TRAVEL_TO_UNLOAD = 2
+        UNLOADING = 3
+        MINING = 4
+
+    # display names of the actions, indexed by action code
+    ACTION_NAMES = (
+        "Waiting",
+        "Travel to Mine",
+        "Travel to Unload",
+        "Unloading",
+        "Mining",
+    )
+    # state machine, see README for more details. Indexed by action code.
+    NEXT_ACTION = (
+        Actions.WAITING,
+        Actions.MINING,
+        Actions.UNLOADING,
+        Actions.TRAVEL_TO_MINE,
+        Actions.TRAVEL_TO_UNLOAD,
+    )
+
+    __slots__ = (
+        "id",
+        "timer",
+        "current_action",
+        "config",
+        "truck_class",
+        "travel_time_minutes",
+        "sim_step_time_minutes",
+        "time_waiting",
+        "time_mining",
+        "time_travelling",
+        "time_unloading",
+        "units_mined",
+        "idk",
+        "cycle_times",
+        "cycle_start_minutes",
+        "cycle_wait_start",
+        "available",
+    )
+
+    def __init__(
+        self,
+        config: Optional[SimConfig] = None,
+        truck_id: int = 0,
+        truck_class: Optional[TruckClass] = None,
+    ) -> None:
+        self.id = truck_id
         self.timer = 0
         self.current_action = self.Actions.TRAVEL_TO_MINE
 
-        self.parameters = configparser.ConfigParser()
-        self.parameters.read("./sim_parameters.ini")
-        self.travel_time_minutes = self.parameters.getint(
-            "truck", "travel_time_minutes"
+        self.config = config if config is not None else default_config()
+        self.truck_class = (
+            truck_class if truck_class is not None else truck_classes(self.config)[0]
         )
-        self.sim_step_time_minutes = self.parameters.getint("sim", "sim_step_minutes")
+        # set by a NetworkRouter for every trip on a site graph
+        self.travel_time_minutes = self.truck_class.travel_time_minutes
+        self.sim_step_time_minutes = self.config.sim_step_minutes
 
         self.time_waiting = 0
         self.time_mining = 0
@@ -42,10 +93,18 @@ class MiningTruck:
         self.units_mined = 0
         self.idk = 0
 
+        # duration of every completed trip from unloading to unloading
+        self.cycle_times = RunningStatistics()
+        # elapsed and waiting minutes when the current cycle started
+        self.cycle_start_minutes = 0
+        self.cycle_wait_start = 0
+        # whether the truck can be sent to a mine, cleared during maintenance
+        self.available = True
+
     def __str__(self) -> str:
         """For debugging state of truck."""
 
-        return f"Truck {self.id} is currently {self.current_action.value} with {self.timer} minutes left.\n"
+        return f"Truck {self.id} is currently {self.ACTION_NAMES[self.current_action]} with {self.timer} minutes left.\n"
 
     def __add__(self, other) -> int:
         """Addition dunder override to help sum total wait times at unloading queues."""
@@ -76,7 +135,15 @@ class MiningTruck:
         else:
             self.timer -= self.sim_step_time_minutes
 
-    def next_action(self) -> Actions:
+    def hold(self):
+        """
+        Spend one time step idle where the truck is, without moving the state machine forwards,
+        as a truck that arrived but could not be dispatched, e.g. while in maintenance, does.
+        """
+
+        self.idk += self.sim_step_time_minutes
+
+    def next_action(self) -> int:
         """
         State machine control, see README for more details.
 
@@ -84,34 +151,79 @@ class MiningTruck:
             Returns next truck state Action.
         """
 
-        if self.current_action == self.Actions.MINING:
-            return self.Actions.TRAVEL_TO_UNLOAD
-        elif self.current_action == self.Actions.UNLOADING:
-            return self.Actions.TRAVEL_TO_MINE
-        elif self.current_action == self.Actions.TRAVEL_TO_MINE:
-            return self.Actions.MINING
-        elif self.current_action == self.Actions.TRAVEL_TO_UNLOAD:
-            return self.Actions.UNLOADING
-        else:
-            # default state
-            return self.current_action
+        return self.NEXT_ACTION[self.current_action]
 
-    def increment_counters(self):
-        """Helper function to increment counters based on current action."""
+    def increment_counters(self, num_steps: int = 1):
+        """Helper function to increment counters based on current action.
 
+        Args:
+            num_steps: number of time steps spent in the current action.
+        """
+
+        elapsed = num_steps * self.sim_step_time_minutes
         if self.current_action == self.Actions.WAITING:
-            self.time_waiting += self.sim_step_time_minutes
+            self.time_waiting += elapsed
         elif (
             self.current_action == self.Actions.TRAVEL_TO_MINE
             or self.current_action == self.Actions.TRAVEL_TO_UNLOAD
         ):
-            self.time_travelling += self.sim_step_time_minutes
+            self.time_travelling += elapsed
         elif self.current_action == self.Actions.MINING:
-            self.time_mining += self.sim_step_time_minutes
+            self.time_mining += elapsed
         elif self.current_action == self.Actions.UNLOADING:
-            self.time_unloading += self.sim_step_time_minutes
+            self.time_unloading += elapsed
         else:
-            self.idk += self.sim_step_time_minutes
+            self.idk += elapsed
+
+    def fast_forward(self, num_steps: int):
+        """
+        Apply several time steps in which the truck does not change state at once.
+        Equivalent to calling take_action num_steps times, as long as the timer does
+        not run out on an action that would move the state machine forwards.
+
+        Args:
+            num_steps: number of time steps to skip.
+        """
+
+        if num_steps <= 0:
+            return
+        self.increment_counters(num_steps)
+        if self.timer % self.sim_step_time_minutes == 0:
+            # a waiting truck sits at zero until its station lets it unload
+            self.timer = max(self.timer - num_steps * self.sim_step_time_minutes, 0)
+        else:
+            self.timer -= num_steps * self.sim_step_time_minutes
+
+    def elapsed_minutes(self) -> int:
+        """Returns the minutes the truck has spent in every action since it was created."""
+
+        return (
+            self.time_waiting
+            + self.time_mining
+            + self.time_travelling
+            + self.time_unloading
+            + self.idk
+        )
+
+    def finish_cycle(self, elapsed_minutes: Optional[int] = None) -> tuple[int, int]:
+        """
+        Close the truck's current cycle as it finishes unloading and start the next one.
+
+        Args:
+            elapsed_minutes: elapsed_minutes when the cycle ended, defaults to the current ones.
+
+        Returns:
+            The duration of the cycle and the minutes spent waiting to unload during it.
+        """
+
+        if elapsed_minutes is None:
+            elapsed_minutes = self.elapsed_minutes()
+        cycle = elapsed_minutes - self.cycle_start_minutes
+        wait = self.time_waiting - self.cycle_wait_start
+        self.cycle_times.add(cycle)
+        self.cycle_start_minutes = elapsed_minutes
+        self.cycle_wait_start = self.time_waiting
+        return cycle, wait
 
     def output_statistics(self):
         """Function to log performance of mining truck."""
@@ -124,4 +236,6 @@ class MiningTruck:
             f"  {self.time_unloading} minutes unloading.\n"
             f"  {self.time_waiting} minutes waiting.\n"
             f"  {self.idk} minutes idling.\n"
+            f"Truck {self.id} took {self.cycle_times.mean:.1f} minutes per cycle on average "
+            f"over {self.cycle_times.count} cycles, standard deviation {self.cycle_times.std:.1f}.\n"
         )
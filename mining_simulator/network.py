@@ -0,0 +1,289 @@
+import hashlib
+import heapq
+import json
+import logging
+import os
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from mining_simulator.config import SimConfig
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.truck_classes import truck_classes
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+SiteGraph = dict[str, Any]
+
+
+def load_graph(path: str) -> SiteGraph:
+    """
+    Read a site graph from a JSON file of the form
+
+        {
+            "mines": ["north", "south"],
+            "stations": ["depot"],
+            "roads": [
+                {"from": "north", "to": "junction", "length_km": 12, "speed_kmh": 40},
+                ...
+            ]
+        }
+
+    Roads can be driven both ways. Nodes that are neither a mine nor a station are junctions.
+
+    Args:
+        path: JSON file describing the graph.
+
+    Returns:
+        The graph, validated.
+    """
+
+    with open(path) as file:
+        graph = json.load(file)
+    for key in ("mines", "stations", "roads"):
+        if not graph.get(key):
+            raise ValueError(f"Site graph {path} has no {key}")
+    for road in graph["roads"]:
+        if road["length_km"] < 0 or road["speed_kmh"] <= 0:
+            raise ValueError(f"Invalid road {road['from']} to {road['to']} in {path}")
+    return graph
+
+
+def graph_key(graph: SiteGraph) -> str:
+    """Returns a stable hash of a site graph, keying its cached travel time matrix."""
+
+    payload = json.dumps(graph, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def travel_time_matrix(graph: SiteGraph) -> np.ndarray:
+    """
+    Compute the quickest travel time in minutes between every mine and every station of a site
+    graph, running Dijkstra's algorithm from every station.
+
+    Returns:
+        Matrix of travel times indexed by mine and station, in the order of the graph.
+    """
+
+    adjacency: dict[str, list[tuple[str, float]]] = {}
+    for road in graph["roads"]:
+        minutes = road["length_km"] / road["speed_kmh"] * 60
+        adjacency.setdefault(road["from"], []).append((road["to"], minutes))
+        adjacency.setdefault(road["to"], []).append((road["from"], minutes))
+
+    mines = graph["mines"]
+    matrix = np.empty((len(mines), len(graph["stations"])), dtype=np.float64)
+    for column, station in enumerate(graph["stations"]):
+        distance = {station: 0.0}
+        heap = [(0.0, station)]
+        while heap:
+            minutes, node = heapq.heappop(heap)
+            if minutes > distance[node]:
+                continue
+            for neighbour, length in adjacency.get(node, ()):
+                candidate = minutes + length
+                if candidate < distance.get(neighbour, float("inf")):
+                    distance[neighbour] = candidate
+                    heapq.heappush(heap, (candidate, neighbour))
+        for row, mine in enumerate(mines):
+            if mine not in distance:
+                raise ValueError(f"Mine {mine} cannot reach station {station}")
+            matrix[row, column] = distance[mine]
+    return matrix
+
+
+def cached_travel_time_matrix(graph: SiteGraph, cache_dir: str) -> np.ndarray:
+    """
+    Returns the travel time matrix of a site graph, computed once and then read from
+    cache_dir/<graph_key>.npy.
+
+    Args:
+        graph: site graph, see load_graph.
+        cache_dir: directory holding computed matrices, created if missing.
+    """
+
+    path = os.path.join(cache_dir, f"{graph_key(graph)}.npy")
+    try:
+        return np.load(path)
+    except FileNotFoundError:
+        pass
+
+    matrix = travel_time_matrix(graph)
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(temporary, matrix)
+    os.replace(temporary, path)
+    logger.info(f"Cached travel times of {matrix.size} routes to {path}\n")
+    return matrix
+
+
+class NetworkRouter:
+    """
+    Routes trucks over a site graph, replacing the single travel time and the dispatch policies
+    of the coordinator. Mine i of the coordinator is located at mine i % M of the graph and
+    unloading station j at station j % S, so several mines or stations can share a location.
+
+    A truck's destination is picked when it leaves a site, so its travel time is known when it
+    sets off. A truck leaving a mine is booked at the station it can start unloading at the
+    soonest: the later of its arrival and the time the station's queue, and the trucks already
+    booked at it, are done. Stations are tried nearest first, so the search stops as soon as
+    the remaining stations are further away than the best start found. A truck leaving a
+    station is booked at a free mine at the nearest location that has one. Travel times are
+    looked up in a precomputed matrix, rounded up to whole time steps, and unloading times
+    taken from each truck's class.
+
+    Args:
+        travel_minutes: travel time matrix indexed by mine and station location.
+        stations: the coordinator's unloading stations.
+        num_mines: number of the coordinator's mines.
+        step_minutes: size of one simulation time step in minutes.
+    """
+
+    def __init__(
+        self,
+        travel_minutes: np.ndarray,
+        stations: Sequence[Any],
+        num_mines: int,
+        step_minutes: int,
+    ) -> None:
+        self.stations = stations
+        num_mine_locations, num_station_locations = travel_minutes.shape
+        steps = np.ceil(travel_minutes / step_minutes - 1e-9).astype(np.int64)
+        self.travel_minutes = (steps * step_minutes).tolist()
+
+        self.mine_location = [
+            position % num_mine_locations for position in range(num_mines)
+        ]
+        self.station_location = [
+            position % num_station_locations for position in range(len(stations))
+        ]
+        station_travel = np.asarray(self.travel_minutes)[:, self.station_location]
+        self.stations_by_distance = [
+            np.argsort(row, kind="stable").tolist() for row in station_travel
+        ]
+        self.mine_locations_by_distance = [
+            np.argsort(column, kind="stable").tolist()
+            for column in np.asarray(self.travel_minutes).T
+        ]
+
+        # free mines at every location that no truck is heading to
+        self.free_mines: list[list[int]] = [[] for _ in range(num_mine_locations)]
+        for position in range(num_mines):
+            self.free_mines[self.mine_location[position]].append(position)
+        self.booked_minutes = [0] * len(stations)
+        # destination position of every truck on its way, by truck id
+        self.station_bookings: dict[int, int] = {}
+        self.mine_bookings: dict[int, int] = {}
+
+    def travel_time(self, mine: int, station: int) -> int:
+        """Returns the travel time in minutes between a mine and a station, by position."""
+
+        return self.travel_minutes[self.mine_location[mine]][
+            self.station_location[station]
+        ]
+
+    def depart_mine(self, truck: MiningTruck, mine: int) -> int:
+        """
+        Book a truck that has just left a mine at an unloading station and set its travel time.
+
+        Args:
+            truck: the truck leaving.
+            mine: position of the mine it leaves.
+
+        Returns:
+            The position of the station it was booked at.
+        """
+
+        location = self.mine_location[mine]
+        heapq.heappush(self.free_mines[location], mine)
+
+        travel = self.travel_minutes[location]
+        best_start = None
+        best = 0
+        for position in self.stations_by_distance[location]:
+            arrival = travel[self.station_location[position]]
+            if best_start is not None and arrival >= best_start:
+                break
+            busy = (
+                self.stations[position].current_wait_time
+                + self.booked_minutes[position]
+            )
+            start = max(arrival, busy)
+            if best_start is None or start < best_start:
+                best_start = start
+                best = position
+
+        self.station_bookings[truck.id] = best
+        self.booked_minutes[best] += truck.truck_class.unload_time_minutes
+        truck.travel_time_minutes = travel[self.station_location[best]]
+        return best
+
+    def depart_station(self, truck: MiningTruck, station: int) -> int:
+        """
+        Book a truck that has just left an unloading station at the nearest free mine and set
+        its travel time.
+
+        Args:
+            truck: the truck leaving.
+            station: position of the station it leaves.
+
+        Returns:
+            The position of the mine it was booked at.
+        """
+
+        location = self.station_location[station]
+        for mine_location in self.mine_locations_by_distance[location]:
+            if self.free_mines[mine_location]:
+                mine = heapq.heappop(self.free_mines[mine_location])
+                self.mine_bookings[truck.id] = mine
+                truck.travel_time_minutes = self.travel_minutes[mine_location][location]
+                return mine
+        raise RuntimeError("Every mine is taken")
+
+    def arrive_station(self, truck: MiningTruck) -> Optional[int]:
+        """Returns the station a truck arriving to unload was booked at, if any."""
+
+        position = self.station_bookings.pop(truck.id, None)
+        if position is not None:
+            # the station's wait time grows by as much once the truck joins its queue
+            self.booked_minutes[position] -= truck.truck_class.unload_time_minutes
+        return position
+
+    def arrive_mine(self, truck: MiningTruck) -> int:
+        """
+        Returns the mine a truck arriving to mine was booked at. Trucks without a booking, at
+        the start of a run, take the first free mine.
+        """
+
+        position = self.mine_bookings.pop(truck.id, None)
+        if position is not None:
+            return position
+        for free in self.free_mines:
+            if free:
+                return heapq.heappop(free)
+        raise RuntimeError("Every mine is taken")
+
+
+def network_router(
+    config: SimConfig, stations: Sequence[Any], num_mines: int
+) -> Optional[NetworkRouter]:
+    """
+    Returns a router over the site graph in config.network_file, or None if no graph is
+    configured.
+
+    Args:
+        config: simulation parameters.
+        stations: the coordinator's unloading stations.
+        num_mines: number of the coordinator's mines.
+    """
+
+    if config.network_file is None:
+        return None
+    # every trip takes the route's travel time, which has no notion of a truck's speed
+    if len(set(truck_classes(config).travel_time_minutes.tolist())) > 1:
+        raise ValueError(
+            "Site graphs need every truck class to have the same travel time"
+        )
+    graph = load_graph(config.network_file)
+    matrix = cached_travel_time_matrix(graph, config.network_cache_dir)
+    return NetworkRouter(matrix, stations, num_mines, config.sim_step_minutes)
@@ -0,0 +1,112 @@
+import cProfile
+import logging
+import time
+from typing import Optional
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class PhaseProfiler:
+    """
+    Opt-in instrumentation of MiningCoordinator.time_step and VectorizedFleet.time_step.
+    Accumulates the wall-clock time spent in each phase of a time step and counts the events
+    each time step handles. Can also run cProfile over a window of time steps, to see which
+    functions a slow stretch of the simulation spends its time in.
+
+    Attach it through the profiler attribute of the coordinator or fleet, and close it once the
+    simulation is done.
+
+    Args:
+        cprofile_window: first and last time step, exclusive, to run cProfile for.
+        cprofile_path: file to write the cProfile statistics to once the window closes.
+    """
+
+    PHASES = ("mines", "stations", "dispatch", "trucks")
+    EVENTS = ("mines_freed", "unloads", "dispatches")
+
+    def __init__(
+        self,
+        cprofile_window: Optional[tuple[int, int]] = None,
+        cprofile_path: str = "simulation.prof",
+    ) -> None:
+        self.ticks = 0
+        self.phase_seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.event_counts = dict.fromkeys(self.EVENTS, 0)
+        self.max_events_per_tick = 0
+
+        self.cprofile_window = cprofile_window
+        self.cprofile_path = cprofile_path
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def start_tick(self) -> float:
+        """
+        Mark the start of a time step, starting or stopping cProfile at the window's bounds.
+
+        Returns:
+            The time the step started at, to pass to lap.
+        """
+
+        if self.cprofile_window is not None:
+            if self.ticks == self.cprofile_window[0]:
+                self._cprofile = cProfile.Profile()
+                self._cprofile.enable()
+            elif self.ticks == self.cprofile_window[1]:
+                self.stop_cprofile()
+        return time.perf_counter()
+
+    def lap(self, phase: str, start: float) -> float:
+        """
+        Add the time since start to a phase.
+
+        Returns:
+            The current time, where the next phase starts.
+        """
+
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - start
+        return now
+
+    def end_tick(self, mines_freed: int, unloads: int, dispatches: int) -> None:
+        """Count the events handled during a time step."""
+
+        self.ticks += 1
+        self.event_counts["mines_freed"] += mines_freed
+        self.event_counts["unloads"] += unloads
+        self.event_counts["dispatches"] += dispatches
+        self.max_events_per_tick = max(
+            self.max_events_per_tick, mines_freed + unloads + dispatches
+        )
+
+    def stop_cprofile(self) -> None:
+        """Stop cProfile if it is running and write its statistics."""
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            logger.info(
+                f"Wrote cProfile statistics of time steps {self.cprofile_window[0]} to "
+                f"{self.ticks} to {self.cprofile_path}\n"
+            )
+            self._cprofile = None
+
+    def close(self) -> None:
+        """Stop a cProfile window that is still open when the simulation ends."""
+
+        self.stop_cprofile()
+
+    def output_statistics(self) -> None:
+        """Log the time spent in each phase and the events handled per time step."""
+
+        total = sum(self.phase_seconds.values())
+        ticks = max(self.ticks, 1)
+        lines = [f"\nTime step profile over {self.ticks} time steps:"]
+        for phase, seconds in self.phase_seconds.items():
+            share = seconds / total if total else 0.0
+            lines.append(
+                f"  {phase}: {seconds:.3f} seconds ({share:.1%}), "
+                f"{seconds / ticks * 1e6:.1f} microseconds per time step"
+            )
+        for name, count in self.event_counts.items():
+            lines.append(f"  {name}: {count} ({count / ticks:.2f} per time step)")
+        lines.append(f"  most events in one time step: {self.max_events_per_tick}")
+        logger.info("\n".join(lines) + "\n")
@@ -0,0 +1,231 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.fleet import (
+    TIME_MINING,
+    TIME_TRAVELLING,
+    TIME_UNLOADING,
+    TIME_WAITING,
+    VectorizedFleet,
+)
+from mining_simulator.statistics import Distribution, merged
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+PERCENTILES = (5, 50, 95)
+
+# two-sided 95% normal quantile used for the confidence interval of the mean
+Z_95 = 1.959964
+
+
+def replica_seeds(base_seed: Optional[int], num_replications: int) -> list[int]:
+    """
+    Derive one independent seed per replica from a single base seed. Every replica gets its own
+    statistically independent random stream and the same base seed always yields the same seeds.
+
+    Args:
+        base_seed: seed of the whole batch, fresh entropy is used if None.
+        num_replications: number of seeds to derive.
+
+    Returns:
+        A list of integer seeds, one per replica.
+    """
+
+    sequence = np.random.SeedSequence(base_seed)
+    if base_seed is None:
+        logger.info(f"Replication base seed: {sequence.entropy}")
+    return [
+        int(child.generate_state(1, dtype=np.uint64)[0])
+        for child in sequence.spawn(num_replications)
+    ]
+
+
+def run_statistics(
+    coordinator: Union[MiningCoordinator, VectorizedFleet], duration_hours: float
+) -> dict[str, float]:
+    """
+    Reduce the state of a finished simulation to the scalar metrics compared across replicas.
+
+    Args:
+        coordinator: the MiningCoordinator or VectorizedFleet that was simulated.
+        duration_hours: simulated duration in hours.
+
+    Returns:
+        A dictionary of metric name to value.
+    """
+
+    if isinstance(coordinator, VectorizedFleet):
+        units_mined = coordinator.units_mined
+        counters = coordinator.time_counters
+        time_mining = counters[:, TIME_MINING]
+        time_travelling = counters[:, TIME_TRAVELLING]
+        time_unloading = counters[:, TIME_UNLOADING]
+        time_waiting = counters[:, TIME_WAITING]
+        station_wait = coordinator.total_wait_time
+        unloads = coordinator.wait_times.count
+    else:
+        trucks = coordinator.trucks
+        units_mined = np.array([truck.units_mined for truck in trucks])
+        time_mining = np.array([truck.time_mining for truck in trucks])
+        time_travelling = np.array([truck.time_travelling for truck in trucks])
+        time_unloading = np.array([truck.time_unloading for truck in trucks])
+        time_waiting = np.array([truck.time_waiting for truck in trucks])
+        station_wait = np.array(
+            [station.total_wait_time for station in coordinator.unloading_stations]
+        )
+        unloads = sum(
+            station.wait_times.count for station in coordinator.unloading_stations
+        )
+
+    units_deposited = float(units_mined.sum())
+    # trucks of some truck classes deposit more than one unit per unload
+    wait_per_unload = float(station_wait.sum()) / unloads if unloads else 0.0
+    return {
+        "units_deposited": units_deposited,
+        "throughput_per_hour": units_deposited / duration_hours,
+        "truck_units_mined": float(units_mined.mean()),
+        "truck_time_mining": float(time_mining.mean()),
+        "truck_time_travelling": float(time_travelling.mean()),
+        "truck_time_unloading": float(time_unloading.mean()),
+        "truck_time_waiting": float(time_waiting.mean()),
+        "station_total_wait_time": float(station_wait.mean()),
+        "wait_per_unload": wait_per_unload,
+    }
+
+
+def run_replications(
+    run_replica: Callable[[int], dict[str, float]],
+    seeds: list[int],
+    max_workers: Optional[int] = None,
+    initializer: Optional[Callable[[], None]] = None,
+) -> list[dict[str, float]]:
+    """
+    Run one replica per seed across a pool of worker processes.
+
+    Args:
+        run_replica: picklable function running one replica from its seed and returning
+            its run_statistics.
+        seeds: one seed per replica.
+        max_workers: number of worker processes, defaults to the number of CPUs.
+        initializer: called once in every worker process before it runs replicas.
+
+    Returns:
+        The statistics of every replica, in the order of seeds.
+    """
+
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(seeds) // (4 * workers))
+    with ProcessPoolExecutor(max_workers, initializer=initializer) as executor:
+        return list(executor.map(run_replica, seeds, chunksize=chunksize))
+
+
+def summarize_replications(runs: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    """
+    Reduce the statistics of several replicas into the mean, variance, 95% confidence interval
+    of the mean and percentiles of every metric.
+
+    Args:
+        runs: run_statistics of every replica.
+
+    Returns:
+        A dictionary of metric name to a dictionary of summary statistics.
+    """
+
+    summary = {}
+    for metric in runs[0]:
+        values = np.array([run[metric] for run in runs], dtype=np.float64)
+        mean = float(values.mean())
+        variance = float(values.var(ddof=1)) if values.size > 1 else 0.0
+        half_width = Z_95 * (variance / values.size) ** 0.5
+        summary[metric] = {
+            "mean": mean,
+            "variance": variance,
+            "ci95_low": mean - half_width,
+            "ci95_high": mean + half_width,
+        }
+        for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            summary[metric][f"p{percentile}"] = float(value)
+    return summary
+
+
+def run_distributions(coordinator: Any) -> dict[str, Distribution]:
+    """
+    Returns the distributions of cycle times, minutes waited per unload and trucks found queued
+    on arrival at a station across the whole fleet, as accumulated during the simulation. Those
+    of every station are merged, with a VectorizedFleet they are kept fleet-wide.
+
+    Args:
+        coordinator: the MiningCoordinator, VectorizedFleet or ShardedCoordinator that was
+            simulated.
+    """
+
+    if isinstance(coordinator, VectorizedFleet):
+        return {
+            "cycle_time": coordinator.cycle_times,
+            "wait_time": coordinator.wait_times,
+            "queue_length": coordinator.queue_lengths,
+        }
+    stations = coordinator.unloading_stations
+    return {
+        "cycle_time": merged(station.cycle_times for station in stations),
+        "wait_time": merged(station.wait_times for station in stations),
+        "queue_length": merged(station.queue_lengths for station in stations),
+    }
+
+
+def output_run_distributions(coordinator: Any, duration_hours: float) -> None:
+    """
+    Log the fleet's throughput and the distributions of run_distributions.
+
+    Args:
+        coordinator: the simulated coordinator, see run_distributions.
+        duration_hours: simulated duration in hours.
+    """
+
+    distributions = run_distributions(coordinator)
+    # trucks of some truck classes deposit more than one unit per unload
+    if isinstance(coordinator, VectorizedFleet):
+        units_deposited = int(coordinator.units_deposited.sum())
+    else:
+        units_deposited = sum(
+            station.units_deposited for station in coordinator.unloading_stations
+        )
+    lines = [
+        f"\nFleet throughput: {units_deposited / duration_hours:.2f} units He-3 per hour."
+    ]
+    for name, unit in (
+        ("cycle_time", "minutes"),
+        ("wait_time", "minutes"),
+        ("queue_length", "trucks"),
+    ):
+        distribution = distributions[name]
+        if not distribution.count:
+            continue
+        lines.append(
+            f"  {name} in {unit}: mean {distribution.mean:.2f}, "
+            f"standard deviation {distribution.std:.2f}, "
+            f"p50 {distribution.quantile(0.5):.1f}, p90 {distribution.quantile(0.9):.1f}, "
+            f"p99 {distribution.quantile(0.99):.1f}, max {distribution.quantile(1):.0f}"
+        )
+    logger.info("\n".join(lines) + "\n")
+
+
+def output_replication_statistics(
+    summary: dict[str, dict[str, float]], num_replications: int
+) -> None:
+    """Log the summary of a batch of replications."""
+
+    lines = [f"\nStatistics over {num_replications} replications:"]
+    for metric, stats in summary.items():
+        lines.append(
+            f"  {metric}: mean {stats['mean']:.2f} "
+            f"(95% CI {stats['ci95_low']:.2f} - {stats['ci95_high']:.2f}), "
+            f"variance {stats['variance']:.2f}, "
+            f"p5 {stats['p5']:.2f}, p50 {stats['p50']:.2f}, p95 {stats['p95']:.2f}"
+        )
+    logger.info("\n".join(lines) + "\n")
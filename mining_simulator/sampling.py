@@ -0,0 +1,225 @@
+import csv
+import random
+from typing import Optional, Union
+
+import numpy as np
+
+from mining_simulator.config import SimConfig, default_config
+
+# mining times drawn at once whenever the buffer runs dry
+BLOCK_SIZE = 4096
+
+
+class UniformMiningTime:
+    """Whole hours drawn uniformly between min and max, both included, as in the original rules."""
+
+    def __init__(self, min_hours: int, max_hours: int) -> None:
+        self.min_hours = min_hours
+        self.max_hours = max_hours
+        self.min_minutes = min_hours * 60
+        self.mean_minutes = (min_hours + max_hours) * 30
+        # every mining time is a multiple of this many minutes
+        self.granularity_minutes = 60
+
+    def sample(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        return generator.integers(self.min_hours, self.max_hours + 1, size) * 60
+
+
+class TriangularMiningTime:
+    """
+    Mining times from a triangular distribution between min and max hours, peaking at the mode,
+    rounded to the nearest time step and at least one time step long.
+    """
+
+    def __init__(
+        self, min_hours: float, mode_hours: float, max_hours: float, step_minutes: int
+    ) -> None:
+        if not min_hours <= mode_hours <= max_hours:
+            raise ValueError(
+                f"mining_time_mode_hours {mode_hours} is not between "
+                f"{min_hours} and {max_hours}"
+            )
+        self.bounds = (min_hours * 60, mode_hours * 60, max_hours * 60)
+        self.step_minutes = step_minutes
+        self.min_minutes = max(round(min_hours * 60 / step_minutes), 1) * step_minutes
+        self.mean_minutes = sum(self.bounds) / 3
+        self.granularity_minutes = step_minutes
+
+    def sample(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        left, mode, right = self.bounds
+        if left == right:
+            minutes = np.full(size, left)
+        else:
+            minutes = generator.triangular(left, mode, right, size)
+        steps = np.maximum(np.rint(minutes / self.step_minutes), 1).astype(np.int64)
+        return steps * self.step_minutes
+
+
+class EmpiricalMiningTime:
+    """
+    Mining times resampled from historic ones, rounded to the nearest time step and at least one
+    time step long.
+
+    Args:
+        minutes: historic mining times in minutes.
+        step_minutes: size of one simulation time step in minutes.
+    """
+
+    def __init__(self, minutes: np.ndarray, step_minutes: int) -> None:
+        if not minutes.size:
+            raise ValueError("No historic mining times to sample from")
+        if (minutes < 0).any():
+            raise ValueError("Historic mining times cannot be negative")
+        steps = np.maximum(np.rint(minutes / step_minutes), 1).astype(np.int64)
+        self.minutes = steps * step_minutes
+        self.min_minutes = int(self.minutes.min())
+        self.mean_minutes = float(self.minutes.mean())
+        self.granularity_minutes = step_minutes
+
+    @classmethod
+    def from_csv(cls, path: str, step_minutes: int) -> "EmpiricalMiningTime":
+        """
+        Read historic mining times in minutes from the first column of a CSV file. Rows whose
+        first column is not a number, such as a header, are skipped.
+        """
+
+        values = []
+        with open(path, newline="") as file:
+            for row in csv.reader(file):
+                if not row:
+                    continue
+                try:
+                    values.append(float(row[0]))
+                except ValueError:
+                    continue
+        return cls(np.array(values, dtype=np.float64), step_minutes)
+
+    def sample(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        return generator.choice(self.minutes, size)
+
+
+MiningTimeDistribution = Union[
+    UniformMiningTime, TriangularMiningTime, EmpiricalMiningTime
+]
+
+
+class MiningTimeSampler:
+    """
+    Source of mining times shared by every mine of a coordinator, or by a VectorizedFleet. Draws
+    durations from its own seeded NumPy generator in blocks of block_size and hands them out
+    from a buffer, so a mining start costs a list lookup rather than a call into the random
+    module. Durations come out in the same order however they are taken, one at a time with
+    draw or several at once with draw_many.
+
+    Args:
+        distribution: distribution of the mining times, see mining_time_distribution.
+        seed: seed of the generator, drawn from the random module if not given.
+        block_size: number of mining times drawn at once.
+    """
+
+    def __init__(
+        self,
+        distribution: MiningTimeDistribution,
+        seed: Optional[int] = None,
+        block_size: int = BLOCK_SIZE,
+    ) -> None:
+        self.distribution = distribution
+        self.generator = np.random.default_rng(
+            seed if seed is not None else random.getrandbits(64)
+        )
+        self.block_size = block_size
+        self._buffer: list[int] = []
+        self._next = 0
+
+    @property
+    def min_minutes(self) -> int:
+        """Shortest mining time the distribution can produce."""
+
+        return self.distribution.min_minutes
+
+    @property
+    def mean_minutes(self) -> float:
+        """Mean mining time of the distribution."""
+
+        return self.distribution.mean_minutes
+
+    @property
+    def granularity_minutes(self) -> int:
+        """Every mining time is a multiple of this many minutes."""
+
+        return self.distribution.granularity_minutes
+
+    def _refill(self) -> None:
+        self._buffer = self.distribution.sample(
+            self.generator, self.block_size
+        ).tolist()
+        self._next = 0
+
+    def draw(self) -> int:
+        """Returns the next mining time in minutes."""
+
+        if self._next == len(self._buffer):
+            self._refill()
+        minutes = self._buffer[self._next]
+        self._next += 1
+        return minutes
+
+    def draw_many(self, count: int) -> np.ndarray:
+        """Returns the next count mining times in minutes."""
+
+        drawn = []
+        while count:
+            if self._next == len(self._buffer):
+                self._refill()
+            taken = self._buffer[self._next : self._next + count]
+            self._next += len(taken)
+            count -= len(taken)
+            drawn.extend(taken)
+        return np.array(drawn, dtype=np.int64)
+
+
+def mining_time_sampler(
+    config: Optional[SimConfig] = None, rng: Optional[random.Random] = None
+) -> MiningTimeSampler:
+    """
+    Returns a sampler for the mining time distribution named by config.mining_time_distribution:
+    uniform, triangular or empirical.
+
+    Args:
+        config: simulation parameters, defaults to the parsed sim_parameters.ini.
+        rng: generator to draw the sampler's seed from, defaults to the random module, so runs
+            seeded through it stay reproducible.
+    """
+
+    config = config if config is not None else default_config()
+    name = config.mining_time_distribution
+    distribution: MiningTimeDistribution
+    if name == "uniform":
+        distribution = UniformMiningTime(
+            config.min_mining_time_hours, config.max_mining_time_hours
+        )
+    elif name == "triangular":
+        mode = config.mining_time_mode_hours
+        if mode is None:
+            mode = (config.min_mining_time_hours + config.max_mining_time_hours) / 2
+        distribution = TriangularMiningTime(
+            config.min_mining_time_hours,
+            mode,
+            config.max_mining_time_hours,
+            config.sim_step_minutes,
+        )
+    elif name == "empirical":
+        if config.mining_time_file is None:
+            raise ValueError(
+                "mining_time_file is required by the empirical distribution"
+            )
+        distribution = EmpiricalMiningTime.from_csv(
+            config.mining_time_file, config.sim_step_minutes
+        )
+    else:
+        raise ValueError(
+            f"Unknown mining_time_distribution {name}, "
+            "expected one of uniform, triangular, empirical"
+        )
+    seed = (rng if rng is not None else random).getrandbits(64)
+    return MiningTimeSampler(distribution, seed)
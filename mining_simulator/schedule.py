@@ -0,0 +1,184 @@
+import json
+import math
+from typing import Any, Optional
+
+import numpy as np
+
+from mining_simulator.config import SimConfig
+
+# kinds of site or truck a window makes unavailable, in the order of their lists in the file
+STATION, MINE, TRUCK = range(3)
+KINDS = ("stations", "mines", "trucks")
+
+# next_change once every change of the run has been applied
+NO_CHANGE = np.iinfo(np.int64).max
+
+# entity that became available or unavailable: its kind, position and whether it is available
+Change = tuple[int, int, bool]
+
+
+def load_windows(path: str) -> dict[str, list[dict[str, Any]]]:
+    """
+    Read the windows in which unloading stations, mines and trucks are unavailable from a JSON
+    file of the form
+
+        {
+            "stations": [{"id": 0, "start_hours": 24, "end_hours": 30}, ...],
+            "mines": [{"start_hours": 16, "end_hours": 24, "every_hours": 24}, ...],
+            "trucks": [{"id": 12, "start_hours": 100, "end_hours": 104}, ...]
+        }
+
+    A window without an id applies to every station, mine or truck, and one with every_hours
+    recurs with that period from its start for the rest of the run, e.g. a shift pattern.
+
+    Args:
+        path: JSON file describing the windows.
+
+    Returns:
+        The windows by kind, validated.
+    """
+
+    with open(path) as file:
+        windows = json.load(file)
+    for name in windows:
+        if name not in KINDS:
+            raise ValueError(f"Unknown schedule {name} in {path}")
+    for name in KINDS:
+        for window in windows.get(name, []):
+            start, end = window["start_hours"], window["end_hours"]
+            every = window.get("every_hours")
+            if not 0 <= start < end or (every is not None and every < end - start):
+                raise ValueError(f"Invalid {name} window {window} in {path}")
+    return windows
+
+
+class Schedule:
+    """
+    Calendar of the windows in which unloading stations, mines and trucks are unavailable, such
+    as station outages, mine shifts and truck maintenance. Every window, with all its
+    recurrences within the run, is expanded once into an index of the time steps at which some
+    station, mine or truck closes or reopens, sorted by time step. Advancing by a time step then
+    only compares the step with the next change, however many windows there are.
+
+    Windows start and end at the first time step at or after their start and end. Overlapping
+    windows keep a station, mine or truck unavailable until the last of them ends.
+
+    Args:
+        windows: windows by kind, see load_windows.
+        step_minutes: size of one simulation time step in minutes.
+        num_steps: number of time steps of the run, later changes are left out.
+        counts: number of unloading stations, mines and trucks.
+    """
+
+    def __init__(
+        self,
+        windows: dict[str, list[dict[str, Any]]],
+        step_minutes: int,
+        num_steps: int,
+        counts: tuple[int, int, int],
+    ) -> None:
+        self.step = 0
+        self.position = 0
+        # windows currently covering each station, mine and truck
+        self.closures = [np.zeros(count, dtype=np.int32) for count in counts]
+
+        steps, kinds, entities, deltas = [], [], [], []
+        for kind, name in enumerate(KINDS):
+            for window in windows.get(name, []):
+                if "id" in window:
+                    ids = np.array([window["id"]], dtype=np.int32)
+                    if not 0 <= window["id"] < counts[kind]:
+                        raise ValueError(f"Unknown {name} id in window {window}")
+                else:
+                    ids = np.arange(counts[kind], dtype=np.int32)
+                start = window["start_hours"] * 60
+                duration = window["end_hours"] * 60 - start
+                every = window.get("every_hours")
+                if every is None:
+                    starts = np.array([start], dtype=float)
+                else:
+                    starts = np.arange(start, num_steps * step_minutes, every * 60.0)
+                opens = np.ceil(starts / step_minutes).astype(np.int64)
+                ends = np.ceil((starts + duration) / step_minutes).astype(np.int64)
+                keep = (opens < ends) & (opens < num_steps)
+                opens, ends = opens[keep], ends[keep]
+                for boundary, delta in ((opens, 1), (ends, -1)):
+                    steps.append(np.repeat(boundary, ids.size))
+                    entities.append(np.tile(ids, boundary.size))
+                    kinds.append(np.full(boundary.size * ids.size, kind, dtype=np.int8))
+                    deltas.append(
+                        np.full(boundary.size * ids.size, delta, dtype=np.int8)
+                    )
+
+        if steps:
+            order = np.argsort(np.concatenate(steps), kind="stable")
+            self.steps = np.concatenate(steps)[order]
+            self.kinds = np.concatenate(kinds)[order]
+            self.entities = np.concatenate(entities)[order]
+            self.deltas = np.concatenate(deltas)[order]
+        else:
+            self.steps = np.empty(0, dtype=np.int64)
+            self.kinds = np.empty(0, dtype=np.int8)
+            self.entities = np.empty(0, dtype=np.int32)
+            self.deltas = np.empty(0, dtype=np.int8)
+        self.next_change = int(self.steps[0]) if self.steps.size else NO_CHANGE
+
+    def __len__(self) -> int:
+        """Number of closing and reopening changes in the run."""
+
+        return self.steps.size
+
+    def advance(self) -> list[Change]:
+        """
+        Move on to the next time step.
+
+        Returns:
+            The stations, mines and trucks that became available or unavailable at it, usually
+            none.
+        """
+
+        step = self.step
+        self.step += 1
+        if step < self.next_change:
+            return []
+        end = int(np.searchsorted(self.steps, step, side="right"))
+        touched = {}
+        for kind, entity, delta in zip(
+            self.kinds[self.position : end].tolist(),
+            self.entities[self.position : end].tolist(),
+            self.deltas[self.position : end].tolist(),
+        ):
+            closures = self.closures[kind]
+            touched.setdefault((kind, entity), closures[entity] == 0)
+            closures[entity] += delta
+        self.position = end
+        self.next_change = int(self.steps[end]) if end < self.steps.size else NO_CHANGE
+        changes = []
+        for (kind, entity), was_available in touched.items():
+            available = bool(self.closures[kind][entity] == 0)
+            if available != was_available:
+                changes.append((kind, entity, available))
+        return changes
+
+
+def schedule(
+    config: SimConfig, num_stations: int, num_mines: int, num_trucks: int
+) -> Optional[Schedule]:
+    """
+    Returns the schedule of the file named by config.schedule_file, or None without one.
+
+    Args:
+        config: simulation parameters.
+        num_stations: number of unloading stations.
+        num_mines: number of mines.
+        num_trucks: number of trucks.
+    """
+
+    if config.schedule_file is None:
+        return None
+    return Schedule(
+        load_windows(config.schedule_file),
+        config.sim_step_minutes,
+        math.ceil(config.sim_duration_hours * 60 / config.sim_step_minutes),
+        (num_stations, num_mines, num_trucks),
+    )
@@ -0,0 +1,282 @@
+import logging
+import multiprocessing
+import random
+from multiprocessing.connection import Connection
+from typing import Callable, Optional
+
+from mining_simulator.config import SimConfig, default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.replication import replica_seeds
+from mining_simulator.statistics import output_top_k
+from mining_simulator.unloading_station import UnloadStation
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def split_evenly(total: int, parts: int) -> list[int]:
+    """Returns the sizes of parts nearly equal parts adding up to total, larger parts first."""
+
+    return [total // parts + (part < total % parts) for part in range(parts)]
+
+
+def run_region(
+    connection: Connection,
+    num_trucks: int,
+    num_stations: int,
+    first_truck_id: int,
+    seed: int,
+    config: SimConfig,
+    transfer_probability: float,
+    initializer: Optional[Callable[[], None]] = None,
+) -> None:
+    """
+    Worker process simulating one region with its own MiningCoordinator. Waits for messages from
+    the ShardedCoordinator on connection:
+
+        ("run", step, incoming): take over the incoming trucks, simulate until step, then send
+            back the travelling trucks leaving the region.
+        ("finish", incoming): take over the incoming trucks and send back every truck and
+            unloading station of the region.
+
+    Truck ids start at first_truck_id so they are unique across regions, as trucks move
+    between them. Stations are numbered from zero and renumbered by the ShardedCoordinator.
+    """
+
+    if initializer is not None:
+        initializer()
+    try:
+        rng = random.Random(seed)
+        coordinator = MiningCoordinator(
+            num_trucks, num_stations, rng, config, first_truck_id
+        )
+        transfers = random.Random(rng.getrandbits(64))
+
+        step = 0
+        while True:
+            message = connection.recv()
+            for truck in message[-1]:
+                coordinator.add_truck(truck)
+            if message[0] == "finish":
+                connection.send((coordinator.trucks, coordinator.unloading_stations))
+                return
+
+            _, until, _ = message
+            while step < until:
+                coordinator.time_step()
+                step += 1
+            # a truck that waited longer than it takes to unload sets off while still at the
+            # front of its queue, it cannot leave until the station lets it go
+            queued = {
+                station.queue[0].id
+                for station in coordinator.unloading_stations
+                if station.queue
+            }
+            leaving = [
+                truck
+                for truck in coordinator.trucks
+                if truck.current_action == truck.Actions.TRAVEL_TO_MINE
+                and truck.timer > 0
+                and truck.id not in queued
+                and transfers.random() < transfer_probability
+            ]
+            for truck in leaving:
+                coordinator.remove_truck(truck)
+            connection.send(leaving)
+    except BaseException as error:
+        connection.send(error)
+        raise
+    finally:
+        connection.close()
+
+
+class ShardedCoordinator:
+    """
+    Runs one scenario as several independent regions, each with its own MiningCoordinator in a
+    worker process, so a single large run uses one core per region. Trucks and unloading
+    stations are split evenly across the regions. Every sync_steps time steps the regions meet
+    at a barrier: each region sends the trucks leaving it over a pipe, and they are handed to
+    the other regions, which take them over with their remaining travel time. A truck on its way
+    back to a mine transfers with probability transfer_probability at every barrier.
+
+    Once run has finished, trucks and unloading_stations hold the merged state of every region,
+    so run_statistics and the output functions report the run as they would a single
+    coordinator. Regions always use the stepped engine and do not support site graphs.
+
+    Args:
+        num_trucks: number of trucks across every region.
+        num_stations: number of unloading stations across every region.
+        num_regions: number of regions and worker processes.
+        seed: seed every region's random number generator is derived from.
+        config: simulation parameters, defaults to the parsed sim_parameters.ini.
+        sync_steps: time steps between barriers.
+        transfer_probability: chance a truck travelling to a mine transfers at a barrier.
+        initializer: called once in every worker process before it simulates.
+    """
+
+    def __init__(
+        self,
+        num_trucks: int,
+        num_stations: int,
+        num_regions: int,
+        seed: Optional[int] = None,
+        config: Optional[SimConfig] = None,
+        sync_steps: int = 12,
+        transfer_probability: float = 0.0,
+        initializer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.config = config if config is not None else default_config()
+        if not 1 <= num_regions <= min(num_trucks, num_stations):
+            raise ValueError(
+                f"Cannot split {num_trucks} trucks and {num_stations} stations "
+                f"into {num_regions} regions"
+            )
+        if self.config.network_file is not None:
+            raise ValueError("Site graphs are not supported with more than one region")
+        if self.config.schedule_file is not None:
+            raise ValueError("Schedules are not supported with more than one region")
+        if sync_steps <= 0:
+            raise ValueError("region_sync_hours must be positive")
+
+        self.num_regions = num_regions
+        self.region_trucks = split_evenly(num_trucks, num_regions)
+        self.region_stations = split_evenly(num_stations, num_regions)
+        self.seeds = replica_seeds(seed, num_regions)
+        self.sync_steps = sync_steps
+        self.transfer_probability = transfer_probability
+        self.initializer = initializer
+        # picks the region every transferring truck goes to
+        self.rng = random.Random(self.seeds[0])
+
+        self.trucks: list[MiningTruck] = []
+        self.unloading_stations: list[UnloadStation] = []
+        self.transfers = 0
+
+    def route_transfers(
+        self, leaving: list[list[MiningTruck]]
+    ) -> list[list[MiningTruck]]:
+        """
+        Send every truck leaving a region to one of the other regions, picked at random.
+
+        Args:
+            leaving: trucks leaving each region.
+
+        Returns:
+            The trucks arriving at each region.
+        """
+
+        arriving: list[list[MiningTruck]] = [[] for _ in range(self.num_regions)]
+        for region, trucks in enumerate(leaving):
+            for truck in trucks:
+                destination = self.rng.randrange(self.num_regions - 1)
+                if destination >= region:
+                    destination += 1
+                arriving[destination].append(truck)
+                self.transfers += 1
+        return arriving
+
+    def run(self, num_steps: int) -> None:
+        """
+        Simulate every region for num_steps time steps and merge their trucks and stations.
+
+        Args:
+            num_steps: number of time steps to simulate.
+        """
+
+        context = multiprocessing.get_context()
+        connections = []
+        processes = []
+        for region in range(self.num_regions):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=run_region,
+                args=(
+                    child,
+                    self.region_trucks[region],
+                    self.region_stations[region],
+                    sum(self.region_trucks[:region]),
+                    self.seeds[region],
+                    self.config,
+                    self.transfer_probability,
+                    self.initializer,
+                ),
+                name=f"region-{region}",
+            )
+            process.start()
+            child.close()
+            connections.append(parent)
+            processes.append(process)
+
+        try:
+            arriving: list[list[MiningTruck]] = [[] for _ in range(self.num_regions)]
+            for step in range(
+                self.sync_steps, num_steps + self.sync_steps, self.sync_steps
+            ):
+                for connection, incoming in zip(connections, arriving):
+                    connection.send(("run", min(step, num_steps), incoming))
+                leaving = [
+                    self.receive(region, connections)
+                    for region in range(self.num_regions)
+                ]
+                arriving = self.route_transfers(leaving)
+
+            self.trucks = []
+            self.unloading_stations = []
+            for connection, incoming in zip(connections, arriving):
+                connection.send(("finish", incoming))
+            for region in range(self.num_regions):
+                trucks, stations = self.receive(region, connections)
+                self.trucks.extend(trucks)
+                # number the stations densely across every region
+                for station in stations:
+                    station.id += len(self.unloading_stations)
+                self.unloading_stations.extend(stations)
+            self.trucks.sort(key=lambda truck: truck.id)
+        finally:
+            for connection in connections:
+                connection.close()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+        logger.info(
+            f"Simulated {self.num_regions} regions, {self.transfers} trucks transferred between them.\n"
+        )
+
+    def receive(self, region: int, connections: list[Connection]):
+        """Returns the next reply of a region, raising the error it failed with, if any."""
+
+        reply = connections[region].recv()
+        if isinstance(reply, BaseException):
+            raise RuntimeError(f"Region {region} failed") from reply
+        return reply
+
+    def output_truck_statistics(self, top_k: int = 0) -> None:
+        """
+        Log statistics of every truck by quantity He-3 mined in descending order, or only of
+        the top_k trucks that mined the most and the least.
+        """
+
+        if top_k > 0:
+            output_top_k(
+                self.trucks,
+                top_k,
+                lambda truck: truck.units_mined,
+                "trucks that mined the {} He-3",
+                MiningTruck.output_statistics,
+            )
+            return
+        sorted_trucks = sorted(
+            self.trucks, key=lambda truck: truck.units_mined, reverse=True
+        )
+        for truck in sorted_trucks:
+            truck.output_statistics()
+
+    def output_unloading_site_statistics(self) -> None:
+        """Sort unloading sites by quantity He-3 received in descending order and log statistics."""
+
+        sorted_sites = sorted(
+            self.unloading_stations, key=lambda site: site.units_deposited, reverse=True
+        )
+        for site in sorted_sites:
+            site.output_statistics()
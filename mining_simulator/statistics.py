@@ -0,0 +1,343 @@
+import heapq
+import logging
+import math
+from typing import Any, Callable, Iterable, Sequence, Union
+
+import numpy as np
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# values a QuantileDigest buffers per unit of compression before merging them into centroids
+BUFFER_FACTOR = 8
+
+
+class RunningStatistics:
+    """
+    Count, mean, variance and range of a stream of values, updated in constant time and memory
+    with Welford's algorithm. Accumulators of parts of a stream, such as the regions of a
+    sharded run, can be merged into one.
+    """
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        # sum of squared differences from the mean
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Add one value to the stream."""
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def add_many(self, values: np.ndarray) -> None:
+        """Add several values to the stream at once."""
+
+        if not values.size:
+            return
+        batch = RunningStatistics()
+        batch.count = int(values.size)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = values.min().item()
+        batch.max = values.max().item()
+        self.merge(batch)
+
+    def merge(self, other: "RunningStatistics") -> None:
+        """Fold the values accumulated by another instance into this one."""
+
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the values, 0 for fewer than two values."""
+
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation of the values."""
+
+        return math.sqrt(self.variance)
+
+
+class QuantileDigest:
+    """
+    Approximate quantiles of a stream of values in bounded memory, after the merging t-digest.
+    Values are buffered and periodically merged with the centroids, sorted weighted means of
+    neighbouring values. Centroids are kept small near the tails and large around the median, so
+    extreme quantiles stay accurate with at most compression + 1 centroids.
+
+    Args:
+        compression: bound on the number of centroids, trading memory for accuracy.
+    """
+
+    __slots__ = ("compression", "means", "weights", "min", "max", "_buffer")
+
+    def __init__(self, compression: int = 100) -> None:
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: list[float] = []
+
+    @property
+    def count(self) -> int:
+        """Number of values added."""
+
+        return int(self.weights.sum()) + len(self._buffer)
+
+    def add(self, value: float) -> None:
+        """Add one value to the stream."""
+
+        self._buffer.append(value)
+        if len(self._buffer) >= BUFFER_FACTOR * self.compression:
+            self._compress()
+
+    def add_many(self, values: np.ndarray) -> None:
+        """Add several values to the stream at once."""
+
+        self._buffer.extend(values.tolist())
+        if len(self._buffer) >= BUFFER_FACTOR * self.compression:
+            self._compress()
+
+    def merge(self, other: "QuantileDigest") -> None:
+        """Fold the values accumulated by another digest into this one."""
+
+        other._compress()
+        self._compress(other.means, other.weights)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _compress(
+        self,
+        means: np.ndarray = np.empty(0),
+        weights: np.ndarray = np.empty(0),
+    ) -> None:
+        """Merge the buffered values and the given centroids into the digest's centroids."""
+
+        if not self._buffer and not means.size:
+            return
+        buffered = np.array(self._buffer, dtype=np.float64)
+        self._buffer = []
+        if buffered.size:
+            self.min = min(self.min, buffered.min().item())
+            self.max = max(self.max, buffered.max().item())
+
+        values = np.concatenate((self.means, means, buffered))
+        weights = np.concatenate((self.weights, weights, np.ones(buffered.size)))
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+
+        # bucket every point by the k1 scale function at its quantile, so that each centroid
+        # covers a quantile range of at most about one unit of k
+        total = weights.sum()
+        quantile = (np.cumsum(weights) - weights / 2) / total
+        scale = np.arcsin(2 * quantile - 1) / np.pi + 0.5
+        bucket = np.floor(scale * self.compression).astype(np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(values * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the approximate q-quantile of the values added, nan if there are none.
+
+        Args:
+            q: quantile between 0 and 1.
+        """
+
+        self._compress()
+        if not self.weights.size:
+            return math.nan
+        # interpolate between the centroid means, placed at the middle of their weight, and the
+        # exact extremes at either end
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate(([0.0], centers, [total]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(q * total, positions, values))
+
+
+class Distribution(QuantileDigest):
+    """
+    QuantileDigest that also keeps the RunningStatistics of the values, for reporting their
+    mean and spread along with percentiles. Adding a value only buffers it, the buffered values
+    update the running statistics in one batch whenever the digest merges its buffer.
+
+    Args:
+        compression: compression of the quantile digest.
+    """
+
+    __slots__ = ("statistics",)
+
+    def __init__(self, compression: int = 100) -> None:
+        super().__init__(compression)
+        self.statistics = RunningStatistics()
+
+    def _compress(
+        self,
+        means: np.ndarray = np.empty(0),
+        weights: np.ndarray = np.empty(0),
+    ) -> None:
+        if self._buffer:
+            self.statistics.add_many(np.array(self._buffer, dtype=np.float64))
+        super()._compress(means, weights)
+
+    def merge(self, other: Union[RunningStatistics, "Distribution"]) -> None:
+        """
+        Fold the values accumulated by another Distribution into this one. Plain
+        RunningStatistics only add to the mean and spread.
+        """
+
+        if isinstance(other, Distribution):
+            other._compress()
+            self.statistics.merge(other.statistics)
+            super().merge(other)
+        else:
+            self.statistics.merge(other)
+
+    @property
+    def count(self) -> int:
+        """Number of values added."""
+
+        return self.statistics.count + len(self._buffer)
+
+    @property
+    def mean(self) -> float:
+        """Mean of the values, 0 if there are none."""
+
+        self._compress()
+        return self.statistics.mean
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation of the values."""
+
+        self._compress()
+        return self.statistics.std
+
+
+def merged(distributions: Iterable[Distribution]) -> Distribution:
+    """Returns a new Distribution holding the values of all the given ones."""
+
+    total = Distribution()
+    for distribution in distributions:
+        total.merge(distribution)
+    return total
+
+
+class RunningStatisticsArray:
+    """
+    Welford accumulators for a fixed number of streams, such as one per truck of a
+    VectorizedFleet, updated for many streams at once.
+
+    Args:
+        size: number of streams.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.count = np.zeros(size, dtype=np.int64)
+        self.mean = np.zeros(size, dtype=np.float64)
+        self.m2 = np.zeros(size, dtype=np.float64)
+
+    def add_at(self, indices: np.ndarray, values: np.ndarray) -> None:
+        """
+        Add values to the streams at the given indices, which must not repeat.
+
+        Args:
+            indices: stream of every value.
+            values: values to add.
+        """
+
+        count = self.count[indices] + 1
+        mean = self.mean[indices]
+        delta = values - mean
+        mean += delta / count
+        self.m2[indices] += delta * (values - mean)
+        self.mean[indices] = mean
+        self.count[indices] = count
+
+    def add_grouped(self, indices: np.ndarray, values: np.ndarray) -> None:
+        """
+        Add values to the streams at the given indices, which may repeat.
+
+        Args:
+            indices: stream of every value.
+            values: values to add.
+        """
+
+        if not indices.size:
+            return
+        size = self.count.size
+        count = np.bincount(indices, minlength=size)
+        mean = np.bincount(indices, values, minlength=size) / np.maximum(count, 1)
+        deviation = values - mean[indices]
+        m2 = np.bincount(indices, deviation * deviation, minlength=size)
+
+        added = np.flatnonzero(count)
+        count, mean, m2 = count[added], mean[added], m2[added]
+        previous = self.count[added]
+        total = previous + count
+        delta = mean - self.mean[added]
+        self.mean[added] += delta * count / total
+        self.m2[added] += m2 + delta * delta * previous * count / total
+        self.count[added] = total
+
+    def get(self, index: int) -> RunningStatistics:
+        """Returns the accumulated statistics of one stream, without its range."""
+
+        statistics = RunningStatistics()
+        statistics.count = int(self.count[index])
+        statistics.mean = float(self.mean[index])
+        statistics.m2 = float(self.m2[index])
+        return statistics
+
+
+def output_top_k(
+    items: Sequence[Any],
+    k: int,
+    key: Callable[[Any], float],
+    description: str,
+    output: Callable[[Any], None],
+) -> None:
+    """
+    Log the k items with the largest key, largest first, then the k with the smallest, smallest
+    first. The items are picked with heaps in O(n log k) rather than by sorting all of them.
+
+    Args:
+        items: items to rank.
+        k: number of items to log at either end.
+        key: value the items are ranked by.
+        description: what the items are ranked by, with {} for most or least, e.g.
+            "trucks that mined the {} He-3".
+        output: logs one item.
+    """
+
+    best = heapq.nlargest(k, items, key=key)
+    logger.info(f"\nThe {len(best)} {description.format('most')}:\n")
+    for item in best:
+        output(item)
+    worst = heapq.nsmallest(k, items, key=key)
+    logger.info(f"\nThe {len(worst)} {description.format('least')}:\n")
+    for item in worst:
+        output(item)
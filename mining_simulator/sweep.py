@@ -0,0 +1,362 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Optional
+
+from mining_simulator.config import OPTIONS, resolve_field
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# bump when a change to the simulator invalidates previously cached results
+SWEEP_CACHE_VERSION = 2
+
+# options that do not change the results of a simulation
+IGNORED_OPTIONS = {
+    ("misc", "verbose"),
+    ("misc", "report_top_trucks"),
+    ("network", "network_cache_dir"),
+    ("replication", "max_workers"),
+    ("telemetry", "telemetry_directory"),
+    ("telemetry", "telemetry_buffer_mb"),
+    ("live", "live_socket"),
+    ("live", "live_batch_steps"),
+    ("checkpoint", "checkpoint_path"),
+    ("checkpoint", "checkpoint_interval_hours"),
+    ("profiling", "profile_phases"),
+    ("profiling", "cprofile_window_hours"),
+    ("profiling", "cprofile_output"),
+}
+
+# options naming an input file, whose contents rather than name affect the results
+FILE_OPTIONS = {
+    ("truck", "truck_classes_file"),
+    ("mining", "mining_time_file"),
+    ("network", "network_file"),
+    ("schedule", "schedule_file"),
+}
+
+ScenarioConfig = dict[str, dict[str, str]]
+
+
+def resolve_option(name: str) -> tuple[str, str]:
+    """
+    Find the section of a simulation parameter given either as section.option or as a bare
+    option name.
+
+    Args:
+        name: parameter name, e.g. sim.num_stations or num_stations.
+
+    Returns:
+        A (section, option) tuple.
+    """
+
+    option = resolve_field(name)
+    return OPTIONS[option][0], option
+
+
+def parse_values(spec: str) -> list[str]:
+    """
+    Expand the values of a swept parameter. Accepts an inclusive integer range start:stop or
+    start:stop:step, or a comma separated list of values.
+
+    Args:
+        spec: value specification, e.g. 1:8, 2:20:2 or 5,10,15.
+
+    Returns:
+        The values as strings, in the order given.
+    """
+
+    if ":" in spec:
+        bounds = [int(bound) for bound in spec.split(":")]
+        if len(bounds) not in (2, 3):
+            raise ValueError(f"Invalid range {spec}")
+        start, stop = bounds[:2]
+        step = bounds[2] if len(bounds) == 3 else 1
+        return [str(value) for value in range(start, stop + 1, step)]
+    return [value.strip() for value in spec.split(",") if value.strip()]
+
+
+def parse_grid(specs: list[str]) -> dict[tuple[str, str], list[str]]:
+    """
+    Parse parameter specifications of the form name=values into a sweep grid.
+
+    Args:
+        specs: specifications such as num_stations=1:8 or unloading.unload_time_minutes=5,10.
+
+    Returns:
+        A dictionary of (section, option) to the values it takes.
+    """
+
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        grid[resolve_option(name.strip())] = parse_values(values)
+    return grid
+
+
+def grid_points(
+    config: ScenarioConfig, grid: dict[tuple[str, str], list[str]]
+) -> list[ScenarioConfig]:
+    """Returns one full scenario config per combination of the grid's values."""
+
+    keys = list(grid)
+    points = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        point = {section: dict(options) for section, options in config.items()}
+        for (section, option), value in zip(keys, values):
+            point.setdefault(section, {})[option] = value
+        points.append(point)
+    return points
+
+
+def file_digest(path: str) -> str:
+    """Returns the SHA-256 hash of the contents of a file."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scenario_key(config: ScenarioConfig) -> str:
+    """
+    Returns a stable hash of the options of a scenario that affect its results, including the
+    contents of the input files it names, so editing one of them invalidates cached results.
+    """
+
+    normalized = {
+        section: {
+            option: value.strip()
+            for option, value in sorted(options.items())
+            if (section, option) not in IGNORED_OPTIONS
+        }
+        for section, options in sorted(config.items())
+    }
+    files = {}
+    for section, option in sorted(FILE_OPTIONS):
+        path = config.get(section, {}).get(option, "").strip()
+        if path:
+            files[f"{section}.{option}"] = file_digest(path)
+    payload = json.dumps(
+        {"version": SWEEP_CACHE_VERSION, "config": normalized, "files": files},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SweepCache:
+    """
+    On-disk cache of finished sweep points, one JSON file per scenario keyed by scenario_key.
+
+    With max_entries set, the cache is bounded and the least recently used scenarios are evicted
+    whenever a new one is stored. A file's modification time records when it was last stored or
+    read, so the order survives restarts and is shared by every process using the directory.
+
+    Args:
+        directory: directory to store results in, created if missing.
+        max_entries: number of scenarios to keep, unbounded if None.
+    """
+
+    def __init__(self, directory: str, max_entries: Optional[int] = None) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Returns the file a scenario's results are stored in."""
+
+        return os.path.join(self.directory, f"{key}.json")
+
+    def keys(self) -> list[str]:
+        """Returns the keys of every cached scenario."""
+
+        return [
+            name[: -len(".json")]
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+
+    def entry(self, key: str) -> Optional[dict[str, Any]]:
+        """
+        Returns the stored config and statistics of a scenario without marking it as used, or
+        None if it is not cached.
+        """
+
+        try:
+            with open(self.path(key)) as file:
+                entry = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry if "statistics" in entry else None
+
+    def get(self, key: str) -> Optional[dict[str, float]]:
+        """Returns the cached statistics of a scenario, or None if it has not been run."""
+
+        entry = self.entry(key)
+        if entry is None:
+            return None
+        if self.max_entries is not None:
+            try:
+                os.utime(self.path(key))
+            except FileNotFoundError:
+                # evicted by another process since it was read
+                pass
+        return entry["statistics"]
+
+    def put(
+        self, key: str, config: ScenarioConfig, statistics: dict[str, float]
+    ) -> None:
+        """Store the statistics of a scenario, replacing the file atomically."""
+
+        path = self.path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump({"config": config, "statistics": statistics}, file)
+        os.replace(temporary, path)
+        if self.max_entries is not None:
+            self.evict(self.max_entries)
+
+    def evict(self, max_entries: int) -> None:
+        """Remove the least recently used scenarios until at most max_entries are left."""
+
+        used = []
+        for key in self.keys():
+            try:
+                used.append((os.path.getmtime(self.path(key)), key))
+            except FileNotFoundError:
+                continue
+        used.sort()
+        for _, key in used[: max(len(used) - max_entries, 0)]:
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+
+def run_sweep(
+    points: list[ScenarioConfig],
+    run_point: Callable[[ScenarioConfig], dict[str, float]],
+    cache: SweepCache,
+    max_workers: Optional[int] = None,
+    initializer: Optional[Callable[[], None]] = None,
+) -> list[dict[str, float]]:
+    """
+    Run every scenario that is not cached yet across a pool of worker processes. Each result is
+    cached as soon as its scenario finishes, so an interrupted sweep resumes where it stopped.
+
+    Args:
+        points: full scenario configs to evaluate.
+        run_point: picklable function running one scenario and returning its statistics.
+        cache: cache of finished scenarios.
+        max_workers: number of worker processes, defaults to the number of CPUs.
+        initializer: called once in every worker process before it runs scenarios.
+
+    Returns:
+        The statistics of every scenario, in the order of points.
+    """
+
+    keys = [scenario_key(point) for point in points]
+    first_index = {}
+    for index, key in enumerate(keys):
+        first_index.setdefault(key, index)
+    results = [cache.get(key) for key in keys]
+    pending = {
+        index
+        for index, result in enumerate(results)
+        if result is None and first_index[keys[index]] == index
+    }
+    logger.info(
+        f"Sweep of {len(points)} points, {len(points) - len(pending)} cached, "
+        f"{len(pending)} to run.\n"
+    )
+
+    if pending:
+        with ProcessPoolExecutor(max_workers, initializer=initializer) as executor:
+            futures = {
+                executor.submit(run_point, points[index]): index for index in pending
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                cache.put(keys[index], points[index], results[index])
+
+    # duplicated points share the result of their first occurrence
+    return [results[first_index[key]] for key in keys]
+
+
+def search_minimum(
+    config: ScenarioConfig,
+    name: str,
+    low: int,
+    high: int,
+    run_point: Callable[[ScenarioConfig], dict[str, float]],
+    cache: SweepCache,
+    metric: str,
+    target: float,
+    max_workers: Optional[int] = None,
+    initializer: Optional[Callable[[], None]] = None,
+) -> Optional[int]:
+    """
+    Find the smallest value of an integer parameter in [low, high] for which a metric is at or
+    below a target, assuming the metric does not increase as the parameter grows, e.g. the wait
+    per unload as stations are added. Each round evaluates one probe per worker in parallel and
+    narrows the range to the gap between the largest failing and smallest passing probe.
+
+    Args:
+        config: base simulation parameters.
+        name: parameter to search, e.g. num_stations.
+        low: smallest value to consider.
+        high: largest value to consider.
+        run_point: picklable function running one scenario and returning its statistics.
+        cache: cache of finished scenarios.
+        metric: statistic to compare against the target.
+        target: largest acceptable value of the metric.
+        max_workers: number of worker processes, defaults to the number of CPUs.
+        initializer: called once in every worker process before it runs scenarios.
+
+    Returns:
+        The smallest passing value, or None if even high misses the target.
+    """
+
+    key = resolve_option(name)
+    workers = max_workers or os.cpu_count() or 1
+
+    def passes(values: list[int]) -> list[bool]:
+        points = grid_points(config, {key: [str(value) for value in values]})
+        results = run_sweep(points, run_point, cache, max_workers, initializer)
+        return [result[metric] <= target for result in results]
+
+    if not passes([high])[0]:
+        return None
+    while low < high:
+        # probes split [low, high) into workers + 1 roughly equal gaps
+        span = high - low
+        probes = sorted(
+            {low + (span * index) // (workers + 1) for index in range(workers + 1)}
+        )
+        for probe, passed in zip(probes, passes(probes)):
+            if passed:
+                high = min(high, probe)
+                break
+            low = probe + 1
+    return high
+
+
+def format_table(rows: list[dict[str, str]], columns: list[str]) -> str:
+    """Format rows of a sweep as an aligned text table."""
+
+    widths = [
+        max(len(column), *(len(row[column]) for row in rows)) for column in columns
+    ]
+    lines = ["  ".join(column.rjust(width) for column, width in zip(columns, widths))]
+    for row in rows:
+        lines.append(
+            "  ".join(
+                row[column].rjust(width) for column, width in zip(columns, widths)
+            )
+        )
+    return "\n".join(lines)
@@ -0,0 +1,184 @@
+import glob
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_BYTES = 64 * 1024 * 1024
+
+
+def coordinator_state(coordinator) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the action code of every truck of a MiningCoordinator, and the queue length and
+    cumulative deposits of every unloading station.
+    """
+
+    trucks = coordinator.trucks
+    stations = coordinator.unloading_stations
+    return (
+        np.fromiter((truck.current_action for truck in trucks), np.int8, len(trucks)),
+        np.fromiter((len(station.queue) for station in stations), np.int64),
+        np.fromiter((station.units_deposited for station in stations), np.int64),
+    )
+
+
+class TelemetryRecorder:
+    """
+    Opt-in recorder of the simulation state after every time step: each truck's action code, each
+    unloading station's queue length and each station's cumulative deposits. Rows are buffered in
+    preallocated NumPy arrays and flushed as compressed .npz chunks once the buffer is full, so
+    memory use stays bounded however long the run is.
+
+    Attach it to a MiningCoordinator or VectorizedFleet through their recorder attribute and close
+    it once the simulation is done. With the event-driven engine a row is recorded only for the
+    time steps at which something changed; the state in between is that of the previous row.
+    The hybrid engine steps every time step exactly while a recorder is attached.
+
+    Args:
+        directory: directory to write chunk files to, created if missing.
+        num_trucks: number of trucks recorded per row.
+        num_stations: number of unloading stations recorded per row.
+        step_minutes: size of one simulation time step in minutes, stored with every chunk.
+        max_buffer_bytes: memory budget of the buffer, which decides how many rows a chunk holds.
+        first_chunk: number of the first chunk file to write, to continue a resumed run's trace.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        num_trucks: int,
+        num_stations: int,
+        step_minutes: int,
+        max_buffer_bytes: int = DEFAULT_BUFFER_BYTES,
+        first_chunk: int = 0,
+    ) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.step_minutes = step_minutes
+
+        # action codes take one byte per truck, queue lengths and deposits eight per station
+        row_bytes = 8 + num_trucks + 16 * num_stations
+        self.chunk_steps = max(1, max_buffer_bytes // row_bytes)
+        self._steps = np.empty(self.chunk_steps, dtype=np.int64)
+        self._actions = np.empty((self.chunk_steps, num_trucks), dtype=np.int8)
+        self._queue_lengths = np.empty((self.chunk_steps, num_stations), dtype=np.int64)
+        self._deposits = np.empty((self.chunk_steps, num_stations), dtype=np.int64)
+
+        self._row = 0
+        self.next_chunk = first_chunk
+        self.next_step = 0
+        self.closed = False
+
+    def __enter__(self) -> "TelemetryRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(
+        self,
+        actions: np.ndarray,
+        queue_lengths: np.ndarray,
+        deposits: np.ndarray,
+        step: Optional[int] = None,
+    ) -> None:
+        """
+        Buffer the state after one time step, flushing a chunk to disk when the buffer is full.
+
+        Args:
+            actions: action code of every truck.
+            queue_lengths: number of trucks queued at every unloading station.
+            deposits: units deposited so far at every unloading station.
+            step: index of the time step, defaults to the one after the last recorded step.
+        """
+
+        if step is None:
+            step = self.next_step
+        row = self._row
+        self._steps[row] = step
+        self._actions[row] = actions
+        self._queue_lengths[row] = queue_lengths
+        self._deposits[row] = deposits
+        self._row += 1
+        self.next_step = step + 1
+        if self._row == self.chunk_steps:
+            self.flush()
+
+    def record_coordinator(self, coordinator, step: Optional[int] = None) -> None:
+        """
+        Buffer the state of a MiningCoordinator after one time step.
+
+        Args:
+            coordinator: the MiningCoordinator to record.
+            step: index of the time step, defaults to the one after the last recorded step.
+        """
+
+        self.record(*coordinator_state(coordinator), step)
+
+    def flush(self) -> None:
+        """Write the buffered rows to the next chunk file and empty the buffer."""
+
+        if not self._row:
+            return
+        rows = self._row
+        path = os.path.join(self.directory, f"chunk_{self.next_chunk:06d}.npz")
+        np.savez_compressed(
+            path,
+            step=self._steps[:rows],
+            actions=self._actions[:rows],
+            queue_lengths=self._queue_lengths[:rows],
+            deposits=self._deposits[:rows],
+            step_minutes=np.int64(self.step_minutes),
+        )
+        logger.debug(f"Wrote {rows} telemetry rows to {path}")
+        self.next_chunk += 1
+        self._row = 0
+
+    def close(self) -> None:
+        """Flush any remaining rows. The recorder must not be used afterwards."""
+
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+
+def telemetry_chunks(directory: str) -> list[str]:
+    """Returns the chunk files of a telemetry directory, in recording order."""
+
+    return sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+
+
+def load_telemetry(directory: str) -> dict[str, np.ndarray]:
+    """
+    Load a whole telemetry trace. For traces too large to hold in memory, iterate over
+    telemetry_chunks and load one chunk at a time instead.
+
+    Args:
+        directory: directory the TelemetryRecorder wrote to.
+
+    Returns:
+        The step, actions, queue_lengths and deposits arrays of every recorded row, plus
+        step_minutes.
+    """
+
+    columns: dict[str, list[np.ndarray]] = {
+        "step": [],
+        "actions": [],
+        "queue_lengths": [],
+        "deposits": [],
+    }
+    step_minutes = None
+    for path in telemetry_chunks(directory):
+        with np.load(path) as chunk:
+            for name, parts in columns.items():
+                parts.append(chunk[name])
+            step_minutes = int(chunk["step_minutes"])
+    if step_minutes is None:
+        raise FileNotFoundError(f"No telemetry chunks in {directory}")
+
+    trace = {name: np.concatenate(parts) for name, parts in columns.items()}
+    trace["step_minutes"] = np.int64(step_minutes)
+    return trace
@@ -0,0 +1,79 @@
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+# loggers of every simulator module are children of this one
+PACKAGE_LOGGER = "mining_simulator"
+
+# whether per time step debug events are emitted, decided once per run by configure. Hot paths
+# guard their events with ``if __debug__ and trace.enabled:``, which python -O compiles out.
+enabled = False
+
+
+def configure(logger: Optional[logging.Logger] = None) -> bool:
+    """
+    Check once, at the start of a run, whether per time step debug events would be logged so
+    that hot paths only test a module flag instead of building messages that are thrown away.
+
+    Args:
+        logger: logger whose level decides, defaults to the simulator package logger.
+
+    Returns:
+        Whether hot path events are enabled for the run.
+    """
+
+    global enabled
+    logger = logger if logger is not None else logging.getLogger(PACKAGE_LOGGER)
+    enabled = __debug__ and logger.isEnabledFor(logging.DEBUG)
+    return enabled
+
+
+def event(logger: logging.Logger, name: str, message: str, **fields) -> None:
+    """
+    Emit a structured debug event. The fields are kept on the record, as record.args and
+    record.fields, and only formatted into message by the handler that writes the event.
+
+    Args:
+        logger: logger of the emitting module.
+        name: event name, stored as record.event.
+        message: %-style template referring to the fields by name, e.g. "truck %(truck)d".
+        fields: values of the event.
+    """
+
+    logger.debug(message, fields, extra={"event": name, "fields": fields})
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the QueueListener's thread. Records are enqueued
+    as they are, which is safe because event fields are not modified after they are emitted.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def start_listener(
+    handlers: list[logging.Handler], logger: Optional[logging.Logger] = None
+) -> logging.handlers.QueueListener:
+    """
+    Route a logger's records through an in-memory queue to handlers run on a background
+    thread, so writing to the console and log file does not block the simulation.
+
+    Args:
+        handlers: handlers writing the records, each filtering on its own level.
+        logger: logger to attach the queue to, defaults to the root logger.
+
+    Returns:
+        The started listener, stop it to flush the remaining records.
+    """
+
+    logger = logger if logger is not None else logging.getLogger()
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(DeferredQueueHandler(records))
+    listener = logging.handlers.QueueListener(
+        records, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    return listener
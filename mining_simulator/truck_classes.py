@@ -0,0 +1,185 @@
+import functools
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from mining_simulator.config import SimConfig, default_config
+
+
+@dataclass(frozen=True)
+class TruckClass:
+    """
+    Parameters shared by every truck of one class. Trucks hold a reference to their class rather
+    than copies of its parameters, so a mixed fleet costs no more memory than a uniform one.
+
+    Args:
+        index: position of the class in its TruckClasses.
+        name: name the class is reported under.
+        share: fraction of the fleet in this class.
+        travel_time_minutes: time trucks of this class take from a mine to the unloading stations.
+        unload_time_minutes: time a truck of this class spends unloading.
+        payload_units: units He-3 a truck of this class deposits per unload.
+    """
+
+    index: int
+    name: str
+    share: float
+    travel_time_minutes: int
+    unload_time_minutes: int
+    payload_units: int
+
+
+class TruckClasses:
+    """
+    Table of the truck classes of a fleet, with each parameter also held as an array indexed by
+    class, for the vectorized engine to gather per truck parameters from a class index per truck.
+
+    Args:
+        classes: the classes, indexed by position.
+    """
+
+    def __init__(self, classes: list[TruckClass]) -> None:
+        self.classes = tuple(classes)
+        self.names = tuple(truck_class.name for truck_class in classes)
+        shares = np.array([truck_class.share for truck_class in classes], dtype=float)
+        self.shares = shares / shares.sum()
+        self.travel_time_minutes = np.array(
+            [truck_class.travel_time_minutes for truck_class in classes], dtype=np.int64
+        )
+        self.unload_time_minutes = np.array(
+            [truck_class.unload_time_minutes for truck_class in classes], dtype=np.int64
+        )
+        self.payload_units = np.array(
+            [truck_class.payload_units for truck_class in classes], dtype=np.int64
+        )
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def __getitem__(self, index: int) -> TruckClass:
+        return self.classes[index]
+
+    def assign(self, first_truck_id: int, num_trucks: int) -> np.ndarray:
+        """
+        Returns the class index of trucks numbered first_truck_id onwards. Classes are interleaved
+        by the Sainte-Laguë method, so every run of consecutive truck ids from zero holds each
+        class in proportion to its share. The class of a truck depends only on its id, letting
+        the regions of a ShardedCoordinator assign their own trucks.
+
+        Args:
+            first_truck_id: id of the first truck.
+            num_trucks: number of trucks.
+        """
+
+        total = first_truck_id + num_trucks
+        if len(self.classes) == 1 or total == 0:
+            return np.zeros(num_trucks, dtype=np.int8)
+        # the j-th truck of class c comes at (j + 1/2) / share_c, ties go to the first class
+        counts = np.ceil(self.shares * total).astype(np.int64) + 1
+        classes = np.repeat(np.arange(len(self.classes), dtype=np.int8), counts)
+        positions = np.concatenate([np.arange(count) for count in counts]) + 0.5
+        keys = positions / self.shares[classes]
+        order = np.argsort(keys, kind="stable")[first_truck_id:total]
+        return classes[order]
+
+
+def load_truck_classes(path: str, config: SimConfig) -> TruckClasses:
+    """
+    Read truck classes from a JSON file of the form
+
+        {
+            "classes": [
+                {"name": "haul", "share": 3, "travel_time_minutes": 40, "payload_units": 2},
+                {"name": "light", "share": 1, "travel_time_minutes": 25},
+                ...
+            ]
+        }
+
+    Shares are relative. Missing travel and unload times default to those of the config and a
+    missing payload to one unit.
+
+    Args:
+        path: JSON file describing the classes.
+        config: simulation parameters supplying the defaults.
+
+    Returns:
+        The classes, validated.
+    """
+
+    with open(path, "rb") as file:
+        return parse_truck_classes(file.read(), path, config)
+
+
+@functools.lru_cache(maxsize=None)
+def parse_truck_classes(contents: bytes, path: str, config: SimConfig) -> TruckClasses:
+    """
+    Returns the truck classes of the contents of a truck classes file, see load_truck_classes,
+    parsed only once per contents.
+
+    Args:
+        contents: contents of the file.
+        path: name of the file, for error messages.
+        config: simulation parameters supplying the defaults.
+    """
+
+    entries = json.loads(contents).get("classes")
+    if not entries:
+        raise ValueError(f"Truck classes file {path} has no classes")
+    classes = []
+    for index, entry in enumerate(entries):
+        truck_class = TruckClass(
+            index,
+            str(entry.get("name", index)),
+            float(entry.get("share", 1)),
+            int(entry.get("travel_time_minutes", config.travel_time_minutes)),
+            int(entry.get("unload_time_minutes", config.unload_time_minutes)),
+            int(entry.get("payload_units", 1)),
+        )
+        if (
+            truck_class.share <= 0
+            or truck_class.travel_time_minutes < 0
+            or truck_class.unload_time_minutes < 0
+            or truck_class.payload_units <= 0
+        ):
+            raise ValueError(f"Invalid truck class {truck_class.name} in {path}")
+        classes.append(truck_class)
+    if len(classes) > np.iinfo(np.int8).max:
+        raise ValueError(f"Too many truck classes in {path}")
+    return TruckClasses(classes)
+
+
+def truck_classes(config: Optional[SimConfig] = None) -> TruckClasses:
+    """
+    Returns the truck classes named by config.truck_classes_file, or a single class holding the
+    config's travel and unload times without one. The file is read on every call but parsed only
+    when its contents change, so a long-lived process, e.g. a sweep worker or batch server,
+    picks up edits to it.
+
+    Args:
+        config: simulation parameters, defaults to the parsed sim_parameters.ini.
+    """
+
+    config = config if config is not None else default_config()
+    if config.truck_classes_file is not None:
+        return load_truck_classes(config.truck_classes_file, config)
+    return default_truck_classes(config)
+
+
+@functools.lru_cache(maxsize=None)
+def default_truck_classes(config: SimConfig) -> TruckClasses:
+    """Returns the single class of a config without a truck classes file."""
+
+    return TruckClasses(
+        [
+            TruckClass(
+                0,
+                "default",
+                1.0,
+                config.travel_time_minutes,
+                config.unload_time_minutes,
+                1,
+            )
+        ]
+    )
@@ -1,8 +1,12 @@
-import configparser
-import itertools
 import logging
+from collections import deque
+from typing import Optional
 
+from mining_simulator import trace
+from mining_simulator.config import SimConfig, default_config
 from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.statistics import Distribution
+from mining_simulator.truck_classes import truck_classes
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -11,24 +15,50 @@ class UnloadStation:
     """
     Class to represent an unloading station. Used to manage the addition and removal
     of mining trucks from its queue. Records its statistics to measure performance.
-    """
 
-    id_iter = itertools.count()
+    The queue is a deque and the wait time of the trucks in it is kept up to date as they come
+    and go, so managing the queue takes constant time however many trucks are waiting. Each
+    truck unloads for the unloading time and deposits the payload of its truck class.
 
-    def __init__(self) -> None:
-        self.id = next(self.id_iter)
-        self.queue: list[MiningTruck] = []
+    Args:
+        config: simulation parameters, defaults to the parsed sim_parameters.ini.
+        station_id: id of the station, numbered densely from zero by its coordinator.
+    """
 
-        self.parameters = configparser.ConfigParser()
-        self.parameters.read("./sim_parameters.ini")
-        self.unload_time_minutes = self.parameters.getint(
-            "unloading", "unload_time_minutes"
-        )
-        self.sim_step_time_minutes = self.parameters.getint("sim", "sim_step_minutes")
+    __slots__ = (
+        "id",
+        "queue",
+        "config",
+        "sim_step_time_minutes",
+        "current_wait_time",
+        "total_wait_time",
+        "units_deposited",
+        "units_by_class",
+        "wait_times",
+        "queue_lengths",
+        "cycle_times",
+        "available",
+    )
+
+    def __init__(self, config: Optional[SimConfig] = None, station_id: int = 0) -> None:
+        self.id = station_id
+        self.queue: deque[MiningTruck] = deque()
+
+        self.config = config if config is not None else default_config()
+        self.sim_step_time_minutes = self.config.sim_step_minutes
 
         self.current_wait_time = 0
         self.total_wait_time = 0
         self.units_deposited = 0
+        # units deposited by trucks of each truck class
+        self.units_by_class = [0] * len(truck_classes(self.config))
+        # minutes every truck that unloaded here waited, trucks found queued on arrival, and the
+        # cycle times of the trucks unloading here
+        self.wait_times = Distribution()
+        self.queue_lengths = Distribution()
+        self.cycle_times = Distribution()
+        # whether arriving trucks can join the queue, cleared during outages
+        self.available = True
 
     def __lt__(self, other) -> bool:
         """Comparison dunder override on wait time to use min to sort."""
@@ -46,12 +76,19 @@ class UnloadStation:
             f"Mining Trucks and a wait time of {self.current_wait_time} minutes."
         )
 
+    @property
+    def num_waiting(self) -> int:
+        """Number of trucks queued behind the one at the front."""
+
+        return max(len(self.queue) - 1, 0)
+
     def add_truck_to_queue(self, truck: MiningTruck) -> None:
         """Add a mining truck to the unloading queue. If there are no other trucks present
         then the truck can immediately begin unloading. Otherwise the truck will be set to
-        waiting in the queue. Updates the unloading stations current wait time.
+        waiting in the queue. Adds the truck's unloading time to the station's current wait time.
 
-        Sets the truck object's timer and action either waiting or unloading.
+        Sets the truck object's timer to its class' unloading time and its action either
+        waiting or unloading.
 
         Args:
             truck: an instance of a MiningTruck.
@@ -61,46 +98,103 @@ class UnloadStation:
             truck.current_action = truck.Actions.WAITING
         else:
             truck.current_action = truck.Actions.UNLOADING
+        self.queue_lengths.add(len(self.queue))
         self.queue.append(truck)
-        truck.timer = self.unload_time_minutes
-        self.current_wait_time = sum(self.queue)
+        truck.timer = truck.truck_class.unload_time_minutes
+        self.current_wait_time += truck.timer
 
     def manage_queue(self) -> None:
         """
         Checks the status of the queue, if there is a truck present check its timer,
         if the timer is 0 then the truck is done unloading and will be removed from the queue.
-        Once a truck is finished unloading, increment the total number of deposits by the truck and unloading site.
+        Once a truck is finished unloading, increment the total number of deposits by the truck and unloading site
+        and take its unloading time off the station's current wait time.
         If there is a truck at the front of the queue and waiting, change its action to unloading.
         Tally the total cumulated wait time for this queue.
         """
         if self.queue:
             # increment the queue's total accumulated wait time by the length of the queue * the time step size
             # but not couting the truck at the front of the queue, since it's not waiting.
-            self.total_wait_time += len(self.queue[1:]) * self.sim_step_time_minutes
+            self.total_wait_time += self.num_waiting * self.sim_step_time_minutes
 
             truck = self.queue[0]
             if truck.timer == 0:
                 # truck at front of queue finished unloading, remove it
-                logger.debug(
-                    f"Truck {truck.id} has completed is unloading at station {self.id}!"
-                )
-                truck.units_mined += 1
-                self.units_deposited += 1
-                self.queue.pop(0)
+                if __debug__ and trace.enabled:
+                    trace.event(
+                        logger,
+                        "finish_unloading",
+                        "Truck %(truck)d has completed is unloading at station %(station)d!",
+                        truck=truck.id,
+                        station=self.id,
+                    )
+                truck_class = truck.truck_class
+                truck.units_mined += truck_class.payload_units
+                self.units_deposited += truck_class.payload_units
+                self.units_by_class[truck_class.index] += truck_class.payload_units
+                self.finish_unloading(truck)
+                self.current_wait_time -= truck_class.unload_time_minutes
+                self.queue.popleft()
 
             if self.queue:
                 truck = self.queue[0]
                 if truck.current_action == truck.Actions.WAITING:
                     # if there is a truck waiting in front of the line, let it begin unloading
                     truck.current_action = truck.Actions.UNLOADING
-                    logger.debug(
-                        f"Truck {truck.id} has moved to front of queue at station {self.id}!"
-                    )
+                    if __debug__ and trace.enabled:
+                        trace.event(
+                            logger,
+                            "start_unloading",
+                            "Truck %(truck)d has moved to front of queue at station %(station)d!",
+                            truck=truck.id,
+                            station=self.id,
+                        )
+
+    def finish_unloading(
+        self, truck: MiningTruck, elapsed_minutes: Optional[int] = None
+    ) -> None:
+        """
+        Record the wait and cycle time of a truck that has finished unloading.
+
+        Args:
+            truck: an instance of a MiningTruck.
+            elapsed_minutes: the truck's elapsed minutes when it finished, defaults to its
+                current ones.
+        """
+
+        cycle, wait = truck.finish_cycle(elapsed_minutes)
+        self.cycle_times.add(cycle)
+        self.wait_times.add(wait)
+
+    def accumulate_wait_time(self, num_steps: int) -> None:
+        """
+        Tally the queue's wait time for several time steps in which the queue does not change.
+        Equivalent to the bookkeeping manage_queue does each step while the front truck is busy.
+
+        Args:
+            num_steps: number of time steps to account for.
+        """
+
+        if num_steps > 0:
+            self.total_wait_time += (
+                self.num_waiting * self.sim_step_time_minutes * num_steps
+            )
 
     def output_statistics(self):
         """Helper function to format performance of unloading site."""
 
+        by_class = ""
+        if len(self.units_by_class) > 1:
+            names = truck_classes(self.config).names
+            by_class = "".join(
+                f"  {units} units from {name} trucks.\n"
+                for name, units in zip(names, self.units_by_class)
+            )
         logger.info(
             f"Unloading station {self.id} received a total of {self.units_deposited} units He-3.\n"
+            f"{by_class}"
             f"Trucks waited for {self.total_wait_time} minutes to unload at station {self.id}.\n"
+            f"Trucks waited {self.wait_times.mean:.1f} minutes per unload on average, standard "
+            f"deviation {self.wait_times.std:.1f}, and found {self.queue_lengths.mean:.2f} "
+            f"trucks queued on arrival at station {self.id}.\n"
         )
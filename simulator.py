@@ -1,9 +1,42 @@
-import configparser
+import argparse
+import functools
 import logging
+import random
 import sys
 from datetime import datetime
+from logging.handlers import QueueListener
+from typing import Any, Optional
 
+from mining_simulator import trace
+from mining_simulator.batch import BatchServer
+from mining_simulator.checkpoint import CheckpointWriter, load_checkpoint
+from mining_simulator.config import SimConfig, config_from_dict, load_config
 from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.estimator import ThroughputEstimator
+from mining_simulator.event_engine import EventDrivenEngine
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.hybrid_engine import HybridEngine
+from mining_simulator.live import LivePublisher
+from mining_simulator.profiling import PhaseProfiler
+from mining_simulator.sharding import ShardedCoordinator
+from mining_simulator.replication import (
+    output_replication_statistics,
+    output_run_distributions,
+    replica_seeds,
+    run_replications,
+    run_statistics,
+    summarize_replications,
+)
+from mining_simulator.telemetry import TelemetryRecorder
+from mining_simulator.sweep import (
+    ScenarioConfig,
+    SweepCache,
+    format_table,
+    grid_points,
+    parse_grid,
+    run_sweep,
+    search_minimum,
+)
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -12,64 +45,692 @@ class MinigTruckSimulator:
     """
     Class to configure and execute the mining simulation. Will run until enough
     time steps have elapsed the maximum defined time steps.
+
+    Args:
+        seed: seed for the simulation's random number generator, defaults to the
+            seed in the simulation parameters if there is one.
+        config: simulation parameters, parsed from sim_parameters.ini if not given.
+        coordinator: coordinator to continue a run with, see from_checkpoint. Built from the
+            simulation parameters if not given.
     """
 
-    def __init__(self) -> None:
-        self.parameters = configparser.ConfigParser()
-        self.parameters.read("./sim_parameters.ini")
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        config: Optional[SimConfig] = None,
+        coordinator: Optional[Any] = None,
+    ) -> None:
+        self.config = config if config is not None else load_config()
 
         self.time_step = 0
-        self.timestep_size_minutes = self.parameters.getint("sim", "sim_step_minutes")
-        self.max_timestep_minutes = (
-            self.parameters.getint("sim", "sim_duration_hours") * 60
-        )
+        self.timestep_size_minutes = self.config.sim_step_minutes
+        self.max_timestep_minutes = self.config.sim_duration_hours * 60
+
+        self.engine = self.config.engine
+        if seed is None:
+            seed = self.config.seed
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.num_replications = self.config.num_replications
+        self.max_workers = self.config.max_workers or None
+
+        self.log_listener: Optional[QueueListener] = None
+        self.checkpoint_interval_minutes = self.config.checkpoint_interval_hours * 60
+        if self.config.checkpoint_path and self.checkpoint_interval_minutes <= 0:
+            raise ValueError("checkpoint_interval_hours must be positive")
+        # telemetry chunk a resumed run continues its trace from
+        self.telemetry_chunk = 0
+
+        self.num_trucks = self.config.num_trucks
+        self.num_stations = self.config.num_stations
+        self.num_regions = self.config.num_regions
+        if coordinator is not None:
+            self.coordinator = coordinator
+        elif self.num_regions > 1:
+            if self.engine != "stepped":
+                raise ValueError(
+                    f"The {self.engine} engine is not supported with more than one region"
+                )
+            self.coordinator = ShardedCoordinator(
+                self.num_trucks,
+                self.num_stations,
+                self.num_regions,
+                seed,
+                self.config,
+                self.config.region_sync_hours * 60 // self.timestep_size_minutes,
+                self.config.transfer_probability,
+                quiet_worker_logging,
+            )
+        elif self.engine == "vectorized":
+            self.coordinator = VectorizedFleet(
+                self.num_trucks, self.num_stations, self.rng, self.config
+            )
+        else:
+            self.coordinator = MiningCoordinator(
+                self.num_trucks, self.num_stations, self.rng, self.config
+            )
+
+    @classmethod
+    def from_checkpoint(cls, path: str) -> "MinigTruckSimulator":
+        """
+        Build a simulator continuing the run saved in a checkpoint, with the simulation
+        parameters it was started with.
+
+        Args:
+            path: checkpoint file written during an earlier run.
+        """
+
+        state = load_checkpoint(path)
+        coordinator = state["coordinator"]
+        sim = cls(config=coordinator.config, coordinator=coordinator)
+        sim.time_step = state["time_step"]
+        sim.telemetry_chunk = state["telemetry_chunk"] or 0
+        return sim
+
+    def next_checkpoint_minutes(self) -> int:
+        """Returns the first multiple of the checkpoint interval after the current time step."""
 
-        self.num_trucks = self.parameters.getint("sim", "num_trucks")
-        self.num_stations = self.parameters.getint("sim", "num_stations")
-        self.coordinator = MiningCoordinator(self.num_trucks, self.num_stations)
+        interval = self.checkpoint_interval_minutes
+        return (self.time_step // interval + 1) * interval
 
-    def run_simulation(self) -> None:
-        """Run simulation enough time steps have elapsed the maximum defined time steps."""
+    def run_simulation(self, checkpoints: Optional[CheckpointWriter] = None) -> None:
+        """
+        Run simulation enough time steps have elapsed the maximum defined time steps.
 
+        Args:
+            checkpoints: writer to snapshot the state to every checkpoint interval, if any.
+        """
+
+        trace.configure()
+        if self.num_regions > 1:
+            self.run_sharded_simulation(checkpoints)
+            return
+        if self.engine in ("event", "hybrid"):
+            self.run_event_simulation(checkpoints)
+            return
+
+        next_checkpoint = (
+            self.next_checkpoint_minutes()
+            if checkpoints is not None
+            else self.max_timestep_minutes
+        )
         while self.time_step < self.max_timestep_minutes:
-            logger.debug(f"Current time step: {self.time_step}")
+            if __debug__ and trace.enabled:
+                trace.event(
+                    logger,
+                    "time_step",
+                    "Current time step: %(minutes)d",
+                    minutes=self.time_step,
+                )
             self.coordinator.time_step()
             self.time_step += self.timestep_size_minutes
+            if next_checkpoint <= self.time_step < self.max_timestep_minutes:
+                checkpoints.save(self.coordinator, self.time_step)
+                next_checkpoint = self.next_checkpoint_minutes()
+
+    def run_event_simulation(
+        self, checkpoints: Optional[CheckpointWriter] = None
+    ) -> None:
+        """
+        Run the same simulation with the discrete-event engine, jumping directly between
+        the time steps at which a truck changes state instead of polling every time step, or
+        with the hybrid engine, skipping through stretches in which no truck has to wait.
+
+        Args:
+            checkpoints: writer to snapshot the state to every checkpoint interval, if any.
+        """
+
+        step = self.timestep_size_minutes
+        num_steps = -(-self.max_timestep_minutes // step)
+        engine_class = EventDrivenEngine if self.engine == "event" else HybridEngine
+        engine = engine_class(self.coordinator, step, self.time_step // step)
+        while checkpoints is not None:
+            # the first time step at or after the checkpoint, as with the stepped engine
+            stop = -(-self.next_checkpoint_minutes() // step)
+            if stop >= num_steps:
+                break
+            engine.run_until(stop)
+            self.time_step = stop * step
+            checkpoints.save(self.coordinator, self.time_step)
+        engine.run_until(num_steps)
+        self.time_step = num_steps * step
+        if self.engine == "hybrid":
+            simulated = engine.exact_steps + engine.fast_forward_steps
+            logger.info(
+                f"Fast-forwarded {engine.fast_forward_steps * step / 60:.1f} of "
+                f"{simulated * step / 60:.1f} simulated hours, "
+                f"{engine.fast_forward_steps / max(simulated, 1):.1%}, and stepped "
+                f"{engine.exact_steps * step / 60:.1f} hours exactly\n"
+            )
+
+    def run_sharded_simulation(
+        self, checkpoints: Optional[CheckpointWriter] = None
+    ) -> None:
+        """
+        Run the simulation split into regions, each simulated by its own worker process, see
+        ShardedCoordinator. Regions cannot be checkpointed.
+
+        Args:
+            checkpoints: ignored, with a warning if given.
+        """
+
+        if checkpoints is not None:
+            logger.warning("Checkpoints are not available with more than one region.\n")
+        step = self.timestep_size_minutes
+        num_steps = -(-(self.max_timestep_minutes - self.time_step) // step)
+        self.coordinator.run(num_steps)
+        self.time_step += num_steps * step
+
+    def attach_telemetry(self) -> Optional[TelemetryRecorder]:
+        """
+        Attach a TelemetryRecorder to the coordinator if a telemetry directory is configured.
+
+        Returns:
+            The attached recorder, which must be closed once the simulation is done, or None.
+        """
+
+        if self.config.telemetry_directory is None:
+            return None
+        if self.num_regions > 1:
+            logger.warning(
+                "Telemetry records a single coordinator and is not available with more than one region.\n"
+            )
+            return None
+        recorder = TelemetryRecorder(
+            self.config.telemetry_directory,
+            self.num_trucks,
+            self.num_stations,
+            self.timestep_size_minutes,
+            self.config.telemetry_buffer_mb * 1024 * 1024,
+            self.telemetry_chunk,
+        )
+        recorder.next_step = self.time_step // self.timestep_size_minutes
+        self.coordinator.recorder = recorder
+        logger.info(f"Recording telemetry to {self.config.telemetry_directory}\n")
+        if self.engine == "hybrid":
+            logger.warning(
+                "Telemetry records every time step, so the hybrid engine does not fast-forward while recording.\n"
+            )
+        return recorder
+
+    def attach_publisher(self) -> Optional[LivePublisher]:
+        """
+        Attach a LivePublisher to the coordinator if a live socket is configured.
+
+        Returns:
+            The attached publisher, which must be closed once the simulation is done, or None.
+        """
+
+        if self.config.live_socket is None:
+            return None
+        if self.num_regions > 1:
+            logger.warning(
+                "Live streaming publishes a single coordinator and is not available with more than one region.\n"
+            )
+            return None
+        publisher = LivePublisher(
+            self.config.live_socket,
+            self.timestep_size_minutes,
+            self.config.live_batch_steps,
+        )
+        publisher.next_step = self.time_step // self.timestep_size_minutes
+        self.coordinator.publisher = publisher
+        logger.info(f"Streaming live state to {self.config.live_socket}\n")
+        return publisher
+
+    def attach_profiler(self) -> Optional[PhaseProfiler]:
+        """
+        Attach a PhaseProfiler to the coordinator if phase timing or a cProfile window is
+        configured. The window is given in simulated hours since the start of the run.
+
+        Returns:
+            The attached profiler, which must be closed once the simulation is done, or None.
+        """
+
+        window_hours = self.config.cprofile_window_hours
+        if not self.config.profile_phases and window_hours is None:
+            return None
+        if self.engine in ("event", "hybrid"):
+            logger.warning(
+                f"Profiling times the phases of every time step and is not available with the {self.engine} engine.\n"
+            )
+            return None
+        if self.num_regions > 1:
+            logger.warning("Profiling is not available with more than one region.\n")
+            return None
+
+        window = None
+        if window_hours is not None:
+            # time steps are counted from when the profiler is attached, e.g. on resume
+            elapsed = self.time_step // self.timestep_size_minutes
+            start, end = (
+                max(0, -(-int(hours) * 60 // self.timestep_size_minutes) - elapsed)
+                for hours in window_hours.split(":")
+            )
+            window = (start, end)
+        profiler = PhaseProfiler(window, self.config.cprofile_output)
+        self.coordinator.profiler = profiler
+        return profiler
+
+    def run_replications(self) -> dict[str, dict[str, float]]:
+        """
+        Run independent replications of the simulation in parallel worker processes, each with
+        its own random stream derived from this simulator's seed, and summarize their statistics.
+
+        Returns:
+            The mean, variance, confidence interval and percentiles of every run statistic.
+        """
+
+        seeds = replica_seeds(self.seed, self.num_replications)
+        runs = run_replications(
+            functools.partial(run_replica, self.config),
+            seeds,
+            self.max_workers,
+            initializer=quiet_worker_logging,
+        )
+        return summarize_replications(runs)
+
+    def run_sweep(
+        self, specs: list[str], cache_dir: str, max_workers: Optional[int] = None
+    ) -> list[dict[str, str]]:
+        """
+        Run every combination of the swept parameter values in parallel, skipping combinations
+        whose results are already cached, and log a table of throughput and wait per point.
+
+        Args:
+            specs: swept parameters such as num_stations=1:8 or unload_time_minutes=5,10.
+            cache_dir: directory caching the results of finished points.
+            max_workers: number of worker processes, defaults to the number of CPUs.
+
+        Returns:
+            One table row per point.
+        """
+
+        config = self.config.to_dict()
+        grid = parse_grid(specs)
+        points = grid_points(config, grid)
+        results = run_sweep(
+            points,
+            run_sweep_point,
+            SweepCache(cache_dir),
+            max_workers,
+            initializer=quiet_worker_logging,
+        )
+
+        columns = [option for _, option in grid] + [
+            "throughput_per_hour",
+            "wait_per_unload",
+            "station_total_wait_time",
+        ]
+        rows = []
+        for point, result in zip(points, results):
+            row = {option: point[section][option] for section, option in grid}
+            for metric in columns[len(grid) :]:
+                row[metric] = f"{result[metric]:.2f}"
+            rows.append(row)
+        logger.info("\nSweep results:\n" + format_table(rows, columns) + "\n")
+        return rows
+
+    def serve(
+        self,
+        queue_dir: str,
+        cache_dir: str,
+        max_workers: Optional[int] = None,
+        once: bool = False,
+        poll_interval: float = 1.0,
+    ) -> int:
+        """
+        Run scenarios queued as job files on a warm pool of worker processes until interrupted.
+        Options a job does not set are taken from this simulator's parameters.
+
+        Args:
+            queue_dir: directory jobs are queued in and results written to.
+            cache_dir: results store shared with parameter sweeps.
+            max_workers: number of worker processes, defaults to the number of CPUs.
+            once: stop once the queue is empty instead of waiting for more jobs.
+            poll_interval: seconds between checks for new jobs while idle.
+
+        Returns:
+            The number of jobs finished.
+        """
+
+        server = BatchServer(
+            queue_dir,
+            self.config.to_dict(),
+            run_sweep_point,
+            SweepCache(cache_dir),
+            max_workers,
+            initializer=quiet_worker_logging,
+        )
+        return server.serve(poll_interval, once)
+
+    def estimate(
+        self,
+        num_trucks: int,
+        num_stations: int,
+        cache_dir: str,
+        max_entries: Optional[int] = None,
+    ) -> Optional[dict[str, float]]:
+        """
+        Log the throughput and wait per unload of this simulator's parameters with another
+        number of trucks and stations, from the results store if the scenario was run before.
+        Otherwise they are interpolated from cached scenarios differing only in fleet size, and
+        the scenario is run to fill the store before returning.
+
+        Args:
+            num_trucks: number of trucks.
+            num_stations: number of unloading stations.
+            cache_dir: results store shared with parameter sweeps and batch servers.
+            max_entries: number of scenarios the store keeps, unbounded if None.
+
+        Returns:
+            The exact or estimated statistics, None if nothing close enough was cached.
+        """
+
+        with ThroughputEstimator(
+            self.config.to_dict(),
+            run_sweep_point,
+            SweepCache(cache_dir, max_entries),
+            initializer=quiet_worker_logging,
+        ) as estimator:
+            estimate = estimator.estimate(num_trucks, num_stations)
+            statistics = estimate.statistics
+            if statistics is None:
+                logger.info(
+                    f"No cached scenarios to estimate {num_trucks} trucks and {num_stations} stations from.\n"
+                )
+            else:
+                logger.info(
+                    f"{'Exact' if estimate.exact else 'Estimated'} results for {num_trucks} trucks "
+                    f"and {num_stations} stations: {statistics['throughput_per_hour']:.2f} units "
+                    f"He-3 per hour, {statistics['wait_per_unload']:.2f} minutes waited per unload.\n"
+                )
+            if not estimate.exact:
+                logger.info("Running the exact scenario to fill the cache.\n")
+        return statistics
+
+    def search_minimum(
+        self,
+        spec: str,
+        target_wait: float,
+        cache_dir: str,
+        max_workers: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Find the smallest value of a parameter, e.g. the station count, that keeps the mean wait
+        per unload at or below a target, without evaluating every value in the range.
+
+        Args:
+            spec: searched parameter and inclusive range, e.g. num_stations=1:64.
+            target_wait: largest acceptable mean wait per unload in minutes.
+            cache_dir: directory caching the results of finished points.
+            max_workers: number of worker processes, defaults to the number of CPUs.
+
+        Returns:
+            The smallest value meeting the target, or None if no value in the range does.
+        """
+
+        name, _, bounds = spec.partition("=")
+        low, high = (int(bound) for bound in bounds.split(":"))
+        best = search_minimum(
+            self.config.to_dict(),
+            name.strip(),
+            low,
+            high,
+            run_sweep_point,
+            SweepCache(cache_dir),
+            "wait_per_unload",
+            target_wait,
+            max_workers,
+            initializer=quiet_worker_logging,
+        )
+        if best is None:
+            logger.info(
+                f"No value of {name} up to {high} keeps the wait per unload under {target_wait} minutes.\n"
+            )
+        else:
+            logger.info(
+                f"Smallest {name} keeping the wait per unload under {target_wait} minutes: {best}\n"
+            )
+        return best
 
     def setup_logger(self) -> None:
-        """Setup logging."""
-        verbose = self.parameters.getboolean("misc", "verbose")
+        """
+        Setup logging. Per time step debug events are only logged when verbose, and records are
+        written to stdout and the log file by a background thread. Call shutdown_logger to flush.
+        """
+        verbose = self.config.verbose
         logger = logging.getLogger()
-        logger.setLevel(logging.DEBUG)
+        logger.setLevel(logging.DEBUG if verbose else logging.INFO)
 
         handler = logging.StreamHandler(sys.stdout)
-        if verbose:
-            handler.setLevel(logging.DEBUG)
-        else:
-            handler.setLevel(logging.INFO)
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
         )
         handler.setFormatter(formatter)
-        logger.addHandler(handler)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         file_handler = logging.FileHandler(f"simulation_{timestamp}.log")
-        file_handler.setLevel(logging.DEBUG)
-        logger.addHandler(file_handler)
+        self.log_listener = trace.start_listener([handler, file_handler], logger)
+
+    def shutdown_logger(self) -> None:
+        """Write out the records still queued by setup_logger's background thread."""
+
+        if self.log_listener is not None:
+            self.log_listener.stop()
+            self.log_listener = None
 
     def main(self) -> None:
         """Simulation entry point."""
         self.setup_logger()
-        logger.info(
-            f"Beginning simulation with {self.num_trucks} mining trucks and {self.num_stations} deposit stations.\n"
+        try:
+            self.run()
+        finally:
+            self.shutdown_logger()
+
+    def run(self) -> None:
+        """Run the configured replications or single simulation and log their results."""
+
+        if self.num_replications > 1:
+            logger.info(
+                f"Beginning {self.num_replications} replications with {self.num_trucks} mining trucks "
+                f"and {self.num_stations} deposit stations.\n"
+            )
+            summary = self.run_replications()
+            output_replication_statistics(summary, self.num_replications)
+            return
+
+        if self.time_step:
+            logger.info(f"Resuming simulation at {self.time_step} minutes.\n")
+        else:
+            logger.info(
+                f"Beginning simulation with {self.num_trucks} mining trucks and {self.num_stations} deposit stations.\n"
+            )
+        recorder = self.attach_telemetry()
+        publisher = self.attach_publisher()
+        profiler = self.attach_profiler()
+        checkpoints = (
+            CheckpointWriter(self.config.checkpoint_path)
+            if self.config.checkpoint_path
+            else None
         )
-        self.run_simulation()
+        try:
+            self.run_simulation(checkpoints)
+        finally:
+            if checkpoints is not None:
+                checkpoints.close()
+            if recorder is not None:
+                recorder.close()
+            if publisher is not None:
+                publisher.close()
+            if profiler is not None:
+                profiler.close()
         logger.info("\nSimulation complete! Simulation results:\n")
-        self.coordinator.output_truck_statistics()
+        self.coordinator.output_truck_statistics(self.config.report_top_trucks)
         self.coordinator.output_unloading_site_statistics()
+        output_run_distributions(self.coordinator, self.max_timestep_minutes / 60)
+        if profiler is not None and self.config.profile_phases:
+            profiler.output_statistics()
+
+
+def run_replica(config: SimConfig, seed: int) -> dict[str, float]:
+    """Run one replica of the configured simulation in a worker process and return its statistics."""
+
+    sim = MinigTruckSimulator(seed=seed, config=config)
+    sim.run_simulation()
+    return run_statistics(sim.coordinator, sim.max_timestep_minutes / 60)
+
+
+def run_sweep_point(config: ScenarioConfig) -> dict[str, float]:
+    """
+    Run one point of a parameter sweep in a worker process. Runs the point's configured number
+    of replications one after another and returns their mean statistics.
+    """
+
+    sim_config = config_from_dict(config)
+    runs = []
+    for seed in replica_seeds(sim_config.seed, sim_config.num_replications):
+        replica = MinigTruckSimulator(seed=seed, config=sim_config)
+        replica.run_simulation()
+        runs.append(
+            run_statistics(replica.coordinator, replica.max_timestep_minutes / 60)
+        )
+    return {metric: sum(run[metric] for run in runs) / len(runs) for metric in runs[0]}
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse the command line. Without a subcommand a single simulation is run."""
+
+    parser = argparse.ArgumentParser(description="VAST mining simulator")
+    parser.add_argument("--config", help="simulation parameter file to read")
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="override a simulation parameter, e.g. --set num_trucks=100",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="CHECKPOINT",
+        help="continue the run saved in a checkpoint file, with its simulation parameters",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    sweep = subparsers.add_parser(
+        "sweep", help="run a grid of parameter combinations in parallel"
+    )
+    sweep.add_argument(
+        "-p",
+        "--param",
+        action="append",
+        default=[],
+        help="swept parameter as name=start:stop[:step] or name=v1,v2,...",
+    )
+    sweep.add_argument(
+        "--search",
+        help="instead of a grid, find the smallest value of name=low:high meeting --target-wait",
+    )
+    sweep.add_argument(
+        "--target-wait",
+        type=float,
+        help="largest acceptable mean wait per unload in minutes for --search",
+    )
+    sweep.add_argument(
+        "--cache-dir",
+        default=".sweep_cache",
+        help="directory caching the results of finished points",
+    )
+    sweep.add_argument("--workers", type=int, help="number of worker processes")
+    estimate = subparsers.add_parser(
+        "estimate",
+        help="answer the throughput of a fleet size from cached results, interpolating on a miss",
+    )
+    estimate.add_argument("--trucks", type=int, required=True, help="number of trucks")
+    estimate.add_argument(
+        "--stations", type=int, required=True, help="number of unloading stations"
+    )
+    estimate.add_argument(
+        "--cache-dir",
+        default=".sweep_cache",
+        help="results store shared with parameter sweeps",
+    )
+    estimate.add_argument(
+        "--cache-size",
+        type=int,
+        help="number of scenarios to keep, evicting the least recently used",
+    )
+    serve = subparsers.add_parser(
+        "serve", help="run scenarios queued as job files on a warm worker pool"
+    )
+    serve.add_argument(
+        "--queue-dir",
+        default="batch_queue",
+        help="directory jobs are queued in, under incoming/, and results written to",
+    )
+    serve.add_argument(
+        "--cache-dir",
+        default=".sweep_cache",
+        help="results store shared with parameter sweeps",
+    )
+    serve.add_argument("--workers", type=int, help="number of worker processes")
+    serve.add_argument(
+        "--poll",
+        type=float,
+        default=1.0,
+        help="seconds between checks for new jobs while idle",
+    )
+    serve.add_argument(
+        "--once",
+        action="store_true",
+        help="stop once the queue is empty instead of waiting for more jobs",
+    )
+    args = parser.parse_args(argv)
+    if any("=" not in override for override in args.set):
+        parser.error("--set expects NAME=VALUE")
+    if args.command == "sweep" and args.search and args.target_wait is None:
+        parser.error("--search requires --target-wait")
+    return args
+
+
+def quiet_worker_logging() -> None:
+    """Keep per time step debug logging of replicas out of the parent's log."""
+
+    logging.getLogger().setLevel(logging.INFO)
 
 
 if __name__ == "__main__":
-    sim = MinigTruckSimulator()
-    sim.main()
+    args = parse_args()
+    overrides = dict(override.split("=", 1) for override in args.set)
+    if args.resume:
+        sim = MinigTruckSimulator.from_checkpoint(args.resume)
+    else:
+        sim = MinigTruckSimulator(config=load_config(args.config, overrides))
+    if args.command == "sweep":
+        sim.setup_logger()
+        try:
+            if args.search:
+                sim.search_minimum(
+                    args.search, args.target_wait, args.cache_dir, args.workers
+                )
+            else:
+                sim.run_sweep(args.param, args.cache_dir, args.workers)
+        finally:
+            sim.shutdown_logger()
+    elif args.command == "estimate":
+        sim.setup_logger()
+        try:
+            sim.estimate(args.trucks, args.stations, args.cache_dir, args.cache_size)
+        finally:
+            sim.shutdown_logger()
+    elif args.command == "serve":
+        sim.setup_logger()
+        try:
+            sim.serve(
+                args.queue_dir, args.cache_dir, args.workers, args.once, args.poll
+            )
+        except KeyboardInterrupt:
+            logger.info("Stopped serving, unfinished jobs are requeued on restart.\n")
+        finally:
+            sim.shutdown_logger()
+    else:
+        sim.main()
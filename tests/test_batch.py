@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+
+from mining_simulator.batch import BatchServer, load_job, submit_job
+from mining_simulator.config import default_config
+from mining_simulator.sweep import SweepCache
+
+
+def count_trucks(config: dict) -> dict[str, float]:
+    return {"num_trucks": float(config["sim"]["num_trucks"])}
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue_dir = os.path.join(self.directory.name, "queue")
+        self.base = default_config().to_dict()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_result(self, kind: str, job: str) -> dict:
+        with open(os.path.join(self.queue_dir, kind, f"{job}.json")) as file:
+            return json.load(file)
+
+    def test_load_job_formats(self):
+        flat = submit_job(self.queue_dir, "flat", {"num_trucks": 7})
+        self.assertTrue(load_job(flat, self.base)["sim"]["num_trucks"] == "7")
+
+        sections = submit_job(
+            self.queue_dir, "sections", {"unloading": {"unload_time_minutes": 10}}
+        )
+        point = load_job(sections, self.base)
+        self.assertTrue(point["unloading"]["unload_time_minutes"] == "10")
+        self.assertTrue(point["sim"] == self.base["sim"])
+
+        ini = os.path.join(self.directory.name, "job.ini")
+        with open(ini, "w") as file:
+            file.write("[sim]\nnum_stations = 3\n")
+        self.assertTrue(load_job(ini, self.base)["sim"]["num_stations"] == "3")
+
+    def test_load_job_rejects_bad_specs(self):
+        unknown = submit_job(self.queue_dir, "unknown", {"num_lorries": 7})
+        with self.assertRaises(ValueError):
+            load_job(unknown, self.base)
+        invalid = submit_job(self.queue_dir, "invalid", {"num_trucks": "many"})
+        with self.assertRaises(ValueError):
+            load_job(invalid, self.base)
+        flag = submit_job(self.queue_dir, "flag", {"verbose": "sometimes"})
+        with self.assertRaises(ValueError):
+            load_job(flag, self.base)
+        listed = submit_job(self.queue_dir, "listed", [{"num_trucks": 7}])
+        with self.assertRaises(ValueError):
+            load_job(listed, self.base)
+
+    def test_serve_queue(self):
+        cache = SweepCache(os.path.join(self.directory.name, "cache"))
+        server = BatchServer(self.queue_dir, self.base, count_trucks, cache, 2)
+        for num_trucks in (3, 4, 5):
+            submit_job(
+                self.queue_dir, f"trucks_{num_trucks}", {"num_trucks": num_trucks}
+            )
+        submit_job(self.queue_dir, "broken", {"num_lorries": 1})
+        submit_job(self.queue_dir, "listed", ["num_trucks", 1])
+        missing = os.path.join(self.directory.name, "missing.json")
+        submit_job(self.queue_dir, "missing", {"schedule_file": missing})
+
+        self.assertTrue(server.serve(0.01, once=True) == 6)
+        for num_trucks in (3, 4, 5):
+            result = self.read_result("results", f"trucks_{num_trucks}")
+            self.assertTrue(result["statistics"] == {"num_trucks": num_trucks})
+            self.assertFalse(result["cached"])
+        self.assertTrue("num_lorries" in self.read_result("failed", "broken")["error"])
+        self.assertTrue("mapping" in self.read_result("failed", "listed")["error"])
+        self.assertTrue(
+            "FileNotFoundError" in self.read_result("failed", "missing")["error"]
+        )
+        self.assertFalse(os.listdir(os.path.join(self.queue_dir, "incoming")))
+        self.assertFalse(os.listdir(os.path.join(self.queue_dir, "running")))
+
+        # the same scenario again is answered from the shared results store
+        submit_job(self.queue_dir, "again", {"sim": {"num_trucks": "4"}})
+        server.serve(0.01, once=True)
+        self.assertTrue(self.read_result("results", "again")["cached"])
+
+    def test_requeue_interrupted(self):
+        server = BatchServer(
+            self.queue_dir, self.base, count_trucks, SweepCache(self.directory.name)
+        )
+        submit_job(self.queue_dir, "left", {"num_trucks": 2})
+        self.assertTrue(len(server.claim_jobs(10)) == 1)
+        server.requeue_interrupted()
+        self.assertTrue(
+            os.listdir(os.path.join(self.queue_dir, "incoming")) == ["left.json"]
+        )
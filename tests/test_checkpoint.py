@@ -0,0 +1,101 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from mining_simulator.checkpoint import (
+    CheckpointWriter,
+    capture_state,
+    load_checkpoint,
+    write_checkpoint,
+)
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.event_engine import EventDrivenEngine
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.replication import run_statistics
+from mining_simulator.telemetry import TelemetryRecorder, load_telemetry
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "run.ckpt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume_stepped_is_exact(self):
+        coordinator = MiningCoordinator(20, 2, random.Random(7))
+        for _ in range(300):
+            coordinator.time_step()
+        with CheckpointWriter(self.path) as writer:
+            writer.save(coordinator, 300 * 5)
+        for _ in range(500):
+            coordinator.time_step()
+
+        state = load_checkpoint(self.path)
+        self.assertTrue(state["time_step"] == 300 * 5)
+        resumed = state["coordinator"]
+        for _ in range(500):
+            resumed.time_step()
+        self.assertTrue(run_statistics(resumed, 1) == run_statistics(coordinator, 1))
+
+    def test_resume_event_engine_is_exact(self):
+        coordinator = MiningCoordinator(20, 2, random.Random(3))
+        engine = EventDrivenEngine(coordinator, 5)
+        engine.run_until(288)
+        write_checkpoint(self.path, capture_state(coordinator, 288 * 5))
+        engine.run_until(864)
+
+        resumed = load_checkpoint(self.path)["coordinator"]
+        EventDrivenEngine(resumed, 5, start_step=288).run_until(864)
+        self.assertTrue(run_statistics(resumed, 1) == run_statistics(coordinator, 1))
+
+    def test_resume_fleet_is_exact(self):
+        fleet = VectorizedFleet(50, 3, random.Random(5))
+        for _ in range(200):
+            fleet.time_step()
+        write_checkpoint(self.path, capture_state(fleet, 200 * 5))
+        for _ in range(400):
+            fleet.time_step()
+
+        resumed = load_checkpoint(self.path)["coordinator"]
+        for _ in range(400):
+            resumed.time_step()
+        self.assertTrue(np.array_equal(resumed.units_mined, fleet.units_mined))
+        self.assertTrue(np.array_equal(resumed.time_counters, fleet.time_counters))
+
+    def test_restores_ids_and_random_state(self):
+        coordinator = MiningCoordinator(2, 1)
+        random.seed(11)
+        write_checkpoint(self.path, capture_state(coordinator, 0))
+        expected_draw = random.random()
+
+        random.random()
+        resumed = load_checkpoint(self.path)["coordinator"]
+        self.assertTrue([truck.id for truck in resumed.trucks] == [0, 1])
+        self.assertTrue(random.random() == expected_draw)
+
+    def test_recorder_continues_trace(self):
+        telemetry = os.path.join(self.directory.name, "telemetry")
+        coordinator = MiningCoordinator(4, 1, random.Random(2))
+        recorder = TelemetryRecorder(telemetry, 4, 1, 5)
+        coordinator.recorder = recorder
+        for _ in range(10):
+            coordinator.time_step()
+        state = capture_state(coordinator, 50)
+        self.assertTrue(coordinator.recorder is recorder)
+        write_checkpoint(self.path, state)
+
+        state = load_checkpoint(self.path)
+        self.assertTrue(state["coordinator"].recorder is None)
+        self.assertTrue(state["telemetry_chunk"] == 1)
+        self.assertTrue(load_telemetry(telemetry)["step"].tolist() == list(range(10)))
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a checkpoint")
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.path)
@@ -0,0 +1,68 @@
+import dataclasses
+import pickle
+import unittest
+
+from mining_simulator.config import config_from_dict, default_config, load_config
+from mining_simulator.coordinator import MiningCoordinator
+
+SECTIONS = {
+    "sim": {
+        "num_trucks": "5",
+        "num_stations": "2",
+        "sim_duration_hours": "72",
+        "sim_step_minutes": "5",
+    },
+    "unloading": {"unload_time_minutes": "5"},
+    "truck": {"travel_time_minutes": "30"},
+    "mining": {"min_mining_time_hours": "1", "max_mining_time_hours": "5"},
+}
+
+
+class TestSimConfig(unittest.TestCase):
+    def test_config_from_dict(self):
+        config = config_from_dict(SECTIONS)
+        self.assertTrue(config.num_trucks == 5)
+        self.assertTrue(config.travel_time_minutes == 30)
+        self.assertTrue(config.engine == "stepped")
+        self.assertTrue(config.seed is None)
+        self.assertTrue(config.verbose is False)
+
+    def test_missing_option(self):
+        with self.assertRaises(ValueError):
+            config_from_dict({"sim": {"num_trucks": "5"}})
+
+    def test_overrides(self):
+        config = config_from_dict(
+            SECTIONS, {"num_trucks": "50", "unloading.unload_time_minutes": "10"}
+        )
+        self.assertTrue(config.num_trucks == 50)
+        self.assertTrue(config.unload_time_minutes == 10)
+        with self.assertRaises(ValueError):
+            config_from_dict(SECTIONS, {"truck.num_trucks": "1"})
+        with self.assertRaises(ValueError):
+            config_from_dict(SECTIONS, {"verbose": "maybe"})
+
+    def test_load_config_environment(self):
+        config = load_config(
+            environ={"VAST_SIM_NUM_STATIONS": "7"}, overrides={"seed": "3"}
+        )
+        self.assertTrue(config.num_stations == 7)
+        self.assertTrue(config.seed == 3)
+
+    def test_frozen(self):
+        config = config_from_dict(SECTIONS)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            config.num_trucks = 1
+        self.assertFalse(hasattr(config, "__dict__"))
+
+    def test_round_trip(self):
+        config = config_from_dict(SECTIONS).replace(seed=9)
+        self.assertTrue(config_from_dict(config.to_dict()) == config)
+        self.assertTrue(pickle.loads(pickle.dumps(config)) == config)
+
+    def test_shared_by_entities(self):
+        config = config_from_dict(SECTIONS).replace(travel_time_minutes=45)
+        coordinator = MiningCoordinator(num_trucks=3, num_stations=2, config=config)
+        self.assertTrue(all(truck.config is config for truck in coordinator.trucks))
+        self.assertTrue(coordinator.trucks[0].travel_time_minutes == 45)
+        self.assertTrue(default_config() is default_config())
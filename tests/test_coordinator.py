@@ -23,6 +23,15 @@ class TestMiningStation(unittest.TestCase):
             isinstance(self.coordinator.unloading_stations[0], UnloadStation)
         )
 
+    def test_ids_are_dense_per_coordinator(self):
+        for _ in range(2):
+            coordinator = MiningCoordinator(3, 2, first_truck_id=5)
+            self.assertTrue([truck.id for truck in coordinator.trucks] == [5, 6, 7])
+            self.assertTrue([mine.id for mine in coordinator.mining_sites] == [0, 1, 2])
+            self.assertTrue(
+                [station.id for station in coordinator.unloading_stations] == [0, 1]
+            )
+
     @mock.patch.object(MiningSite, "add_truck_to_queue")
     def test_add_truck_to_mine(self, mock_site: mock.Mock):
         truck = self.coordinator.trucks[0]
@@ -62,3 +71,20 @@ class TestMiningStation(unittest.TestCase):
         self.assertTrue(mock_unload_queue.call_count == 2)
         self.assertTrue(mock_mine_queue.call_count == 1)
         self.assertTrue(mock_action.call_count == 1)
+
+    def test_select_matches_min(self):
+        coordinator = MiningCoordinator(num_trucks=20, num_stations=3)
+        for _ in range(300):
+            coordinator.time_step()
+            self.assertTrue(
+                coordinator.select_unloading_station()
+                is min(coordinator.unloading_stations)
+            )
+            self.assertTrue(
+                coordinator.select_mining_site() is min(coordinator.mining_sites)
+            )
+
+    def test_select_unloading_station_after_outside_change(self):
+        station1, station2 = self.coordinator.unloading_stations
+        station1.current_wait_time = 10
+        self.assertTrue(self.coordinator.select_unloading_station() is station2)
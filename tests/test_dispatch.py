@@ -0,0 +1,137 @@
+import random
+import unittest
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.dispatch import (
+    CLOSED_LOAD,
+    STATION_POLICIES,
+    LeastLoadedPolicy,
+    PowerOfTwoPolicy,
+    PredictedArrivalPolicy,
+    RoundRobinPolicy,
+    queue_length,
+    wait_time,
+)
+from mining_simulator.event_engine import EventDrivenEngine
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.replication import run_statistics
+from mining_simulator.unloading_station import UnloadStation
+
+
+class TestDispatchPolicies(unittest.TestCase):
+    def setUp(self):
+        self.config = default_config()
+        self.stations = [UnloadStation(self.config, index) for index in range(4)]
+
+    def test_least_loaded(self):
+        policy = LeastLoadedPolicy(self.stations, wait_time)
+        self.assertTrue(policy.select() == 0)
+        self.stations[0].add_truck_to_queue(MiningTruck(self.config))
+        policy.update(0)
+        self.assertTrue(policy.select() == 1)
+        self.assertTrue(self.stations[policy.select()] is min(self.stations))
+
+        # changed behind the policy's back
+        for station in self.stations[1:]:
+            station.current_wait_time = 100
+        policy.rebuild()
+        self.assertTrue(policy.select() == 0)
+
+    def test_round_robin(self):
+        policy = RoundRobinPolicy(self.stations, queue_length)
+        self.assertTrue([policy.select() for _ in range(6)] == [0, 1, 2, 3, 0, 1])
+
+        mines = [[], [object()], [object()], []]
+        mine_policy = RoundRobinPolicy(mines, len, capacity=1)
+        self.assertTrue([mine_policy.select() for _ in range(3)] == [0, 3, 0])
+
+    def test_power_of_two(self):
+        policy = PowerOfTwoPolicy(self.stations, wait_time, random.Random(2))
+        for position in (0, 1, 2):
+            self.stations[position].current_wait_time = 50
+        picks = [policy.select() for _ in range(200)]
+        # the idle station wins whenever it is sampled, which is half the time
+        self.assertTrue(80 < picks.count(3) < 120)
+        self.assertTrue(all(0 <= pick < 4 for pick in picks))
+
+    def test_power_of_two_skips_closed_stations(self):
+        stations = [UnloadStation(self.config, index) for index in range(20)]
+        for station in stations:
+            station.available = False
+        stations[13].available = True
+        policy = PowerOfTwoPolicy(stations, wait_time, random.Random(2), CLOSED_LOAD)
+        self.assertTrue([policy.select() for _ in range(50)] == [13] * 50)
+
+    def test_predicted_arrival_books_at_departure(self):
+        policy = PredictedArrivalPolicy(
+            self.stations, wait_time, travel_time_minutes=30
+        )
+        trucks = [MiningTruck(self.config, index) for index in range(3)]
+        for truck in trucks:
+            policy.reserve(truck)
+        # trucks on their way are spread over the stations
+        self.assertTrue(sorted(policy.bookings.values()) == [0, 1, 2])
+        self.assertTrue(policy.select(trucks[2]) == 2)
+        self.assertTrue(trucks[2].id not in policy.bookings)
+
+        # a queue that will have drained by the time the truck arrives does not count
+        self.stations[3].current_wait_time = 30
+        policy.update(3)
+        self.assertTrue(policy.select() == 2)
+
+
+class TestCoordinatorPolicies(unittest.TestCase):
+    def test_engines_match_for_every_policy(self):
+        for name in STATION_POLICIES:
+            config = default_config().replace(station_policy=name)
+            stepped = MiningCoordinator(40, 4, random.Random(6), config)
+            for _ in range(600):
+                stepped.time_step()
+            evented = MiningCoordinator(40, 4, random.Random(6), config)
+            EventDrivenEngine(evented, config.sim_step_minutes).run_until(600)
+            self.assertEqual(run_statistics(stepped, 1), run_statistics(evented, 1))
+
+    def test_round_robin_spreads_idle_stations(self):
+        config = default_config().replace(station_policy="round_robin")
+        coordinator = MiningCoordinator(3, 3, random.Random(1), config)
+        for _ in range(864):
+            coordinator.time_step()
+        self.assertTrue(
+            all(
+                station.units_deposited > 0
+                for station in coordinator.unloading_stations
+            )
+        )
+
+    def test_mine_round_robin(self):
+        config = default_config().replace(mine_policy="round_robin")
+        coordinator = MiningCoordinator(5, 2, random.Random(1), config)
+        plain = MiningCoordinator(5, 2, random.Random(1))
+        for _ in range(500):
+            coordinator.time_step()
+            plain.time_step()
+        self.assertTrue(run_statistics(coordinator, 1) == run_statistics(plain, 1))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            MiningCoordinator(2, 1, config=default_config().replace(station_policy="x"))
+        with self.assertRaises(ValueError):
+            MiningCoordinator(2, 1, config=default_config().replace(mine_policy="x"))
+
+    def test_fleet_policies(self):
+        config = default_config().replace(station_policy="join_shortest_queue")
+        fleet = VectorizedFleet(20, 3, random.Random(2), config)
+        coordinator = MiningCoordinator(20, 3, random.Random(2), config)
+        for _ in range(400):
+            fleet.time_step()
+            coordinator.time_step()
+        self.assertTrue(
+            fleet.units_deposited.tolist()
+            == [station.units_deposited for station in coordinator.unloading_stations]
+        )
+        with self.assertRaises(ValueError):
+            VectorizedFleet(
+                2, 1, config=default_config().replace(station_policy="power_of_two")
+            )
@@ -0,0 +1,84 @@
+import tempfile
+import unittest
+
+from mining_simulator.estimator import ThroughputEstimator, interpolate
+from mining_simulator.sweep import SweepCache, grid_points, scenario_key
+
+CONFIG = {
+    "sim": {"num_trucks": "10", "num_stations": "2"},
+    "unloading": {"unload_time_minutes": "5"},
+}
+
+
+def fake_point(config: dict) -> dict[str, float]:
+    trucks = int(config["sim"]["num_trucks"])
+    stations = int(config["sim"]["num_stations"])
+    return {"throughput_per_hour": 2.0 * trucks + stations}
+
+
+class TestEstimator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SweepCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def put(self, config: dict, num_trucks: int, num_stations: int) -> None:
+        point = grid_points(
+            config,
+            {
+                ("sim", "num_trucks"): [str(num_trucks)],
+                ("sim", "num_stations"): [str(num_stations)],
+            },
+        )[0]
+        self.cache.put(scenario_key(point), point, fake_point(point))
+
+    def test_interpolate(self):
+        known = {
+            (10, 2): {"throughput_per_hour": 10.0},
+            (30, 2): {"throughput_per_hour": 30.0},
+            (10, 4): {"throughput_per_hour": 20.0},
+            (30, 4): {"throughput_per_hour": 40.0},
+        }
+        self.assertTrue(interpolate(known, 20, 2) == {"throughput_per_hour": 20.0})
+        self.assertTrue(interpolate(known, 20, 3) == {"throughput_per_hour": 25.0})
+        self.assertTrue(interpolate(known, 10, 4) == known[(10, 4)])
+
+        # outside the cached sizes the nearest neighbours are weighted, the nearest the most
+        outside = interpolate(known, 40, 2)["throughput_per_hour"]
+        self.assertTrue(20.0 < outside < 30.0)
+        self.assertTrue(interpolate({}, 10, 2) is None)
+        with self.assertRaises(ValueError):
+            interpolate(known, 0, 2)
+        with self.assertRaises(ValueError):
+            interpolate(known, 10, 0)
+
+    def test_estimate_rejects_empty_fleet(self):
+        with ThroughputEstimator(CONFIG, fake_point, self.cache) as estimator:
+            with self.assertRaises(ValueError):
+                estimator.estimate(0, 2)
+            self.assertTrue(not estimator.pending)
+
+    def test_estimate_fills_cache(self):
+        self.put(CONFIG, 10, 2)
+        self.put(CONFIG, 30, 2)
+        # a scenario differing in another option is no neighbour
+        other = grid_points(CONFIG, {("unloading", "unload_time_minutes"): ["10"]})[0]
+        self.put(other, 20, 2)
+
+        with ThroughputEstimator(CONFIG, fake_point, self.cache) as estimator:
+            exact = estimator.estimate(10, 2)
+            self.assertTrue(exact.exact)
+            self.assertTrue(exact.statistics == {"throughput_per_hour": 22.0})
+
+            estimate = estimator.estimate(20, 2)
+            self.assertFalse(estimate.exact)
+            self.assertTrue(estimate.statistics == {"throughput_per_hour": 42.0})
+
+            estimator.wait()
+            self.assertTrue(not estimator.pending)
+            filled = estimator.estimate(20, 2)
+            self.assertTrue(filled.exact)
+            self.assertTrue(filled.statistics == fake_point(estimator.scenario(20, 2)))
+            self.assertTrue((20, 2) in estimator.known)
@@ -0,0 +1,95 @@
+import random
+import unittest
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.event_engine import EventDrivenEngine
+
+
+def build_coordinator(
+    num_trucks: int, num_stations: int, step: int, unload_time: int
+) -> MiningCoordinator:
+    config = default_config().replace(unload_time_minutes=unload_time)
+    coordinator = MiningCoordinator(
+        num_trucks=num_trucks, num_stations=num_stations, config=config
+    )
+    for truck in coordinator.trucks:
+        truck.sim_step_time_minutes = step
+    for station in coordinator.unloading_stations:
+        station.sim_step_time_minutes = step
+    return coordinator
+
+
+def snapshot(coordinator: MiningCoordinator) -> tuple:
+    index = {truck.id: position for position, truck in enumerate(coordinator.trucks)}
+    trucks = [
+        (
+            truck.current_action,
+            truck.timer,
+            truck.time_waiting,
+            truck.time_mining,
+            truck.time_travelling,
+            truck.time_unloading,
+            truck.units_mined,
+            truck.idk,
+        )
+        for truck in coordinator.trucks
+    ]
+    stations = [
+        (
+            station.units_deposited,
+            station.total_wait_time,
+            station.current_wait_time,
+            [index[truck.id] for truck in station.queue],
+        )
+        for station in coordinator.unloading_stations
+    ]
+    mines = [
+        [index[truck.id] for truck in mine.queue] for mine in coordinator.mining_sites
+    ]
+    return trucks, stations, mines
+
+
+class TestEventDrivenEngine(unittest.TestCase):
+    def assert_matches_stepped(
+        self, num_trucks: int, num_stations: int, step: int, unload_time: int
+    ):
+        num_steps = 72 * 60 // step
+
+        random.seed(42)
+        stepped = build_coordinator(num_trucks, num_stations, step, unload_time)
+        for _ in range(num_steps):
+            stepped.time_step()
+
+        random.seed(42)
+        evented = build_coordinator(num_trucks, num_stations, step, unload_time)
+        EventDrivenEngine(evented, step).run_until(num_steps)
+
+        self.assertEqual(snapshot(stepped), snapshot(evented))
+
+    def test_matches_stepped_default(self):
+        self.assert_matches_stepped(5, 2, 5, 5)
+
+    def test_matches_stepped_contention(self):
+        self.assert_matches_stepped(40, 1, 5, 15)
+
+    def test_matches_stepped_many_stations(self):
+        self.assert_matches_stepped(30, 4, 10, 20)
+
+    def test_matches_stepped_uneven_step(self):
+        self.assert_matches_stepped(6, 2, 7, 5)
+
+    def test_run_until_resumes(self):
+        random.seed(7)
+        stepped = build_coordinator(10, 2, 5, 10)
+        for _ in range(200):
+            stepped.time_step()
+
+        random.seed(7)
+        evented = build_coordinator(10, 2, 5, 10)
+        engine = EventDrivenEngine(evented, 5)
+        engine.run_until(50)
+        engine.run_until(200)
+
+        self.assertTrue(engine.current_step == 200)
+        self.assertEqual(snapshot(stepped), snapshot(evented))
@@ -0,0 +1,132 @@
+import random
+import unittest
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.fleet import MINING, TRAVEL_TO_MINE, VectorizedFleet
+from tests.test_event_engine import build_coordinator
+
+
+def truck_snapshot(trucks) -> list:
+    return [
+        (
+            truck.current_action,
+            truck.timer,
+            truck.time_waiting,
+            truck.time_mining,
+            truck.time_travelling,
+            truck.time_unloading,
+            truck.units_mined,
+        )
+        for truck in trucks
+    ]
+
+
+def station_snapshot(coordinator: MiningCoordinator) -> list:
+    index = {truck.id: position for position, truck in enumerate(coordinator.trucks)}
+    return [
+        (
+            station.units_deposited,
+            station.total_wait_time,
+            station.current_wait_time,
+            [index[truck.id] for truck in station.queue],
+        )
+        for station in coordinator.unloading_stations
+    ]
+
+
+def build_fleet(
+    num_trucks: int, num_stations: int, step: int, unload_time: int
+) -> VectorizedFleet:
+    config = default_config().replace(unload_time_minutes=unload_time)
+    fleet = VectorizedFleet(
+        num_trucks=num_trucks, num_stations=num_stations, config=config
+    )
+    fleet.sim_step_time_minutes = step
+    return fleet
+
+
+class TestVectorizedFleet(unittest.TestCase):
+    def test_initial_state(self):
+        fleet = VectorizedFleet(num_trucks=3, num_stations=2)
+        self.assertTrue(fleet.timer.shape == (3,))
+        self.assertTrue((fleet.action == TRAVEL_TO_MINE).all())
+        self.assertTrue(fleet.mine_truck.shape == (3,))
+        self.assertTrue(fleet.queue_length.shape == (2,))
+
+    def test_assign_mining_sites(self):
+        fleet = VectorizedFleet(num_trucks=2, num_stations=1)
+        fleet.time_step()
+        self.assertTrue((fleet.action == MINING).all())
+        self.assertTrue(sorted(fleet.mine_truck.tolist()) == [0, 1])
+        self.assertTrue((fleet.timer > 0).all())
+
+    def test_build_truck(self):
+        fleet = VectorizedFleet(num_trucks=2, num_stations=1)
+        fleet.time_step()
+        truck = fleet.build_truck(1)
+        self.assertTrue(truck.id == 1)
+        self.assertTrue(truck.current_action == truck.Actions.MINING)
+        self.assertTrue(truck.time_mining == fleet.sim_step_time_minutes)
+
+    def assert_matches_stepped(
+        self, num_trucks: int, num_stations: int, step: int, unload_time: int
+    ):
+        num_steps = 72 * 60 // step
+
+        random.seed(3)
+        stepped = build_coordinator(num_trucks, num_stations, step, unload_time)
+        for _ in range(num_steps):
+            stepped.time_step()
+
+        random.seed(3)
+        fleet = build_fleet(num_trucks, num_stations, step, unload_time)
+        for _ in range(num_steps):
+            fleet.time_step()
+
+        self.assertEqual(
+            truck_snapshot(stepped.trucks), truck_snapshot(fleet.build_trucks())
+        )
+        self.assertEqual(
+            station_snapshot(stepped),
+            [
+                (
+                    int(fleet.units_deposited[index]),
+                    int(fleet.total_wait_time[index]),
+                    int(fleet.current_wait_time[index]),
+                    fleet.queued_trucks(index),
+                )
+                for index in range(num_stations)
+            ],
+        )
+
+    def test_matches_stepped_default(self):
+        self.assert_matches_stepped(5, 2, 5, 5)
+
+    def test_matches_stepped_contention(self):
+        self.assert_matches_stepped(40, 1, 5, 15)
+
+    def test_matches_stepped_many_stations(self):
+        self.assert_matches_stepped(30, 4, 10, 20)
+
+    def test_matches_stepped_join_shortest_queue(self):
+        # many trucks arrive at the stations in the same time steps
+        config = default_config().replace(station_policy="join_shortest_queue")
+        random.seed(4)
+        stepped = MiningCoordinator(60, 7, config=config)
+        random.seed(4)
+        fleet = VectorizedFleet(60, 7, config=config)
+        for _ in range(72 * 12):
+            stepped.time_step()
+            fleet.time_step()
+
+        self.assertEqual(
+            truck_snapshot(stepped.trucks), truck_snapshot(fleet.build_trucks())
+        )
+        self.assertEqual(
+            [
+                [truck.id for truck in station.queue]
+                for station in stepped.unloading_stations
+            ],
+            [fleet.queued_trucks(index) for index in range(7)],
+        )
@@ -0,0 +1,117 @@
+import random
+import unittest
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.hybrid_engine import HybridEngine
+from mining_simulator.replication import run_statistics
+
+
+def truck_states(coordinator: MiningCoordinator) -> list[tuple]:
+    return [
+        (
+            truck.current_action,
+            truck.timer,
+            truck.time_waiting,
+            truck.time_mining,
+            truck.time_travelling,
+            truck.time_unloading,
+            truck.units_mined,
+        )
+        for truck in coordinator.trucks
+    ]
+
+
+class TestHybridEngine(unittest.TestCase):
+    def assert_matches_stepped(
+        self, num_trucks: int, num_stations: int, num_steps: int
+    ) -> HybridEngine:
+        # fixed mining times, so skipped cycles draw nothing the stepped engine would
+        config = default_config().replace(
+            min_mining_time_hours=2, max_mining_time_hours=2
+        )
+        stepped = MiningCoordinator(num_trucks, num_stations, random.Random(3), config)
+        for _ in range(num_steps):
+            stepped.time_step()
+
+        hybrid = MiningCoordinator(num_trucks, num_stations, random.Random(3), config)
+        engine = HybridEngine(hybrid, config.sim_step_minutes)
+        engine.run_until(num_steps // 2)
+        engine.run_until(num_steps)
+
+        self.assertTrue(engine.current_step == num_steps)
+        self.assertTrue(engine.exact_steps + engine.fast_forward_steps == num_steps)
+        self.assertTrue(truck_states(hybrid) == truck_states(stepped))
+        self.assertTrue(run_statistics(hybrid, 1) == run_statistics(stepped, 1))
+        self.assertTrue(
+            [len(station.queue) for station in hybrid.unloading_stations]
+            == [len(station.queue) for station in stepped.unloading_stations]
+        )
+        self.assertTrue(
+            sum(len(mine.queue) for mine in hybrid.mining_sites)
+            == sum(len(mine.queue) for mine in stepped.mining_sites)
+        )
+        return engine
+
+    def test_matches_stepped_without_contention(self):
+        engine = self.assert_matches_stepped(10, 10, 1000)
+        self.assertTrue(engine.exact_steps == 0)
+
+    def test_matches_stepped_with_contention(self):
+        engine = self.assert_matches_stepped(20, 1, 1000)
+        self.assertTrue(engine.fast_forward_steps > 0)
+        self.assertTrue(engine.exact_steps > 0)
+
+    def test_random_mining_times(self):
+        config = default_config()
+        stepped = MiningCoordinator(30, 10, random.Random(5), config)
+        for _ in range(2000):
+            stepped.time_step()
+
+        hybrid = MiningCoordinator(30, 10, random.Random(5), config)
+        engine = HybridEngine(hybrid, config.sim_step_minutes)
+        engine.run_until(2000)
+
+        self.assertTrue(engine.fast_forward_steps > engine.exact_steps)
+        expected = run_statistics(stepped, 1)["units_deposited"]
+        actual = run_statistics(hybrid, 1)["units_deposited"]
+        self.assertTrue(abs(actual - expected) < 0.05 * expected)
+        for truck in hybrid.trucks:
+            self.assertTrue(
+                truck.time_mining
+                + truck.time_travelling
+                + truck.time_unloading
+                + truck.time_waiting
+                <= 2000 * config.sim_step_minutes
+            )
+
+    def test_random_mining_times_few_stations(self):
+        # trucks left at a station after their unloading time ran out while they waited, and
+        # arrivals just as a station frees up, must not let more trucks in than there are
+        # stations
+        for num_trucks, num_stations, unload_time in ((5, 1, 15), (12, 2, 20)):
+            config = default_config().replace(unload_time_minutes=unload_time)
+            for seed in range(8):
+                coordinator = MiningCoordinator(
+                    num_trucks, num_stations, random.Random(seed), config
+                )
+                engine = HybridEngine(coordinator, config.sim_step_minutes)
+                engine.run_until(24 * 12)
+
+                self.assertTrue(engine.fast_forward_steps > 0)
+                self.assertTrue(
+                    sum(truck.units_mined for truck in coordinator.trucks)
+                    == sum(
+                        station.units_deposited
+                        for station in coordinator.unloading_stations
+                    )
+                )
+
+    def test_unsupported_step(self):
+        config = default_config().replace(sim_step_minutes=7)
+        coordinator = MiningCoordinator(5, 5, random.Random(1), config)
+        engine = HybridEngine(coordinator, 7)
+        engine.run_until(100)
+        self.assertFalse(engine.supported)
+        self.assertTrue(engine.fast_forward_steps == 0)
+        self.assertTrue(engine.exact_steps == 100)
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.hybrid_engine import HybridEngine
+from mining_simulator.live import LivePublisher, apply_message, subscribe
+
+
+def wait_for_subscribers(publisher: LivePublisher, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(publisher.subscribers) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestLivePublisher(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "live.sock")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_subscriber_follows_run(self):
+        messages = []
+
+        async def collect():
+            async for message in subscribe(self.path):
+                messages.append(message)
+
+        coordinator = MiningCoordinator(8, 2, random.Random(3))
+        with LivePublisher(self.path, 5, batch_steps=10) as publisher:
+            reader = threading.Thread(target=asyncio.run, args=(collect(),))
+            reader.start()
+            wait_for_subscribers(publisher, 1)
+            coordinator.publisher = publisher
+            for _ in range(305):
+                coordinator.time_step()
+        reader.join()
+        self.assertFalse(os.path.exists(self.path))
+
+        self.assertTrue(messages[0]["type"] == "snapshot")
+        self.assertTrue(messages[0]["step_minutes"] == 5)
+        self.assertTrue(all(message["type"] == "delta" for message in messages[1:]))
+        state = {}
+        for message in messages:
+            apply_message(state, message)
+        self.assertTrue(state["step"] == 304)
+        self.assertTrue(
+            state["actions"] == [truck.current_action for truck in coordinator.trucks]
+        )
+        self.assertTrue(
+            state["deposits"]
+            == [station.units_deposited for station in coordinator.unloading_stations]
+        )
+        self.assertTrue(
+            state["queue_lengths"]
+            == [len(station.queue) for station in coordinator.unloading_stations]
+        )
+
+    def test_hybrid_engine_publishes_windows(self):
+        messages = []
+
+        async def collect():
+            async for message in subscribe(self.path):
+                messages.append(message)
+
+        coordinator = MiningCoordinator(50, 20, random.Random(3))
+        engine = HybridEngine(coordinator, 5)
+        with LivePublisher(self.path, 5, batch_steps=10) as publisher:
+            reader = threading.Thread(target=asyncio.run, args=(collect(),))
+            reader.start()
+            wait_for_subscribers(publisher, 1)
+            coordinator.publisher = publisher
+            engine.run_until(864)
+        reader.join()
+
+        self.assertTrue(engine.fast_forward_steps > 0)
+        steps = [
+            row["step"]
+            for message in messages
+            if message["type"] == "delta"
+            for row in message["steps"]
+        ]
+        self.assertTrue(steps == sorted(steps))
+        state = {}
+        for message in messages:
+            apply_message(state, message)
+        self.assertTrue(state["step"] == 863)
+        self.assertTrue(
+            state["actions"] == [truck.current_action for truck in coordinator.trucks]
+        )
+        self.assertTrue(
+            state["deposits"]
+            == [station.units_deposited for station in coordinator.unloading_stations]
+        )
+
+    def test_slow_subscriber_gets_snapshots(self):
+        num_trucks = 20000
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with LivePublisher(self.path, 5, batch_steps=1, max_pending=2) as publisher:
+            client.connect(self.path)
+            wait_for_subscribers(publisher, 1)
+            publisher.record(np.zeros(num_trucks), np.zeros(1), np.zeros(1))
+            deadline = time.monotonic() + 5
+            while not publisher.snapshots_sent and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # every truck changes at every step while the subscriber reads nothing
+            for step in range(1, 30):
+                publisher.record(
+                    np.full(num_trucks, step % 5), np.array([step]), np.array([step])
+                )
+
+            received = []
+            reader = threading.Thread(
+                target=lambda: received.extend(iter(lambda: client.recv(1 << 20), b""))
+            )
+            reader.start()
+        reader.join()
+        client.close()
+
+        messages = [json.loads(line) for line in b"".join(received).splitlines()]
+        self.assertTrue(messages[-1]["type"] == "end")
+        self.assertTrue(publisher.batches_dropped > 0)
+        snapshots = [message for message in messages if message["type"] == "snapshot"]
+        self.assertTrue(len(snapshots) > 1)
+        state = {}
+        for message in messages[:-1]:
+            apply_message(state, message)
+        self.assertTrue(state["step"] == 29)
+        self.assertTrue(state["actions"] == [29 % 5] * num_trucks)
+        self.assertTrue(state["deposits"] == [29])
@@ -6,8 +6,8 @@ from mining_simulator.mining_truck import MiningTruck
 
 class TestMiningStation(unittest.TestCase):
     def setUp(self):
-        self.mining_site1 = MiningSite()
-        self.mining_site2 = MiningSite()
+        self.mining_site1 = MiningSite(mine_id=0)
+        self.mining_site2 = MiningSite(mine_id=1)
         self.mining_truck = MiningTruck()
 
     def test_queue_length_empty(self):
@@ -0,0 +1,117 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from mining_simulator import network
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.event_engine import EventDrivenEngine
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.mining_truck import MiningTruck
+from mining_simulator.network import (
+    NetworkRouter,
+    cached_travel_time_matrix,
+    graph_key,
+    load_graph,
+    travel_time_matrix,
+)
+from mining_simulator.replication import run_statistics
+from mining_simulator.unloading_station import UnloadStation
+
+GRAPH = {
+    "mines": ["north", "south"],
+    "stations": ["near", "far"],
+    "roads": [
+        {"from": "north", "to": "junction", "length_km": 10, "speed_kmh": 60},
+        {"from": "south", "to": "junction", "length_km": 20, "speed_kmh": 60},
+        {"from": "junction", "to": "near", "length_km": 5, "speed_kmh": 30},
+        {"from": "junction", "to": "far", "length_km": 40, "speed_kmh": 60},
+        {"from": "north", "to": "far", "length_km": 100, "speed_kmh": 100},
+    ],
+}
+
+
+class TestNetwork(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sites.json")
+        with open(self.path, "w") as file:
+            json.dump(GRAPH, file)
+        self.config = default_config().replace(
+            network_file=self.path,
+            network_cache_dir=os.path.join(self.directory.name, "cache"),
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_travel_time_matrix(self):
+        matrix = travel_time_matrix(load_graph(self.path))
+        self.assertTrue(np.allclose(matrix, [[20, 50], [30, 60]]))
+
+    def test_unreachable_mine(self):
+        graph = dict(GRAPH, mines=["north", "island"])
+        with self.assertRaises(ValueError):
+            travel_time_matrix(graph)
+
+    def test_matrix_cached_by_graph(self):
+        cache_dir = self.config.network_cache_dir
+        graph = load_graph(self.path)
+        first = cached_travel_time_matrix(graph, cache_dir)
+        self.assertTrue(os.listdir(cache_dir) == [f"{graph_key(graph)}.npy"])
+        with mock.patch.object(network, "travel_time_matrix") as compute:
+            second = cached_travel_time_matrix(graph, cache_dir)
+        compute.assert_not_called()
+        self.assertTrue(np.array_equal(first, second))
+
+        changed = dict(graph, stations=["near"])
+        self.assertTrue(graph_key(changed) != graph_key(graph))
+
+    def test_router_books_soonest_station(self):
+        stations = [UnloadStation(self.config, index) for index in range(2)]
+        router = NetworkRouter(np.array([[20.0, 50.0], [30.0, 60.0]]), stations, 4, 15)
+        # rounded up to whole time steps
+        self.assertTrue(router.travel_time(0, 0) == 30)
+        self.assertTrue(router.travel_time(1, 1) == 60)
+
+        # trucks without a booking take the first free mine
+        truck, other = MiningTruck(self.config, 0), MiningTruck(self.config, 1)
+        self.assertTrue(router.arrive_mine(truck) == 0)
+        self.assertTrue(router.arrive_mine(other) == 2)
+
+        self.assertTrue(router.depart_mine(truck, 0) == 0)
+        self.assertTrue(truck.travel_time_minutes == 30)
+
+        # a long queue at the near station sends the next truck further
+        stations[0].current_wait_time = 120
+        self.assertTrue(router.depart_mine(other, 2) == 1)
+        self.assertTrue(router.arrive_station(other) == 1)
+        self.assertTrue(router.booked_minutes == [5, 0])
+
+        # back to the nearest free mine, mine 0 was freed when the first truck left it
+        self.assertTrue(router.depart_station(truck, 0) == 0)
+        self.assertTrue(router.arrive_mine(truck) == 0)
+
+    def test_coordinator_engines_match(self):
+        stepped = MiningCoordinator(12, 3, random.Random(2), self.config)
+        for _ in range(600):
+            stepped.time_step()
+        evented = MiningCoordinator(12, 3, random.Random(2), self.config)
+        EventDrivenEngine(evented, self.config.sim_step_minutes).run_until(600)
+
+        statistics = run_statistics(stepped, 1)
+        self.assertTrue(statistics == run_statistics(evented, 1))
+        self.assertTrue(statistics["units_deposited"] > 0)
+        # trips take the route's travel time, not the configured one
+        self.assertTrue(
+            {truck.travel_time_minutes for truck in stepped.trucks} <= {20, 30, 50, 60}
+        )
+
+    def test_fleet_rejects_network(self):
+        with self.assertRaises(ValueError):
+            VectorizedFleet(2, 1, config=self.config)
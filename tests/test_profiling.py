@@ -0,0 +1,97 @@
+import json
+import os
+import pstats
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.profiling import PhaseProfiler
+from mining_simulator.replication import run_statistics
+
+
+class TestPhaseProfiler(unittest.TestCase):
+    def test_profiled_coordinator_matches(self):
+        plain = MiningCoordinator(30, 2, random.Random(1))
+        profiled = MiningCoordinator(30, 2, random.Random(1))
+        profiler = PhaseProfiler()
+        profiled.profiler = profiler
+        for _ in range(500):
+            plain.time_step()
+            profiled.time_step()
+
+        self.assertTrue(run_statistics(profiled, 1) == run_statistics(plain, 1))
+        self.assertTrue(profiler.ticks == 500)
+        self.assertTrue(all(seconds > 0 for seconds in profiler.phase_seconds.values()))
+        self.assertTrue(
+            profiler.event_counts["unloads"]
+            == sum(station.wait_times.count for station in profiled.unloading_stations)
+        )
+        # every truck is dispatched to a mine on the first time step
+        self.assertTrue(profiler.max_events_per_tick >= 30)
+
+    def test_profiled_fleet_matches(self):
+        plain = VectorizedFleet(30, 2, random.Random(1))
+        profiled = VectorizedFleet(30, 2, random.Random(1))
+        profiler = PhaseProfiler()
+        profiled.profiler = profiler
+        for _ in range(500):
+            plain.time_step()
+            profiled.time_step()
+
+        self.assertTrue(np.array_equal(profiled.units_mined, plain.units_mined))
+        self.assertTrue(profiler.event_counts["unloads"] == profiled.wait_times.count)
+
+    def test_counts_match_between_engines(self):
+        coordinator = MiningCoordinator(20, 2, random.Random(4))
+        fleet = VectorizedFleet(20, 2, random.Random(4))
+        coordinator.profiler = PhaseProfiler()
+        fleet.profiler = PhaseProfiler()
+        for _ in range(400):
+            coordinator.time_step()
+            fleet.time_step()
+        self.assertTrue(
+            coordinator.profiler.event_counts == fleet.profiler.event_counts
+        )
+
+    def test_unloads_with_payloads(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "classes.json")
+            with open(path, "w") as file:
+                json.dump({"classes": [{"name": "heavy", "payload_units": 3}]}, file)
+            config = default_config().replace(truck_classes_file=path)
+            coordinator = MiningCoordinator(20, 2, random.Random(4), config)
+            fleet = VectorizedFleet(20, 2, random.Random(4), config)
+            coordinator.profiler = PhaseProfiler()
+            fleet.profiler = PhaseProfiler()
+            for _ in range(400):
+                coordinator.time_step()
+                fleet.time_step()
+
+        # unloads are counted once per truck, not per unit deposited
+        deposited = sum(
+            station.units_deposited for station in coordinator.unloading_stations
+        )
+        self.assertTrue(deposited > 0)
+        self.assertTrue(coordinator.profiler.event_counts["unloads"] * 3 == deposited)
+        self.assertTrue(
+            fleet.profiler.event_counts == coordinator.profiler.event_counts
+        )
+
+    def test_cprofile_window(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "window.prof")
+            coordinator = MiningCoordinator(5, 1)
+            profiler = PhaseProfiler((10, 20), path)
+            coordinator.profiler = profiler
+            for _ in range(15):
+                coordinator.time_step()
+            self.assertFalse(os.path.exists(path))
+            for _ in range(10):
+                coordinator.time_step()
+            self.assertTrue(os.path.exists(path))
+            self.assertTrue(pstats.Stats(path).total_calls > 0)
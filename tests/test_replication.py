@@ -0,0 +1,54 @@
+import random
+import unittest
+
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.replication import (
+    replica_seeds,
+    run_replications,
+    run_statistics,
+    summarize_replications,
+)
+
+
+def run_small_replica(seed: int) -> dict[str, float]:
+    coordinator = MiningCoordinator(
+        num_trucks=4, num_stations=1, rng=random.Random(seed)
+    )
+    for _ in range(200):
+        coordinator.time_step()
+    return run_statistics(coordinator, 200 * 5 / 60)
+
+
+class TestReplication(unittest.TestCase):
+    def test_replica_seeds_deterministic(self):
+        seeds = replica_seeds(11, 8)
+        self.assertTrue(seeds == replica_seeds(11, 8))
+        self.assertTrue(len(set(seeds)) == 8)
+        self.assertTrue(seeds != replica_seeds(12, 8))
+
+    def test_same_seed_same_statistics(self):
+        self.assertTrue(run_small_replica(5) == run_small_replica(5))
+
+    def test_run_statistics_matches_fleet(self):
+        coordinator = MiningCoordinator(
+            num_trucks=6, num_stations=2, rng=random.Random(1)
+        )
+        fleet = VectorizedFleet(num_trucks=6, num_stations=2, rng=random.Random(1))
+        for _ in range(300):
+            coordinator.time_step()
+            fleet.time_step()
+        self.assertTrue(run_statistics(coordinator, 25) == run_statistics(fleet, 25))
+
+    def test_summarize_replications(self):
+        runs = [{"units": value} for value in (1.0, 2.0, 3.0, 4.0, 5.0)]
+        summary = summarize_replications(runs)["units"]
+        self.assertAlmostEqual(summary["mean"], 3.0)
+        self.assertAlmostEqual(summary["variance"], 2.5)
+        self.assertAlmostEqual(summary["p50"], 3.0)
+        self.assertTrue(summary["ci95_low"] < 3.0 < summary["ci95_high"])
+
+    def test_run_replications_in_parallel(self):
+        seeds = replica_seeds(3, 4)
+        runs = run_replications(run_small_replica, seeds, max_workers=2)
+        self.assertTrue(runs == [run_small_replica(seed) for seed in seeds])
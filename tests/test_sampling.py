@@ -0,0 +1,79 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.replication import run_statistics
+from mining_simulator.sampling import (
+    EmpiricalMiningTime,
+    MiningTimeSampler,
+    TriangularMiningTime,
+    UniformMiningTime,
+    mining_time_sampler,
+)
+
+
+class TestMiningTimeSampler(unittest.TestCase):
+    def test_draw_order_independent_of_batching(self):
+        single = MiningTimeSampler(UniformMiningTime(1, 5), seed=3, block_size=7)
+        batched = MiningTimeSampler(UniformMiningTime(1, 5), seed=3, block_size=7)
+        drawn = [single.draw() for _ in range(30)]
+        taken = np.concatenate([batched.draw_many(count) for count in (4, 11, 0, 15)])
+        self.assertTrue(taken.tolist() == drawn)
+
+    def test_uniform(self):
+        sampler = MiningTimeSampler(UniformMiningTime(1, 5), seed=1)
+        minutes = sampler.draw_many(5000)
+        self.assertTrue(set(minutes.tolist()) == {60, 120, 180, 240, 300})
+        self.assertTrue(abs(minutes.mean() - sampler.mean_minutes) < 5)
+
+    def test_triangular(self):
+        sampler = MiningTimeSampler(TriangularMiningTime(1, 2, 5, 5), seed=1)
+        minutes = sampler.draw_many(5000)
+        self.assertTrue((minutes % 5 == 0).all())
+        self.assertTrue(60 <= minutes.min() and minutes.max() <= 300)
+        self.assertTrue(abs(minutes.mean() - sampler.mean_minutes) < 5)
+        with self.assertRaises(ValueError):
+            TriangularMiningTime(1, 6, 5, 5)
+
+    def test_empirical_from_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mining_times.csv")
+            with open(path, "w") as file:
+                file.write("minutes,site\n61,a\n\n119,b\n2,c\n")
+            distribution = EmpiricalMiningTime.from_csv(path, 5)
+            self.assertTrue(distribution.minutes.tolist() == [60, 120, 5])
+
+            config = default_config().replace(
+                mining_time_distribution="empirical", mining_time_file=path
+            )
+            minutes = mining_time_sampler(config, random.Random(1)).draw_many(300)
+            self.assertTrue(set(minutes.tolist()) == {5, 60, 120})
+
+    def test_config_errors(self):
+        with self.assertRaises(ValueError):
+            mining_time_sampler(default_config().replace(mining_time_distribution="x"))
+        with self.assertRaises(ValueError):
+            mining_time_sampler(
+                default_config().replace(mining_time_distribution="empirical")
+            )
+
+    def test_seeded_runs_reproducible(self):
+        config = default_config().replace(mining_time_distribution="triangular")
+        results = []
+        for _ in range(2):
+            coordinator = MiningCoordinator(10, 2, random.Random(8), config)
+            for _ in range(500):
+                coordinator.time_step()
+            results.append(run_statistics(coordinator, 1))
+        self.assertTrue(results[0] == results[1])
+
+        fleet = VectorizedFleet(10, 2, random.Random(8), config)
+        for _ in range(500):
+            fleet.time_step()
+        self.assertTrue(fleet.units_deposited.sum() == results[0]["units_deposited"])
@@ -0,0 +1,159 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.event_engine import EventDrivenEngine
+from mining_simulator.hybrid_engine import HybridEngine
+from mining_simulator.schedule import MINE, STATION, Schedule, load_windows
+
+
+class TestSchedule(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "schedule.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def build_coordinator(self, windows: dict, num_trucks: int = 10, **changes):
+        with open(self.path, "w") as file:
+            json.dump(windows, file)
+        config = default_config().replace(schedule_file=self.path, **changes)
+        return MiningCoordinator(num_trucks, 2, random.Random(5), config)
+
+    def test_advance(self):
+        schedule = Schedule(
+            {
+                "stations": [
+                    {"id": 1, "start_hours": 1, "end_hours": 2},
+                    {"id": 1, "start_hours": 1.5, "end_hours": 3},
+                ],
+                "mines": [{"start_hours": 0, "end_hours": 0.5, "every_hours": 2}],
+            },
+            30,
+            8,
+            (2, 2, 1),
+        )
+        changes = [schedule.advance() for _ in range(8)]
+        self.assertTrue(
+            changes
+            == [
+                [(MINE, 0, False), (MINE, 1, False)],
+                [(MINE, 0, True), (MINE, 1, True)],
+                [(STATION, 1, False)],
+                [],
+                [(MINE, 0, False), (MINE, 1, False)],
+                [(MINE, 0, True), (MINE, 1, True)],
+                [(STATION, 1, True)],
+                [],
+            ]
+        )
+        self.assertTrue(len(schedule) == 12)
+
+    def test_invalid_window(self):
+        with open(self.path, "w") as file:
+            json.dump({"trucks": [{"id": 0, "start_hours": 5, "end_hours": 4}]}, file)
+        with self.assertRaises(ValueError):
+            load_windows(self.path)
+        with self.assertRaises(ValueError):
+            Schedule(
+                {"trucks": [{"id": 3, "start_hours": 0, "end_hours": 1}]},
+                5,
+                12,
+                (1, 1, 3),
+            )
+
+    def test_station_outage(self):
+        coordinator = self.build_coordinator(
+            {"stations": [{"id": 0, "start_hours": 10, "end_hours": 40}]}
+        )
+        closed = coordinator.unloading_stations[0]
+        for _ in range(10 * 12):
+            coordinator.time_step()
+        deposited = closed.units_deposited
+        # trucks already queued when the outage starts are still served
+        served = len(closed.queue)
+        for _ in range(30 * 12):
+            coordinator.time_step()
+            self.assertFalse(closed.available)
+        self.assertTrue(closed.units_deposited == deposited + served)
+        self.assertTrue(not closed.queue)
+        for _ in range(12 * 12):
+            coordinator.time_step()
+        self.assertTrue(closed.available)
+        self.assertTrue(closed.units_deposited > deposited + served)
+
+    def test_mine_shifts(self):
+        # every mine closes for the second half of every day
+        coordinator = self.build_coordinator(
+            {"mines": [{"start_hours": 12, "end_hours": 24, "every_hours": 24}]}
+        )
+        occupied = 0
+        for step in range(72 * 12):
+            coordinator.time_step()
+            mining = sum(len(mine.queue) for mine in coordinator.mining_sites)
+            if step % (24 * 12) >= 12 * 12:
+                # trucks finish mining but none start
+                self.assertTrue(mining <= occupied)
+            occupied = mining
+        self.assertTrue(all(truck.idk > 0 for truck in coordinator.trucks))
+        self.assertTrue(sum(truck.units_mined for truck in coordinator.trucks) > 0)
+
+    def test_truck_maintenance(self):
+        coordinator = self.build_coordinator(
+            {"trucks": [{"id": 3, "start_hours": 0, "end_hours": 72}]}
+        )
+        for _ in range(72 * 12):
+            coordinator.time_step()
+        truck = coordinator.trucks[3]
+        self.assertTrue(truck.units_mined == 0)
+        self.assertTrue(truck.time_mining == 0)
+        self.assertTrue(truck.idk == 72 * 60)
+        self.assertTrue(coordinator.trucks[4].units_mined > 0)
+
+    def test_power_of_two_finds_open_station(self):
+        with open(self.path, "w") as file:
+            json.dump(
+                {
+                    "stations": [
+                        {"id": position, "start_hours": 0, "end_hours": 72}
+                        for position in range(7)
+                    ]
+                },
+                file,
+            )
+        config = default_config().replace(
+            schedule_file=self.path, station_policy="power_of_two"
+        )
+        coordinator = MiningCoordinator(10, 8, random.Random(5), config)
+        for _ in range(72 * 12):
+            coordinator.time_step()
+        # no truck is held at the stations while one of them is open
+        self.assertTrue(all(truck.idk == 0 for truck in coordinator.trucks))
+        self.assertTrue(
+            [station.units_deposited > 0 for station in coordinator.unloading_stations]
+            == [False] * 7 + [True]
+        )
+
+    def test_matches_unscheduled_when_empty(self):
+        scheduled = self.build_coordinator({"stations": []})
+        unscheduled = MiningCoordinator(10, 2, random.Random(5))
+        for _ in range(72 * 12):
+            scheduled.time_step()
+            unscheduled.time_step()
+        self.assertTrue(
+            [truck.units_mined for truck in scheduled.trucks]
+            == [truck.units_mined for truck in unscheduled.trucks]
+        )
+
+    def test_engines(self):
+        coordinator = self.build_coordinator(
+            {"trucks": [{"id": 0, "start_hours": 1, "end_hours": 2}]}
+        )
+        self.assertFalse(HybridEngine(coordinator, 5).supported)
+        with self.assertRaises(ValueError):
+            EventDrivenEngine(coordinator, 5)
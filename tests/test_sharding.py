@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.replication import replica_seeds, run_statistics
+from mining_simulator.sharding import ShardedCoordinator, split_evenly
+
+
+class TestShardedCoordinator(unittest.TestCase):
+    def test_split_evenly(self):
+        self.assertTrue(split_evenly(10, 4) == [3, 3, 2, 2])
+        self.assertTrue(split_evenly(4, 4) == [1, 1, 1, 1])
+
+    def test_single_region_matches_coordinator(self):
+        sharded = ShardedCoordinator(8, 2, 1, seed=5)
+        sharded.run(300)
+
+        coordinator = MiningCoordinator(8, 2, random.Random(replica_seeds(5, 1)[0]))
+        for _ in range(300):
+            coordinator.time_step()
+        self.assertTrue(run_statistics(sharded, 1) == run_statistics(coordinator, 1))
+
+    def test_transfers_keep_every_truck(self):
+        runs = []
+        for _ in range(2):
+            sharded = ShardedCoordinator(
+                13, 4, 3, seed=2, sync_steps=6, transfer_probability=0.5
+            )
+            sharded.run(500)
+            runs.append((run_statistics(sharded, 1), sharded.transfers))
+
+        self.assertTrue(sharded.transfers > 0)
+        self.assertTrue([truck.id for truck in sharded.trucks] == list(range(13)))
+        self.assertTrue(
+            sorted(station.id for station in sharded.unloading_stations)
+            == list(range(4))
+        )
+        mined = sum(truck.units_mined for truck in sharded.trucks)
+        deposited = sum(
+            station.units_deposited for station in sharded.unloading_stations
+        )
+        self.assertTrue(0 <= mined - deposited <= 13)
+        # seeded runs are reproducible however the regions are scheduled
+        self.assertTrue(runs[0] == runs[1])
+
+    def test_transfers_keep_regions_running(self):
+        deposited = []
+        for probability in (0.0, 0.2):
+            sharded = ShardedCoordinator(
+                50, 4, 2, seed=1, transfer_probability=probability
+            )
+            sharded.run(864)
+            deposited.append(run_statistics(sharded, 1)["units_deposited"])
+        self.assertTrue(deposited[1] > 0.8 * deposited[0])
+
+    def test_invalid_regions(self):
+        with self.assertRaises(ValueError):
+            ShardedCoordinator(4, 2, 3)
+        with self.assertRaises(ValueError):
+            ShardedCoordinator(
+                4, 2, 2, config=default_config().replace(network_file="sites.json")
+            )
@@ -0,0 +1,127 @@
+import random
+import unittest
+
+import numpy as np
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.replication import run_distributions
+from mining_simulator.statistics import (
+    Distribution,
+    QuantileDigest,
+    RunningStatistics,
+    RunningStatisticsArray,
+    output_top_k,
+)
+
+
+class TestStatistics(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(4).gamma(2.0, 30.0, 20000)
+
+    def test_running_statistics(self):
+        statistics = RunningStatistics()
+        for value in self.values[:5000]:
+            statistics.add(value)
+        self.assertTrue(np.isclose(statistics.mean, self.values[:5000].mean()))
+        self.assertTrue(np.isclose(statistics.variance, self.values[:5000].var(ddof=1)))
+
+        # batches and merged parts give the same moments as adding one value at a time
+        merged = RunningStatistics()
+        merged.add_many(self.values[:2000])
+        part = RunningStatistics()
+        part.add_many(self.values[2000:5000])
+        merged.merge(part)
+        self.assertTrue(merged.count == 5000)
+        self.assertTrue(np.isclose(merged.mean, statistics.mean))
+        self.assertTrue(np.isclose(merged.std, statistics.std))
+        self.assertTrue(merged.max == self.values[:5000].max())
+
+    def test_quantile_digest(self):
+        digest = QuantileDigest()
+        for value in self.values[:10000]:
+            digest.add(value)
+        other = QuantileDigest()
+        other.add_many(self.values[10000:])
+        digest.merge(other)
+
+        self.assertTrue(digest.count == self.values.size)
+        self.assertTrue(digest.weights.size <= digest.compression + 1)
+        for q in (0.01, 0.5, 0.9, 0.99):
+            error = abs(digest.quantile(q) - np.quantile(self.values, q))
+            self.assertTrue(error < 0.01 * np.ptp(self.values))
+        self.assertTrue(digest.quantile(1) == self.values.max())
+        self.assertTrue(np.isnan(QuantileDigest().quantile(0.5)))
+
+    def test_distribution(self):
+        distribution = Distribution()
+        distribution.add_many(self.values)
+        self.assertTrue(distribution.count == self.values.size)
+        self.assertTrue(np.isclose(distribution.mean, self.values.mean()))
+        self.assertTrue(np.isclose(distribution.std, self.values.std(ddof=1)))
+
+        # plain running statistics only add to the moments
+        extra = RunningStatistics()
+        extra.add(1000.0)
+        distribution.merge(extra)
+        self.assertTrue(distribution.count == self.values.size + 1)
+
+    def test_statistics_array(self):
+        indices = np.array([0, 2, 2, 1, 2, 0])
+        values = np.array([1.0, 5.0, 7.0, 3.0, 9.0, 4.0])
+        grouped = RunningStatisticsArray(3)
+        grouped.add_grouped(indices[:3], values[:3])
+        grouped.add_grouped(indices[3:], values[3:])
+        unique = RunningStatisticsArray(3)
+        for index, value in zip(indices, values):
+            unique.add_at(np.array([index]), np.array([value]))
+
+        for stream in range(3):
+            expected = values[indices == stream]
+            for statistics in (grouped.get(stream), unique.get(stream)):
+                self.assertTrue(statistics.count == expected.size)
+                self.assertTrue(np.isclose(statistics.mean, expected.mean()))
+                squares = ((expected - expected.mean()) ** 2).sum()
+                self.assertTrue(np.isclose(statistics.m2, squares))
+
+    def test_output_top_k(self):
+        logged = []
+        with self.assertLogs("mining_simulator.statistics") as logs:
+            output_top_k(
+                [3, 9, 1, 7, 5], 2, lambda value: value, "{} values", logged.append
+            )
+        self.assertTrue(logged == [9, 7, 1, 3])
+        self.assertTrue("The 2 most values" in logs.output[0])
+
+
+class TestRunStatistics(unittest.TestCase):
+    def test_accumulated_during_run(self):
+        config = default_config()
+        coordinator = MiningCoordinator(30, 2, random.Random(6), config)
+        fleet = VectorizedFleet(30, 2, random.Random(6), config)
+        for _ in range(1500):
+            coordinator.time_step()
+            fleet.time_step()
+
+        deposited = sum(
+            station.units_deposited for station in coordinator.unloading_stations
+        )
+        distributions = run_distributions(coordinator)
+        self.assertTrue(distributions["cycle_time"].count == deposited)
+        self.assertTrue(distributions["wait_time"].count == deposited)
+        self.assertTrue(distributions["queue_length"].mean > 0)
+        for truck in coordinator.trucks:
+            self.assertTrue(truck.cycle_times.count == truck.units_mined)
+
+        # the vectorized engine accumulates the same statistics
+        fleet_distributions = run_distributions(fleet)
+        for name, distribution in distributions.items():
+            self.assertTrue(fleet_distributions[name].count == distribution.count)
+            self.assertTrue(
+                np.isclose(fleet_distributions[name].mean, distribution.mean)
+            )
+        for index, truck in enumerate(coordinator.trucks):
+            cycle_times = fleet.build_truck(index).cycle_times
+            self.assertTrue(np.isclose(cycle_times.mean, truck.cycle_times.mean))
+            self.assertTrue(np.isclose(cycle_times.m2, truck.cycle_times.m2))
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+import mock
+
+from mining_simulator.sweep import (
+    SweepCache,
+    grid_points,
+    parse_grid,
+    parse_values,
+    resolve_option,
+    run_sweep,
+    scenario_key,
+    search_minimum,
+)
+
+CONFIG = {
+    "sim": {"num_trucks": "5", "num_stations": "2"},
+    "unloading": {"unload_time_minutes": "5"},
+    "misc": {"verbose": "True"},
+}
+
+
+def fake_point(config: dict) -> dict[str, float]:
+    stations = int(config["sim"]["num_stations"])
+    return {"wait_per_unload": 100 / stations, "stations": float(stations)}
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SweepCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_parse_values(self):
+        self.assertTrue(parse_values("1:4") == ["1", "2", "3", "4"])
+        self.assertTrue(parse_values("2:10:4") == ["2", "6", "10"])
+        self.assertTrue(parse_values("5, 10") == ["5", "10"])
+
+    def test_resolve_option(self):
+        self.assertTrue(resolve_option("num_stations") == ("sim", "num_stations"))
+        self.assertTrue(
+            resolve_option("unloading.unload_time_minutes")
+            == ("unloading", "unload_time_minutes")
+        )
+        with self.assertRaises(ValueError):
+            resolve_option("missing")
+
+    def test_grid_points(self):
+        grid = parse_grid(["num_stations=1:2", "unload_time_minutes=5,10"])
+        points = grid_points(CONFIG, grid)
+        self.assertTrue(len(points) == 4)
+        self.assertTrue(points[3]["sim"]["num_stations"] == "2")
+        self.assertTrue(points[3]["unloading"]["unload_time_minutes"] == "10")
+        self.assertTrue(CONFIG["sim"]["num_stations"] == "2")
+
+    def test_scenario_key_ignores_logging(self):
+        quiet = grid_points(CONFIG, {("misc", "verbose"): ["False"]})[0]
+        self.assertTrue(scenario_key(CONFIG) == scenario_key(quiet))
+        other = grid_points(CONFIG, {("sim", "num_stations"): ["3"]})[0]
+        self.assertTrue(scenario_key(CONFIG) != scenario_key(other))
+
+    def test_scenario_key_hashes_input_files(self):
+        path = os.path.join(self.directory.name, "schedule.json")
+        with open(path, "w") as file:
+            file.write('{"stations": []}')
+        scheduled = grid_points(CONFIG, {("schedule", "schedule_file"): [path]})[0]
+        before = scenario_key(scheduled)
+        self.assertTrue(before != scenario_key(CONFIG))
+        with open(path, "w") as file:
+            file.write('{"mines": []}')
+        self.assertTrue(scenario_key(scheduled) != before)
+
+    def test_run_sweep_caches_results(self):
+        points = grid_points(CONFIG, {("sim", "num_stations"): ["1", "2", "4"]})
+        results = run_sweep(points, fake_point, self.cache, max_workers=2)
+        self.assertTrue([result["stations"] for result in results] == [1, 2, 4])
+
+        with mock.patch("mining_simulator.sweep.ProcessPoolExecutor") as executor:
+            cached = run_sweep(points, fake_point, self.cache, max_workers=2)
+            executor.assert_not_called()
+        self.assertTrue(cached == results)
+
+    def test_search_minimum(self):
+        best = search_minimum(
+            CONFIG,
+            "num_stations",
+            1,
+            40,
+            fake_point,
+            self.cache,
+            "wait_per_unload",
+            10,
+            2,
+        )
+        self.assertTrue(best == 10)
+
+    def test_search_minimum_out_of_range(self):
+        best = search_minimum(
+            CONFIG,
+            "num_stations",
+            1,
+            5,
+            fake_point,
+            self.cache,
+            "wait_per_unload",
+            10,
+            2,
+        )
+        self.assertTrue(best is None)
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = SweepCache(self.directory.name, max_entries=2)
+        cache.put("first", CONFIG, {"stations": 1.0})
+        cache.put("second", CONFIG, {"stations": 2.0})
+        os.utime(cache.path("first"), (1, 1))
+        os.utime(cache.path("second"), (2, 2))
+
+        self.assertTrue(cache.get("first") == {"stations": 1.0})
+        cache.put("third", CONFIG, {"stations": 3.0})
+        self.assertTrue(sorted(cache.keys()) == ["first", "third"])
+        self.assertTrue(cache.get("second") is None)
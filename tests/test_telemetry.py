@@ -0,0 +1,114 @@
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.event_engine import EventDrivenEngine
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.hybrid_engine import HybridEngine
+from mining_simulator.telemetry import (
+    TelemetryRecorder,
+    load_telemetry,
+    telemetry_chunks,
+)
+
+
+class TestTelemetryRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_chunks_bounded(self):
+        # room for 4 rows of 3 trucks and 2 stations
+        recorder = TelemetryRecorder(self.directory.name, 3, 2, 5, 4 * (8 + 3 + 32))
+        self.assertTrue(recorder.chunk_steps == 4)
+        with recorder:
+            for step in range(10):
+                recorder.record(
+                    np.full(3, step % 5), np.array([step, 0]), np.array([step, step])
+                )
+        self.assertTrue(len(telemetry_chunks(self.directory.name)) == 3)
+
+        trace = load_telemetry(self.directory.name)
+        self.assertTrue(trace["step"].tolist() == list(range(10)))
+        self.assertTrue(trace["actions"].shape == (10, 3))
+        self.assertTrue(trace["queue_lengths"][:, 0].tolist() == list(range(10)))
+        self.assertTrue(int(trace["step_minutes"]) == 5)
+
+    def test_record_coordinator(self):
+        coordinator = MiningCoordinator(num_trucks=8, num_stations=2)
+        with TelemetryRecorder(self.directory.name, 8, 2, 5) as recorder:
+            coordinator.recorder = recorder
+            for _ in range(300):
+                coordinator.time_step()
+
+        trace = load_telemetry(self.directory.name)
+        self.assertTrue(trace["step"].tolist() == list(range(300)))
+        self.assertTrue(
+            trace["deposits"][-1].tolist()
+            == [station.units_deposited for station in coordinator.unloading_stations]
+        )
+        self.assertTrue(
+            trace["actions"][-1].tolist()
+            == [truck.current_action for truck in coordinator.trucks]
+        )
+
+    def test_event_engine_records_changes(self):
+        with tempfile.TemporaryDirectory() as stepped_directory:
+            random.seed(4)
+            stepped = MiningCoordinator(num_trucks=10, num_stations=1)
+            with TelemetryRecorder(stepped_directory, 10, 1, 5) as recorder:
+                stepped.recorder = recorder
+                for _ in range(400):
+                    stepped.time_step()
+            stepped_trace = load_telemetry(stepped_directory)
+
+        random.seed(4)
+        evented = MiningCoordinator(num_trucks=10, num_stations=1)
+        with TelemetryRecorder(self.directory.name, 10, 1, 5) as recorder:
+            evented.recorder = recorder
+            EventDrivenEngine(evented, 5).run_until(400)
+        evented_trace = load_telemetry(self.directory.name)
+
+        steps = evented_trace["step"]
+        self.assertTrue(len(steps) < 400)
+        for name in ("actions", "queue_lengths", "deposits"):
+            self.assertTrue(
+                np.array_equal(stepped_trace[name][steps], evented_trace[name])
+            )
+
+    def test_hybrid_engine_records_every_step(self):
+        # every window would be fast-forwarded without a recorder
+        with tempfile.TemporaryDirectory() as stepped_directory:
+            stepped = MiningCoordinator(50, 20, random.Random(4))
+            with TelemetryRecorder(stepped_directory, 50, 20, 5) as recorder:
+                stepped.recorder = recorder
+                for _ in range(864):
+                    stepped.time_step()
+            stepped_trace = load_telemetry(stepped_directory)
+
+        hybrid = MiningCoordinator(50, 20, random.Random(4))
+        engine = HybridEngine(hybrid, 5)
+        with TelemetryRecorder(self.directory.name, 50, 20, 5) as recorder:
+            hybrid.recorder = recorder
+            engine.run_until(864)
+        hybrid_trace = load_telemetry(self.directory.name)
+
+        self.assertTrue(engine.fast_forward_steps == 0)
+        self.assertTrue(hybrid_trace["step"].tolist() == list(range(864)))
+        for name in ("actions", "queue_lengths", "deposits"):
+            self.assertTrue(np.array_equal(stepped_trace[name], hybrid_trace[name]))
+
+    def test_record_fleet(self):
+        fleet = VectorizedFleet(num_trucks=6, num_stations=2)
+        with TelemetryRecorder(self.directory.name, 6, 2, 5) as recorder:
+            fleet.recorder = recorder
+            for _ in range(50):
+                fleet.time_step()
+        trace = load_telemetry(self.directory.name)
+        self.assertTrue(np.array_equal(trace["actions"][-1], fleet.action))
+        self.assertTrue(np.array_equal(trace["deposits"][-1], fleet.units_deposited))
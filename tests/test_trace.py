@@ -0,0 +1,83 @@
+import logging
+import queue
+import unittest
+
+from mining_simulator import trace
+from mining_simulator.coordinator import MiningCoordinator
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger(trace.PACKAGE_LOGGER)
+        self.level = self.logger.level
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+        trace.configure()
+
+    def test_configure_checks_level(self):
+        self.logger.setLevel(logging.INFO)
+        self.assertFalse(trace.configure())
+        self.assertFalse(trace.enabled)
+
+        self.logger.setLevel(logging.DEBUG)
+        self.assertTrue(trace.configure() == __debug__)
+
+    def test_event_fields(self):
+        logger = logging.getLogger("mining_simulator.test")
+        self.logger.setLevel(logging.DEBUG)
+        with self.assertLogs(logger, logging.DEBUG) as logs:
+            trace.event(logger, "assign_mine", "truck %(truck)d", truck=3)
+        record = logs.records[0]
+        self.assertTrue(record.event == "assign_mine")
+        self.assertTrue(record.fields == {"truck": 3})
+        self.assertTrue(record.getMessage() == "truck 3")
+
+    def test_no_events_when_disabled(self):
+        self.logger.setLevel(logging.INFO)
+        trace.configure()
+        # the level is only checked once per run
+        self.logger.setLevel(logging.DEBUG)
+        coordinator = MiningCoordinator(num_trucks=2, num_stations=1)
+        handler = ListHandler()
+        self.logger.addHandler(handler)
+        try:
+            coordinator.time_step()
+        finally:
+            self.logger.removeHandler(handler)
+        self.assertFalse(handler.messages)
+
+    @unittest.skipUnless(__debug__, "debug events are compiled out")
+    def test_events_when_enabled(self):
+        self.logger.setLevel(logging.DEBUG)
+        trace.configure()
+        coordinator = MiningCoordinator(num_trucks=2, num_stations=1)
+        with self.assertLogs(self.logger, logging.DEBUG) as logs:
+            coordinator.time_step()
+        events = [record.event for record in logs.records]
+        self.assertTrue(events.count("assign_mine") == 2)
+        self.assertTrue(events.count("start_mining") == 2)
+
+    def test_listener_formats_in_background(self):
+        logger = logging.getLogger("mining_simulator.test_listener")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        handler = ListHandler()
+        listener = trace.start_listener([handler], logger)
+        try:
+            trace.event(logger, "mine", "truck %(truck)d at %(mine)d", truck=1, mine=2)
+        finally:
+            listener.stop()
+            logger.handlers.clear()
+            logger.propagate = True
+        self.assertTrue(handler.messages == ["truck 1 at 2"])
+        self.assertTrue(isinstance(listener.queue, queue.SimpleQueue))
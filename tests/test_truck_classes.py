@@ -0,0 +1,195 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from mining_simulator.config import default_config
+from mining_simulator.coordinator import MiningCoordinator
+from mining_simulator.fleet import VectorizedFleet
+from mining_simulator.hybrid_engine import HybridEngine
+from mining_simulator.truck_classes import truck_classes
+from tests.test_fleet import truck_snapshot
+
+CLASSES = {
+    "classes": [
+        {"name": "haul", "share": 3, "travel_time_minutes": 40, "payload_units": 2},
+        {"name": "light", "share": 1, "travel_time_minutes": 20},
+        {"name": "slow", "share": 1, "unload_time_minutes": 15, "payload_units": 3},
+    ]
+}
+
+
+class TestTruckClasses(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "classes.json")
+        with open(self.path, "w") as file:
+            json.dump(CLASSES, file)
+        self.config = default_config().replace(truck_classes_file=self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_graph(self) -> str:
+        path = os.path.join(self.directory.name, "graph.json")
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "mines": ["pit"],
+                    "stations": ["dock"],
+                    "roads": [
+                        {"from": "pit", "to": "dock", "length_km": 30, "speed_kmh": 60}
+                    ],
+                },
+                file,
+            )
+        return path
+
+    def test_load(self):
+        classes = truck_classes(self.config)
+        self.assertTrue(classes.names == ("haul", "light", "slow"))
+        self.assertTrue(np.allclose(classes.shares, [0.6, 0.2, 0.2]))
+        self.assertTrue(classes.travel_time_minutes.tolist() == [40, 20, 30])
+        self.assertTrue(classes.unload_time_minutes.tolist() == [5, 5, 15])
+        self.assertTrue(classes.payload_units.tolist() == [2, 1, 3])
+
+    def test_default_class(self):
+        classes = truck_classes(default_config())
+        self.assertTrue(len(classes) == 1)
+        self.assertTrue(classes[0].travel_time_minutes == 30)
+        self.assertTrue(classes.assign(0, 4).tolist() == [0, 0, 0, 0])
+
+    def test_invalid_class(self):
+        with open(self.path, "w") as file:
+            json.dump({"classes": [{"name": "empty", "payload_units": 0}]}, file)
+        with self.assertRaises(ValueError):
+            truck_classes(default_config().replace(truck_classes_file=self.path))
+
+    def test_reloaded_after_edit(self):
+        deposited = []
+        for payload in (1, 5):
+            with open(self.path, "w") as file:
+                json.dump({"classes": [{"payload_units": payload}]}, file)
+            self.assertTrue(truck_classes(self.config)[0].payload_units == payload)
+            coordinator = MiningCoordinator(10, 2, random.Random(1), self.config)
+            for _ in range(300):
+                coordinator.time_step()
+            deposited.append(
+                sum(
+                    station.units_deposited
+                    for station in coordinator.unloading_stations
+                )
+            )
+        self.assertTrue(deposited[0] > 0)
+        self.assertTrue(deposited[1] == 5 * deposited[0])
+
+    def test_assign_proportional(self):
+        classes = truck_classes(self.config)
+        assigned = classes.assign(0, 1000)
+        for count in (5, 10, 100, 1000):
+            counts = np.bincount(assigned[:count], minlength=3)
+            self.assertTrue(np.abs(counts - classes.shares * count).max() <= 1)
+        # regions assigning their own trucks agree with the whole fleet
+        self.assertTrue(
+            np.array_equal(
+                np.concatenate([classes.assign(0, 333), classes.assign(333, 667)]),
+                assigned,
+            )
+        )
+
+    def test_fleet_matches_stepped(self):
+        num_steps = 72 * 60 // 5
+
+        random.seed(3)
+        stepped = MiningCoordinator(30, 2, config=self.config)
+        for _ in range(num_steps):
+            stepped.time_step()
+
+        random.seed(3)
+        fleet = VectorizedFleet(30, 2, config=self.config)
+        for _ in range(num_steps):
+            fleet.time_step()
+
+        self.assertEqual(
+            truck_snapshot(stepped.trucks), truck_snapshot(fleet.build_trucks())
+        )
+        for index, station in enumerate(stepped.unloading_stations):
+            self.assertTrue(station.units_deposited == fleet.units_deposited[index])
+            self.assertTrue(
+                station.units_by_class == fleet.units_by_class[index].tolist()
+            )
+            self.assertTrue(station.units_deposited == sum(station.units_by_class))
+            self.assertTrue(station.current_wait_time == fleet.current_wait_time[index])
+
+        # heavier trucks deposit more per unload
+        units_by_class = fleet.units_by_class.sum(axis=0)
+        self.assertTrue(units_by_class[0] > units_by_class[1])
+        self.assertTrue(
+            {truck.travel_time_minutes for truck in stepped.trucks} == {20, 30, 40}
+        )
+
+    def test_bookings_use_class_unload_times(self):
+        with open(self.path, "w") as file:
+            json.dump(
+                {"classes": [{"name": "quick"}, {"unload_time_minutes": 15}]}, file
+            )
+        graph = self.write_graph()
+        config = default_config().replace(truck_classes_file=self.path)
+        predicted = MiningCoordinator(
+            20, 2, random.Random(2), config.replace(station_policy="predicted_arrival")
+        )
+        routed = MiningCoordinator(
+            20,
+            2,
+            random.Random(2),
+            config.replace(
+                network_file=graph,
+                network_cache_dir=os.path.join(self.directory.name, "cache"),
+            ),
+        )
+        for _ in range(500):
+            predicted.time_step()
+            routed.time_step()
+
+        unload_time = {
+            truck.id: truck.truck_class.unload_time_minutes
+            for truck in predicted.trucks
+        }
+        policy = predicted.station_policy
+        for station in predicted.unloading_stations:
+            self.assertTrue(
+                policy.booked_minutes.get(station.id, 0)
+                == sum(
+                    unload_time[truck_id]
+                    for truck_id, position in policy.bookings.items()
+                    if position == station.id
+                )
+            )
+        router = routed.router
+        self.assertTrue(
+            router.booked_minutes
+            == [
+                sum(
+                    unload_time[truck_id]
+                    for truck_id, booked in router.station_bookings.items()
+                    if booked == position
+                )
+                for position in range(2)
+            ]
+        )
+
+    def test_routing_needs_one_travel_time(self):
+        graph = self.write_graph()
+        with self.assertRaises(ValueError):
+            MiningCoordinator(
+                10, 2, config=self.config.replace(station_policy="predicted_arrival")
+            )
+        with self.assertRaises(ValueError):
+            MiningCoordinator(10, 2, config=self.config.replace(network_file=graph))
+
+    def test_hybrid_unsupported(self):
+        coordinator = MiningCoordinator(10, 2, random.Random(1), self.config)
+        self.assertFalse(HybridEngine(coordinator, 5).supported)
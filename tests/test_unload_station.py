@@ -6,10 +6,10 @@ from mining_simulator.unloading_station import UnloadStation
 
 class TestMiningStation(unittest.TestCase):
     def setUp(self):
-        self.unload_station1 = UnloadStation()
-        self.unload_station2 = UnloadStation()
-        self.mining_truck1 = MiningTruck()
-        self.mining_truck2 = MiningTruck()
+        self.unload_station1 = UnloadStation(station_id=0)
+        self.unload_station2 = UnloadStation(station_id=1)
+        self.mining_truck1 = MiningTruck(truck_id=0)
+        self.mining_truck2 = MiningTruck(truck_id=1)
 
     def test_current_wait_time_zero(self):
         result = min(self.unload_station1, self.unload_station2)
@@ -76,10 +76,35 @@ class TestMiningStation(unittest.TestCase):
         self.assertTrue(len(self.unload_station1.queue) == 1)
         self.assertTrue(self.unload_station1.total_wait_time == 10)
 
+        self.assertTrue(
+            self.unload_station1.current_wait_time
+            == self.mining_truck2.truck_class.unload_time_minutes
+        )
+
         self.mining_truck2.timer = 0
         self.unload_station1.manage_queue()
+        self.assertTrue(self.unload_station1.current_wait_time == 0)
         self.assertTrue(self.mining_truck1.units_mined == 1)
         self.assertTrue(self.mining_truck2.units_mined == 1)
         self.assertTrue(self.unload_station1.units_deposited == 2)
         self.assertTrue(len(self.unload_station1.queue) == 0)
         self.assertTrue(self.unload_station1.total_wait_time == 10)
+
+    def test_accumulate_wait_time(self):
+        self.unload_station1.accumulate_wait_time(3)
+        self.assertTrue(self.unload_station1.num_waiting == 0)
+        self.assertTrue(self.unload_station1.total_wait_time == 0)
+
+        trucks = [MiningTruck(truck_id=index) for index in range(4)]
+        for truck in trucks:
+            self.unload_station1.add_truck_to_queue(truck)
+        self.assertTrue(self.unload_station1.num_waiting == 3)
+        self.unload_station1.accumulate_wait_time(3)
+        self.assertTrue(self.unload_station1.total_wait_time == 3 * 3 * 5)
+
+        # trucks leave in the order they arrived
+        for truck in trucks:
+            self.assertTrue(self.unload_station1.queue[0] is truck)
+            truck.timer = 0
+            self.unload_station1.manage_queue()
+        self.assertTrue(self.unload_station1.num_waiting == 0)